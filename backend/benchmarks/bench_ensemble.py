@@ -0,0 +1,65 @@
+"""
+Benchmark: vectorized EnsemblePINN forward versus the per-member loop.
+
+The vectorized mode stacks member parameters and runs each layer for all
+members as one batched matmul. Latency is reported next to a single EndoPINN
+forward as reference.
+
+Usage:
+    python benchmarks/bench_ensemble.py [--members 3 5 10] [--batch-sizes 1 32 256]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN, EnsemblePINN
+
+
+def _latency_ms(fn, repeats: int) -> float:
+    for _ in range(3):
+        fn()  # warm-up (also builds the stacked member state)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    single = EndoPINN().eval()
+
+    print(f"{'members':>7} {'batch':>6} {'single ms':>10} {'loop ms':>9} {'stacked ms':>10} {'speedup':>8}")
+    with torch.no_grad():
+        for members in args.members:
+            ensemble = EnsemblePINN(num_models=members).eval()
+            for batch_size in args.batch_sizes:
+                inputs = (torch.rand(batch_size, 128), torch.rand(batch_size, 64), torch.rand(batch_size, 64))
+                reference = _latency_ms(lambda: single.forward_heads(*inputs), args.repeats)
+                loop = _latency_ms(lambda: ensemble(*inputs, vectorized=False), args.repeats)
+                stacked = _latency_ms(lambda: ensemble(*inputs, vectorized=True), args.repeats)
+                print(
+                    f"{members:>7} {batch_size:>6} {reference:>10.3f} {loop:>9.3f} "
+                    f"{stacked:>10.3f} {loop / stacked:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
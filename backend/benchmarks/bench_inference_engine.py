@@ -0,0 +1,71 @@
+"""
+Benchmark: frozen TorchScript inference engine versus the eager EndoPINN.
+
+Runs the serving path (Monte Carlo dropout with BatchNorm running statistics)
+through both and reports median latency and throughput per batch size.
+
+Usage:
+    python benchmarks/bench_inference_engine.py [--batch-sizes 1 32 256] [--mc-samples 10]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+import warnings
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN
+from pinn_server.inference_engine import build_inference_engine
+
+
+def _latency_ms(fn, repeats: int) -> float:
+    for _ in range(3):
+        fn()  # warm-up (TorchScript profiles the first calls)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128, 512])
+    parser.add_argument("--mc-samples", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+
+    model = EndoPINN().eval()
+    engine = build_inference_engine(model)
+
+    print(f"mc_samples={args.mc_samples}")
+    print(f"{'batch':>6} {'eager ms':>9} {'frozen ms':>10} {'eager rows/s':>13} {'frozen rows/s':>14} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        inputs = (torch.rand(batch_size, 128), torch.rand(batch_size, 64), torch.rand(batch_size, 64))
+        eager = _latency_ms(
+            lambda: model.predict_with_confidence(*inputs, mc_samples=args.mc_samples, apply_batch_norm=True),
+            args.repeats
+        )
+        frozen = _latency_ms(
+            lambda: engine.predict_with_confidence(*inputs, mc_samples=args.mc_samples),
+            args.repeats
+        )
+        print(
+            f"{batch_size:>6} {eager:>9.3f} {frozen:>10.3f} {batch_size / eager * 1e3:>13.0f} "
+            f"{batch_size / frozen * 1e3:>14.0f} {eager / frozen:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: step time, peak memory and convergence of the loss balancers.
+
+Runs the /train step of the central model on synthetic patients with each
+of LOSS_BALANCERS: 'gradnorm' takes each loss's gradient norm on the shared
+fusion layer through a retained graph before its backward, the others do a
+single backward. Every balancer starts from the same weights and sees the
+same batches.
+
+Memory is the peak RSS growth (VmHWM, Linux only) over the whole run, in a
+fresh spawned process per balancer. Convergence is the mean unweighted data
+loss (BCE + stiffness MSE) per epoch, so the columns are comparable across
+balancers whatever weights they chose.
+
+Usage:
+    python benchmarks/bench_loss_balancing.py [--epochs 5] [--patients 512] [--batch-size 16]
+        [--physics-points 256] [--mode autograd|fd]
+"""
+
+import argparse
+import functools
+import multiprocessing
+import pathlib
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from bench_physics_residual import _status_kb
+from pinn_server.model import EndoPINN
+from utils.physics_loss import (
+    GradNormWeighting,
+    LOSS_BALANCERS,
+    PINNLoss,
+    make_loss_balancer,
+    shared_gradient_norms,
+)
+
+
+def _run(name: str, args: argparse.Namespace):
+    """Train with one balancer; returns (median step ms, peak MB, [data loss per epoch]). Runs in a spawned worker."""
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    torch.manual_seed(0)
+    features = [torch.randn(args.patients, dim) for dim in (128, 64, 64)]
+    labels = (features[1][:, :1] > 0).float()
+    model = EndoPINN()
+
+    torch.manual_seed(1)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    loss_fn = PINNLoss(lambda_physics=0.1, lambda_elastic=0.05, residual_mode=args.mode)
+    balancer = make_loss_balancer(name, num_losses=3)
+    balancer_params = list(balancer.parameters())
+    balancer_optimizer = torch.optim.Adam(balancer_params, lr=0.025) if balancer_params else None
+    model.train()
+
+    before = _status_kb("VmRSS")
+    step_ms, data_losses = [], []
+    for _ in range(args.epochs):
+        epoch_data = 0.0
+        starts = range(0, args.patients, args.batch_size)
+        for start in starts:
+            imaging, clinical, pathology, batch_labels = (
+                t[start:start + args.batch_size] for t in (*features, labels)
+            )
+            batch_size = imaging.size(0)
+            step_start = time.perf_counter()
+
+            prediction, stiffness, displacement = model(imaging, clinical, pathology, torch.rand(batch_size, 3))
+            displacement_fn = functools.partial(model.point_displacement, apply_batch_norm=batch_size > 1)
+            fused_features = model.fuse_features(imaging, clinical, pathology)
+            patients = torch.randint(batch_size, (args.physics_points,))
+            _, loss_dict, raw_losses = loss_fn(
+                (prediction, stiffness, displacement), batch_labels, torch.rand(args.physics_points, 3),
+                displacement_fn=displacement_fn,
+                point_inputs=(fused_features[patients],),
+                point_stiffness=stiffness[patients]
+            )
+
+            optimizer.zero_grad()
+            if balancer_optimizer is not None:
+                balancer_optimizer.zero_grad()
+            weighted_loss = balancer(raw_losses)
+            if isinstance(balancer, GradNormWeighting):
+                task_grad_norms = shared_gradient_norms(raw_losses, model.fusion.weight)
+                weighted_loss.backward()
+                balancer_optimizer.zero_grad()
+                balancer.update_weights(raw_losses, task_grad_norms).backward()
+                balancer_optimizer.step()
+            else:
+                weighted_loss.backward()
+                if balancer_optimizer is not None:
+                    balancer_optimizer.step()
+                balancer.update(raw_losses)
+            torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+            optimizer.step()
+
+            step_ms.append((time.perf_counter() - step_start) * 1e3)
+            epoch_data += loss_dict["data"]
+        data_losses.append(epoch_data / len(starts))
+
+    peak_mb = max(0, _status_kb("VmHWM") - before) / 1024
+    step_ms.sort()
+    return step_ms[len(step_ms) // 2], peak_mb, data_losses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--patients", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--physics-points", type=int, default=256)
+    parser.add_argument("--mode", choices=["autograd", "fd"], default="autograd")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    spawn = multiprocessing.get_context("spawn")
+    epochs = " ".join(f"{'ep' + str(epoch + 1):>7}" for epoch in range(args.epochs))
+    print(f"{'balancer':>11} {'step ms':>8} {'peak MB':>8} {epochs}")
+    for name in LOSS_BALANCERS:
+        with spawn.Pool(1, maxtasksperchild=1) as pool:
+            ms, peak_mb, data_losses = pool.apply(_run, (name, args))
+        losses = " ".join(f"{loss:>7.4f}" for loss in data_losses)
+        print(f"{name:>11} {ms:>8.1f} {peak_mb:>8.1f} {losses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: Monte Carlo dropout in EndoPINN.predict_with_confidence.
+
+Compares the sequential loop of ``mc_samples`` forward passes against the
+vectorized mode that tiles the batch and runs a single forward pass.
+
+Usage:
+    python benchmarks/bench_mc_dropout.py [--batch-sizes 1 16 256] [--mc-samples 5 10 30]
+"""
+
+import argparse
+import pathlib
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN
+
+
+def _latency_ms(fn, repeats: int) -> float:
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument("--mc-samples", type=int, nargs="+", default=[5, 10, 30])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    model = EndoPINN()
+
+    print(f"{'batch':>6} {'mc':>4} {'sequential ms':>14} {'vectorized ms':>14} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        inputs = (torch.rand(batch_size, 128), torch.rand(batch_size, 64), torch.rand(batch_size, 64))
+        for mc_samples in args.mc_samples:
+            sequential = _latency_ms(
+                lambda: model.predict_with_confidence(*inputs, mc_samples=mc_samples, vectorized=False), args.repeats
+            )
+            vectorized = _latency_ms(
+                lambda: model.predict_with_confidence(*inputs, mc_samples=mc_samples, vectorized=True), args.repeats
+            )
+            print(f"{batch_size:>6} {mc_samples:>4} {sequential:>14.3f} {vectorized:>14.3f} {sequential / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: peak memory and step time of chunked physics backward.
+
+One step backpropagates the Navier-Cauchy residual of ``--points``
+collocation points into EndoPINN with PINNLoss.physics_backward(), for
+each chunk size (0 = all points in one chunk).
+
+Memory is the peak RSS growth (VmHWM, Linux only) over the first step of a
+fresh spawned process per configuration, so memory the allocator kept from
+an earlier step does not hide the peak. Time is the median of the
+following steps.
+
+Usage:
+    python benchmarks/bench_physics_chunking.py [--mode autograd|fd] [--points 4096]
+        [--chunks 0 1024 256 64]
+"""
+
+import argparse
+import multiprocessing
+import pathlib
+import sys
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from bench_physics_residual import _fields, _latency_ms, _status_kb
+from utils.physics_loss import PINNLoss
+
+
+def _step(mode: str, points: int, chunk_size: int):
+    model, point_fn, point_inputs = _fields(points)["endopinn"]
+    coords = torch.rand(points, 3)
+    youngs_modulus = torch.full((points, 1), 5.0)
+    loss_fn = PINNLoss(residual_mode=mode, chunk_size=chunk_size or None)
+
+    def step():
+        model.zero_grad(set_to_none=True)
+        loss_fn.physics_backward(coords, youngs_modulus, point_fn, point_inputs)
+
+    return step
+
+
+def _measure(mode: str, points: int, chunk_size: int, repeats: int, threads: int):
+    """Peak RSS growth (MB) of the first step and median step time (ms); runs in a spawned worker."""
+    if threads:
+        torch.set_num_threads(threads)
+    step = _step(mode, points, chunk_size)
+    before = _status_kb("VmRSS")
+    step()
+    peak_mb = max(0, _status_kb("VmHWM") - before) / 1024
+    return peak_mb, _latency_ms(step, repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["autograd", "fd"], default="autograd")
+    parser.add_argument("--points", type=int, default=4096)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[0, 1024, 256, 64])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    print(f"{'mode':>9} {'points':>7} {'chunk':>6} {'ms':>9} {'peak MB':>8}")
+    spawn = multiprocessing.get_context("spawn")
+    for chunk_size in args.chunks:
+        with spawn.Pool(1, maxtasksperchild=1) as pool:
+            peak_mb, ms = pool.apply(_measure, (args.mode, args.points, chunk_size, args.repeats, args.threads))
+        print(f"{args.mode:>9} {args.points:>7} {chunk_size or 'all':>6} {ms:>9.1f} {peak_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: accuracy versus cost of the physics residual modes.
+
+For each collocation count, every PINNLoss residual mode computes the
+Navier-Cauchy residual and backpropagates it into the network parameters.
+'fd' is swept over several stencil spacings. The error is relative to the
+exact residual, computed with autograd in float64, or absolute where the
+exact residual is zero.
+
+``--field endopinn`` uses EndoPINN.point_displacement. Its ReLU trunk is
+piecewise linear, so the exact residual is zero and any 'fd' error comes
+from stencils that straddle a kink.
+
+Usage:
+    python benchmarks/bench_physics_fd.py [--field tanh-mlp|endopinn] [--points 256 1024 4096]
+        [--steps 0.1 0.03 0.01 0.003 0.001]
+"""
+
+import argparse
+import copy
+import pathlib
+import sys
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from bench_physics_residual import _fields, _latency_ms
+from utils.physics_loss import PINNLoss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--field", choices=["tanh-mlp", "endopinn"], default="tanh-mlp")
+    parser.add_argument("--points", type=int, nargs="+", default=[256, 1024, 4096])
+    parser.add_argument("--steps", type=float, nargs="+", default=[0.1, 0.03, 0.01, 0.003, 0.001])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    configs = [("autograd", None)] + [("fd", step) for step in args.steps]
+
+    print(f"{'points':>7} {'mode':>10} {'step':>7} {'ms':>9} {'error':>10}")
+    for points in args.points:
+        module, point_fn, point_inputs = _fields(points)[args.field]
+        coords = torch.rand(points, 3)
+        youngs_modulus = torch.full((points, 1), 5.0)
+
+        reference = copy.deepcopy(module).double()
+        exact = PINNLoss(residual_mode="autograd").physics_residual(
+            None, coords.double(), youngs_modulus.double(),
+            getattr(reference, point_fn.__name__), [t.double() for t in point_inputs]
+        ).item()
+
+        for mode, step in configs:
+            loss_fn = PINNLoss(residual_mode=mode, fd_step=step or 1e-2)
+
+            def run():
+                module.zero_grad(set_to_none=True)
+                residual = loss_fn.physics_residual(None, coords, youngs_modulus, point_fn, point_inputs)
+                residual.backward()
+                return residual.item()
+
+            ms = _latency_ms(run, args.repeats)
+            error = abs(run() - exact) / (abs(exact) or 1.0)
+            print(f"{points:>7} {mode:>10} {step or '-':>7} {ms:>9.2f} {error:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
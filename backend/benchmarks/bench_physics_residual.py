@@ -0,0 +1,144 @@
+"""
+Benchmark: Navier-Cauchy residual via torch.func versus chained autograd.grad.
+
+navier_cauchy_residual() (autograd.grad over the batch graph) is what
+PINNLoss uses. The torch.func variant (per-point Hessians from
+vmap(jacfwd(jacrev(field)))) is built here only for comparison: it was
+slower on the EndoPINN trunk, so it is not shipped as a residual mode.
+
+Both paths compute the residual and backpropagate it into the network
+parameters, as one training step does. Two displacement fields are measured:
+
+- ``endopinn``: EndoPINN.point_displacement (ReLU trunk, as trained by /train)
+- ``tanh-mlp``: a small smooth coordinate MLP with non-zero second derivatives
+
+Memory is the peak RSS growth over one (warm) step (VmHWM after resetting it
+through /proc/self/clear_refs, Linux only), measured in a fresh spawned
+process per configuration so allocator caching does not carry over.
+
+Usage:
+    python benchmarks/bench_physics_residual.py [--points 64 256 1024] [--repeats 10]
+"""
+
+import argparse
+import multiprocessing
+import pathlib
+import sys
+import time
+
+import torch
+import torch.nn as nn
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN
+from torch.func import jacfwd, jacrev, vmap
+
+from utils.physics_loss import navier_cauchy_residual, residual_from_hessian
+
+
+class _TanhField(nn.Module):
+    def __init__(self, width: int = 64):
+        super().__init__()
+        self.net = nn.Sequential(
+            nn.Linear(3, width), nn.Tanh(), nn.Linear(width, width), nn.Tanh(), nn.Linear(width, 3)
+        )
+
+    def forward(self, coord: torch.Tensor) -> torch.Tensor:
+        return self.net(coord)
+
+
+def _latency_ms(fn, repeats: int) -> float:
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1e3
+
+
+def _fields(points: int):
+    torch.manual_seed(0)
+    model = EndoPINN().eval()
+    with torch.no_grad():
+        fused = model.fuse_features(torch.rand(points, 128), torch.rand(points, 64), torch.rand(points, 64))
+    tanh_field = _TanhField()
+    return {
+        "endopinn": (model, model.point_displacement, (fused,)),
+        "tanh-mlp": (tanh_field, tanh_field.forward, ()),
+    }
+
+
+def _steps(module, point_fn, point_inputs, points: int):
+    """One residual + backward step per implementation."""
+    coords = torch.rand(points, 3)
+    youngs_modulus = torch.full((points, 1), 5.0)
+
+    def autograd_step():
+        module.zero_grad(set_to_none=True)
+        leaf = coords.clone().requires_grad_(True)
+        displacement = vmap(point_fn)(leaf, *point_inputs)
+        navier_cauchy_residual(displacement, leaf, youngs_modulus).backward()
+
+    def func_step():
+        module.zero_grad(set_to_none=True)
+        hessian = vmap(jacfwd(jacrev(point_fn)))(coords, *point_inputs)
+        residual_from_hessian(hessian, youngs_modulus).backward()
+
+    return {"autograd": autograd_step, "func": func_step}
+
+
+def _peak_rss_mb(field: str, points: int, mode: str, threads: int) -> float:
+    """Peak RSS growth (MB) of one step; runs in a spawned worker."""
+    if threads:
+        torch.set_num_threads(threads)
+    step = _steps(*_fields(points)[field], points)[mode]
+    step()  # warm-up: excludes one-off kernel and transform setup
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # reset the peak RSS (VmHWM) to the current RSS
+    before = _status_kb("VmRSS")
+    step()
+    return max(0, _status_kb("VmHWM") - before) / 1024
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    print(
+        f"{'field':>9} {'points':>7} {'autograd ms':>12} {'func ms':>8} {'speedup':>8} "
+        f"{'autograd MB':>12} {'func MB':>8}"
+    )
+    spawn = multiprocessing.get_context("spawn")
+    for points in args.points:
+        for name, field in _fields(points).items():
+            steps = _steps(*field, points)
+            autograd_ms = _latency_ms(steps["autograd"], args.repeats)
+            func_ms = _latency_ms(steps["func"], args.repeats)
+            with spawn.Pool(1, maxtasksperchild=1) as pool:
+                autograd_mb = pool.apply(_peak_rss_mb, (name, points, "autograd", args.threads))
+            with spawn.Pool(1, maxtasksperchild=1) as pool:
+                func_mb = pool.apply(_peak_rss_mb, (name, points, "func", args.threads))
+            print(
+                f"{name:>9} {points:>7} {autograd_ms:>12.2f} {func_ms:>8.2f} {autograd_ms / func_ms:>7.2f}x "
+                f"{autograd_mb:>12.1f} {func_mb:>8.1f}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: int8 dynamic quantization of the frozen serving engine.
+
+Scores the validation split from get_train_val_loaders() with the fp32 and
+int8 frozen engines and reports
+
+- accuracy drift: absolute differences in prediction, stiffness and
+  confidence, risk-level agreement and label accuracy of each engine. Both
+  engines draw the same dropout masks (same RNG seed), so the drift is due
+  to quantization alone;
+- p50/p99 latency of the serving call at several batch sizes;
+- serialized artifact size.
+
+Usage:
+    DATA_PATH=/app/data python benchmarks/bench_quantization.py [--checkpoint pinn_latest.pth]
+"""
+
+import argparse
+import io
+import pathlib
+import sys
+import time
+import warnings
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN, load_model
+from pinn_server.inference_engine import build_inference_engine
+from utils.data_loader import get_train_val_loaders
+
+
+def _risk(prediction: np.ndarray) -> np.ndarray:
+    # Same thresholds as classify_risk() in the server
+    return np.digitize(prediction, [0.3, 0.6])
+
+
+def _score(engine, loader, mc_samples: int, seed: int):
+    outputs, labels = [], []
+    for i, batch in enumerate(loader):
+        torch.manual_seed(seed + i)
+        prediction, stiffness, confidence = engine.predict_with_confidence(
+            batch["imaging"], batch["clinical"], batch["pathology"], mc_samples=mc_samples
+        )
+        outputs.append(torch.cat([prediction, stiffness, confidence], dim=1).numpy())
+        labels.append(batch["labels"].view(-1).numpy())
+    return np.concatenate(outputs), np.concatenate(labels)
+
+
+def _latency_ms(fn, repeats: int):
+    for _ in range(3):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def _artifact_kb(engine) -> float:
+    buffer = io.BytesIO()
+    torch.jit.save(engine.module, buffer)
+    return buffer.tell() / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checkpoint", default=None, help="EndoPINN checkpoint (random weights if omitted)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--mc-samples", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+
+    torch.manual_seed(0)
+    model = load_model(args.checkpoint) if args.checkpoint else EndoPINN().eval()
+    engines = {precision: build_inference_engine(model, precision=precision) for precision in ("fp32", "int8")}
+
+    # Accuracy drift on the validation split
+    torch.manual_seed(0)
+    _, val_loader = get_train_val_loaders(batch_size=32)
+    fp32, labels = _score(engines["fp32"], val_loader, args.mc_samples, seed=1234)
+    int8, _ = _score(engines["int8"], val_loader, args.mc_samples, seed=1234)
+    drift = np.abs(fp32 - int8)
+
+    print(f"Validation split: {len(labels)} patients, mc_samples={args.mc_samples}")
+    print(f"{'output':>11} {'fp32 mean':>10} {'mean |Δ|':>10} {'max |Δ|':>10}")
+    for column, name in enumerate(("prediction", "stiffness", "confidence")):
+        print(
+            f"{name:>11} {fp32[:, column].mean():>10.4f} "
+            f"{drift[:, column].mean():>10.5f} {drift[:, column].max():>10.5f}"
+        )
+    print(f"risk-level agreement: {np.mean(_risk(fp32[:, 0]) == _risk(int8[:, 0])) * 100:.1f}%")
+    for precision, outputs in (("fp32", fp32), ("int8", int8)):
+        accuracy = np.mean((outputs[:, 0] >= 0.5) == (labels >= 0.5)) * 100
+        print(f"{precision} label accuracy: {accuracy:.1f}%")
+
+    # Serving latency
+    print()
+    print(f"{'batch':>6} {'fp32 p50':>9} {'fp32 p99':>9} {'int8 p50':>9} {'int8 p99':>9}   (ms)")
+    for batch_size in args.batch_sizes:
+        inputs = (torch.rand(batch_size, 128), torch.rand(batch_size, 64), torch.rand(batch_size, 64))
+        row = []
+        for precision in ("fp32", "int8"):
+            row.extend(_latency_ms(
+                lambda: engines[precision].predict_with_confidence(*inputs, mc_samples=args.mc_samples), args.repeats
+            ))
+        print(f"{batch_size:>6} " + " ".join(f"{value:>9.3f}" for value in row))
+
+    print()
+    print(f"artifact size: fp32 {_artifact_kb(engines['fp32']):.0f} KB, int8 {_artifact_kb(engines['int8']):.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
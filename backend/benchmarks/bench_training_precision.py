@@ -0,0 +1,108 @@
+"""
+Benchmark: epoch time and loss trajectory of fp32 versus bf16-autocast training.
+
+Mirrors one /train step of the central model on synthetic patients: the
+data path (trunk and heads) runs under training_autocast(), its outputs are
+cast back to fp32, and the Navier-Cauchy residual differentiates
+EndoPINN.point_displacement in fp32 on ``--physics-points`` points. Both
+precisions start from the same weights and see the same batches, so the
+loss columns are directly comparable.
+
+Usage:
+    python benchmarks/bench_training_precision.py [--epochs 5] [--patients 512] [--batch-size 16]
+"""
+
+import argparse
+import copy
+import functools
+import pathlib
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN, TRAINING_PRECISIONS, training_autocast
+from utils.physics_loss import PINNLoss
+
+
+def _train(model: EndoPINN, batches, precision: str, epochs: int, physics_points: int, seed: int):
+    """Train ``model`` in place; returns [(epoch seconds, mean loss, mean physics loss)]."""
+    torch.manual_seed(seed)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    loss_fn = PINNLoss(lambda_physics=0.1, lambda_elastic=0.05)
+    model.train()
+
+    history = []
+    for _ in range(epochs):
+        start = time.perf_counter()
+        total = physics = 0.0
+        for imaging, clinical, pathology, labels in batches:
+            batch_size = imaging.size(0)
+            with training_autocast(precision):
+                outputs = model(imaging, clinical, pathology, torch.rand(batch_size, 3))
+            prediction, stiffness, displacement = (output.float() for output in outputs)
+
+            displacement_fn = functools.partial(model.point_displacement, apply_batch_norm=batch_size > 1)
+            fused_features = model.fuse_features(imaging, clinical, pathology)
+            patients = torch.randint(batch_size, (physics_points,))
+
+            loss, loss_dict, _ = loss_fn(
+                (prediction, stiffness, displacement), labels, torch.rand(physics_points, 3),
+                displacement_fn=displacement_fn,
+                point_inputs=(fused_features[patients],),
+                point_stiffness=stiffness[patients]
+            )
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
+            optimizer.step()
+            total += loss_dict["total"]
+            physics += loss_dict["physics"]
+        history.append((time.perf_counter() - start, total / len(batches), physics / len(batches)))
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--patients", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--physics-points", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    torch.manual_seed(0)
+    features = [torch.randn(args.patients, dim) for dim in (128, 64, 64)]
+    labels = (features[1][:, :1] > 0).float()
+    batches = [
+        tuple(t[start:start + args.batch_size] for t in (*features, labels))
+        for start in range(0, args.patients, args.batch_size)
+    ]
+    initial = EndoPINN()
+
+    results = {
+        precision: _train(copy.deepcopy(initial), batches, precision, args.epochs, args.physics_points, seed=1)
+        for precision in TRAINING_PRECISIONS
+    }
+
+    header = " ".join(f"{p + ' s':>8} {p + ' loss':>10} {p + ' phys':>10}" for p in TRAINING_PRECISIONS)
+    print(f"{'epoch':>5} {header}")
+    for epoch in range(args.epochs):
+        row = " ".join(
+            f"{results[p][epoch][0]:>8.2f} {results[p][epoch][1]:>10.4f} {results[p][epoch][2]:>10.4f}"
+            for p in TRAINING_PRECISIONS
+        )
+        print(f"{epoch + 1:>5} {row}")
+
+    fp32_time = sum(seconds for seconds, _, _ in results["fp32"])
+    bf16_time = sum(seconds for seconds, _, _ in results["bf16"])
+    print(f"bf16 speedup: {fp32_time / bf16_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
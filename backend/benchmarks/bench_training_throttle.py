@@ -0,0 +1,111 @@
+"""
+Benchmark: inference latency while the central model trains, with and without TrainingThrottle.
+
+A training thread runs /train-style steps of EndoPINN (forward, data loss
+and Navier-Cauchy residual, backward) on synthetic patients while the main
+thread serves single-patient eval forwards, as /predict does. Each
+inference call counts as a /predict request for the throttle, and the
+training thread calls TrainingThrottle.apply() before every step.
+
+Reports inference p50/p99 and training steps/s for: inference alone,
+training unthrottled (``busy_rps`` 0), and training throttled to
+``--throttled-threads`` intra-op threads. On a machine with a single core
+the throttle cannot free anything and the rows match.
+
+Usage:
+    python benchmarks/bench_training_throttle.py [--seconds 10] [--throttled-threads 1]
+"""
+
+import argparse
+import copy
+import functools
+import pathlib
+import sys
+import threading
+import time
+
+import torch
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from pinn_server.model import EndoPINN
+from pinn_server.training_jobs import TrainingThrottle
+from utils.physics_loss import PINNLoss
+
+
+def _train(model: EndoPINN, throttle: TrainingThrottle, stop: threading.Event, steps: list):
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+    loss_fn = PINNLoss(lambda_physics=0.1, lambda_elastic=0.05)
+    imaging, clinical, pathology = (torch.randn(16, dim) for dim in (128, 64, 64))
+    labels = (clinical[:, :1] > 0).float()
+    model.train()
+    while not stop.is_set():
+        throttle.apply()
+        prediction, stiffness, displacement = model(imaging, clinical, pathology, torch.rand(16, 3))
+        patients = torch.randint(16, (256,))
+        loss, _, _ = loss_fn(
+            (prediction, stiffness, displacement), labels, torch.rand(256, 3),
+            displacement_fn=functools.partial(model.point_displacement, apply_batch_norm=True),
+            point_inputs=(model.fuse_features(imaging, clinical, pathology)[patients],),
+            point_stiffness=stiffness[patients]
+        )
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+        steps.append(time.perf_counter())
+
+
+def _serve(model: EndoPINN, throttle: TrainingThrottle, seconds: float) -> list:
+    """Back-to-back single-patient eval forwards for ``seconds``; returns latencies in ms."""
+    inputs = (torch.randn(1, 128), torch.randn(1, 64), torch.randn(1, 64), torch.rand(1, 3))
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    with torch.no_grad():
+        while time.perf_counter() < deadline:
+            throttle.record_request()
+            throttle.pin_inference_threads()
+            start = time.perf_counter()
+            model(*inputs)
+            latencies.append((time.perf_counter() - start) * 1e3)
+    return sorted(latencies)
+
+
+def _scenario(serving: EndoPINN, training: EndoPINN, throttle: TrainingThrottle, seconds: float, train: bool):
+    stop = threading.Event()
+    steps = []
+    trainer = threading.Thread(target=_train, args=(training, throttle, stop, steps), daemon=True)
+    if train:
+        trainer.start()
+        time.sleep(0.5)
+    latencies = _serve(serving, throttle, seconds)
+    stop.set()
+    if train:
+        trainer.join()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return p50, p99, len(steps) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--throttled-threads", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    serving = EndoPINN().eval()
+    training = copy.deepcopy(serving)
+    print(f"intra-op threads: {torch.get_num_threads()}")
+    print(f"{'scenario':>12} {'p50 ms':>8} {'p99 ms':>8} {'train steps/s':>14}")
+    scenarios = [
+        ("idle", TrainingThrottle(busy_rps=0), False),
+        ("unthrottled", TrainingThrottle(busy_rps=0), True),
+        ("throttled", TrainingThrottle(busy_rps=1, throttled_threads=args.throttled_threads), True),
+    ]
+    for name, throttle, train in scenarios:
+        p50, p99, steps_per_s = _scenario(serving, training, throttle, args.seconds, train)
+        print(f"{name:>12} {p50:>8.2f} {p99:>8.2f} {steps_per_s:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
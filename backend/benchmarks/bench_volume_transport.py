@@ -0,0 +1,64 @@
+"""
+Benchmark: stiffness volume transport formats.
+
+Compares payload size and encode time of the JSON path used by /predict and
+the WebSocket broadcast (``volume.flatten().tolist()`` + json.dumps) against
+the binary encodings in utils.volume_encoding.
+
+Usage:
+    python benchmarks/bench_volume_transport.py [--grid-sizes 64 128] [--repeats 5]
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from utils.volume_encoding import encode_volume
+from utils.volume_synthesis import generate_stiffness_volume
+
+
+def _json_payload(volume) -> bytes:
+    return json.dumps({
+        "vtk_volume": volume.flatten().tolist(),
+        "volume_dimensions": list(volume.shape)
+    }, separators=(",", ":")).encode("utf-8")
+
+
+def _time(fn, repeats: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid-sizes", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'grid':>6} {'format':>14} {'bytes':>12} {'ratio':>8} {'encode ms':>10}")
+    for grid_size in args.grid_sizes:
+        volume = generate_stiffness_volume("HIGH", 7.5, grid_size)
+
+        cases = [("json", lambda: _json_payload(volume))]
+        for encoding in ("raw", "rle"):
+            for dtype in ("float32", "float16"):
+                cases.append((f"{encoding}/{dtype}", lambda e=encoding, d=dtype: encode_volume(volume, e, d)[0]))
+
+        json_size = None
+        for name, fn in cases:
+            payload, seconds = _time(fn, args.repeats)
+            json_size = json_size or len(payload)
+            print(f"{grid_size:>6} {name:>14} {len(payload):>12,} {json_size / len(payload):>7.1f}x {seconds * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
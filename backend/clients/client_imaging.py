@@ -19,6 +19,8 @@ import sys
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from clients.registration import start_registration, stop_registration
+
 from utils.data_loaders import (
     load_image_file,
     normalize_image,
@@ -365,6 +367,14 @@ async def startup_event():
     # Create data directory if it doesn't exist
     Path(DATA_PATH).mkdir(parents=True, exist_ok=True)
 
+    # Register with the central server when running as an extra site (PINN_SERVER_URL set)
+    start_registration(app, "imaging")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_registration(app)
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -18,6 +18,8 @@ import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from clients.registration import start_registration, stop_registration
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -213,6 +215,14 @@ async def startup_event():
     logger.info("=" * 50)
     Path(DATA_PATH).mkdir(parents=True, exist_ok=True)
 
+    # Register with the central server when running as an extra site (PINN_SERVER_URL set)
+    start_registration(app, "pathology")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_registration(app)
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,98 @@
+"""
+Self-registration of a federated node with the central PINN server.
+
+With PINN_SERVER_URL and NODE_PUBLIC_URL set, a node registers itself
+(POST /nodes/register) on startup and then heartbeats
+(POST /nodes/{node_id}/heartbeat) at a third of the server's heartbeat
+TTL. If the server forgot the node (restart, expiry) the heartbeat gets a
+404 and the node registers again under the same id. Any other 4xx means
+the registration can never succeed as configured (e.g. NODE_PUBLIC_URL is
+a configured node of another modality); it is logged and the loop stops.
+Without those variables the node is expected to be one of the server's
+configured *_SERVICE_URL nodes and does nothing here.
+
+Nodes call start_registration(app, modality) on startup and
+stop_registration(app) on shutdown; the task is kept on ``app.state`` so
+it is neither garbage-collected mid-run nor left running.
+
+Environment:
+    PINN_SERVER_URL  - central server base URL
+    NODE_PUBLIC_URL  - base URL the central server reaches this node at
+    NODE_SITE        - optional hospital site label
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 10.0
+
+
+async def registration_loop(modality: str):
+    """Register with the central server and heartbeat until cancelled."""
+    server_url = os.getenv("PINN_SERVER_URL", "").rstrip("/")
+    public_url = os.getenv("NODE_PUBLIC_URL", "")
+    if not server_url or not public_url:
+        return
+
+    node_id: Optional[str] = None
+    registered = False
+    heartbeat_interval = RETRY_SECONDS
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        while True:
+            try:
+                if registered:
+                    response = await client.post(f"{server_url}/nodes/{node_id}/heartbeat")
+                    if response.status_code == 404:
+                        logger.warning("Central server no longer knows this node; registering again")
+                        registered = False
+                    else:
+                        response.raise_for_status()
+                if not registered:
+                    response = await client.post(f"{server_url}/nodes/register", json={
+                        "url": public_url,
+                        "modality": modality,
+                        "site": os.getenv("NODE_SITE") or None,
+                        "node_id": node_id,
+                    })
+                    if 400 <= response.status_code < 500:
+                        logger.error(
+                            f"{server_url} refused to register this node "
+                            f"({response.status_code}: {response.text}); not retrying"
+                        )
+                        return
+                    response.raise_for_status()
+                    node = response.json()
+                    node_id = node["node_id"]
+                    heartbeat_interval = node["heartbeat_ttl_s"] / 3
+                    registered = True
+                    logger.info(f"Registered with {server_url} as {modality} node {node_id}")
+                await asyncio.sleep(heartbeat_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Registration with {server_url} failed: {e!r}; retrying in {RETRY_SECONDS:g}s")
+                await asyncio.sleep(RETRY_SECONDS)
+
+
+def start_registration(app, modality: str):
+    """Start registration_loop() for this node and keep the task on ``app.state``."""
+    app.state.registration_task = asyncio.create_task(registration_loop(modality))
+
+
+async def stop_registration(app):
+    """Cancel the registration task started by start_registration() and wait for it."""
+    task = getattr(app.state, "registration_task", None)
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    app.state.registration_task = None
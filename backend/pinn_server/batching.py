@@ -0,0 +1,162 @@
+"""
+Dynamic micro-batching for PINN inference.
+
+Concurrent /predict requests each carry a handful of rows. The MicroBatcher
+queues them, waits up to ``max_wait_ms`` for more requests (or until
+``max_batch_size`` rows are pending), concatenates the tensors, runs a single
+batched inference call and fans the per-row results back to the awaiting
+requests.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import torch
+
+from pinn_server.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent inference requests into batched calls.
+
+    ``infer_fn`` receives the concatenated input tensors and returns a tuple of
+    outputs. Tensor outputs are split row-wise back to the requests; any other
+    output (e.g. the number of MC samples drawn) is passed to every request.
+
+    When an ``executor`` (see pinn_server.executors) is given, ``infer_fn``
+    runs on it instead of on the event loop.
+    """
+
+    def __init__(
+        self,
+        infer_fn: Callable[..., Tuple[Any, ...]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "predict",
+        executor=None
+    ):
+        self.infer_fn = infer_fn
+        self.executor = executor
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batch_size_histogram = Histogram(
+            f"endotwin_{name}_batch_size", "Rows per batched inference call", _BATCH_BUCKETS
+        )
+        self.queue_depth_histogram = Histogram(
+            f"endotwin_{name}_queue_depth", "Requests still queued when a batch is dispatched", _BATCH_BUCKETS
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the batching loop on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait_ms})")
+
+    async def stop(self):
+        """Stop the batching loop and fail any requests still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher stopped"))
+
+    async def submit(self, *inputs: torch.Tensor) -> Tuple[Any, ...]:
+        """
+        Queue one request and wait for its slice of the batched result.
+
+        Args:
+            *inputs: Input tensors sharing the same leading (row) dimension
+
+        Returns:
+            Tuple of outputs for this request's rows
+        """
+        if self._task is None:
+            # Not started (e.g. scripts/tests without the app lifecycle)
+            return await self._infer(*inputs)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((inputs, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = batch[0][0][0].size(0)
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+
+            while rows < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += item[0][0].size(0)
+
+            await self._dispatch(batch)
+            # Let resolved requests run before collecting the next batch
+            await asyncio.sleep(0)
+
+    async def _infer(self, *inputs: torch.Tensor) -> Tuple[Any, ...]:
+        if self.executor is None:
+            return self.infer_fn(*inputs)
+        return await self.executor.run(self.infer_fn, *inputs)
+
+    async def _dispatch(self, batch: List[Tuple[Sequence[torch.Tensor], asyncio.Future]]):
+        sizes = [inputs[0].size(0) for inputs, _ in batch]
+        self.batch_size_histogram.observe(sum(sizes))
+        self.queue_depth_histogram.observe(self._queue.qsize())
+
+        try:
+            stacked = [torch.cat(tensors) for tensors in zip(*(inputs for inputs, _ in batch))]
+            outputs = await self._infer(*stacked)
+        except Exception as e:
+            logger.error(f"Batched inference failed for {len(batch)} requests: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for size, (_, future) in zip(sizes, batch):
+            if not future.done():
+                future.set_result(tuple(
+                    out[offset:offset + size] if isinstance(out, torch.Tensor) else out
+                    for out in outputs
+                ))
+            offset += size
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            f"# HELP endotwin_{self.name}_queue_pending Requests waiting for a batch",
+            f"# TYPE endotwin_{self.name}_queue_pending gauge",
+            f"endotwin_{self.name}_queue_pending {self.queue_depth}",
+            *self.batch_size_histogram.prometheus_lines(),
+            *self.queue_depth_histogram.prometheus_lines(),
+        ]
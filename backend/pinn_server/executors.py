@@ -0,0 +1,144 @@
+"""
+Bounded executors for CPU-bound work dispatched from the asyncio handlers.
+
+Every FastAPI handler runs on the event loop, so synchronous torch inference,
+volume synthesis, GLB export, document parsing or a training loop executed
+inline stalls every other request and the WebSocket pings. Handlers instead
+``await executor.run(fn, *args)``; the server keeps three executors:
+
+- ``compute_executor``: thread pool for torch and NumPy work, which release
+  the GIL in their kernels.
+- ``parser_executor``: process pool for the pure-Python PDF/DICOM parsers,
+  which hold the GIL.
+- ``training_executor``: single thread that runs the central training loop
+  so it never competes with inference for a compute slot.
+
+Each executor records how long work waited for a free worker and how long it
+ran, exported on /metrics.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from pinn_server.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_SECONDS_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _timed_call(fn: Callable[..., Any], *args, **kwargs) -> Tuple[float, Any]:
+    """Run ``fn`` in the worker and report its (wall-clock) start time."""
+    started = time.time()
+    return started, fn(*args, **kwargs)
+
+
+class InstrumentedExecutor:
+    """
+    Fixed-size thread or process pool with queue-wait instrumentation.
+
+    The pool is created on first use (or by start()) and at most
+    ``max_workers`` tasks run at once; further submissions queue until a
+    worker frees up. Functions sent to a process pool and their arguments
+    must be picklable, i.e. defined at module level. ``initializer`` runs
+    once in every worker when it starts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        kind: str = "thread",
+        initializer: Optional[Callable[[], Any]] = None
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind '{kind}', expected 'thread' or 'process'")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.initializer = initializer
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.queue_wait_histogram = Histogram(
+            f"endotwin_executor_{name}_queue_wait_seconds",
+            "Time tasks waited for a free worker",
+            _SECONDS_BUCKETS
+        )
+        self.run_time_histogram = Histogram(
+            f"endotwin_executor_{name}_run_seconds",
+            "Time tasks spent running on a worker",
+            _SECONDS_BUCKETS
+        )
+
+    @property
+    def pending(self) -> int:
+        """Tasks submitted and not yet finished (queued or running)."""
+        return self._pending
+
+    def start(self):
+        """Create the worker pool if it does not exist yet."""
+        with self._lock:
+            if self._pool is not None:
+                return
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"endotwin-{self.name}",
+                    initializer=self.initializer
+                )
+            else:
+                # Spawned workers do not inherit locks held by torch/logging threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer
+                )
+        logger.info(f"Executor '{self.name}' started ({self.kind}, max_workers={self.max_workers})")
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool; it is recreated on the next run()."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        Exceptions raised by ``fn`` propagate to the caller.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._pending += 1
+        try:
+            started, result = await loop.run_in_executor(
+                self._pool, functools.partial(_timed_call, fn, *args, **kwargs)
+            )
+        finally:
+            self._pending -= 1
+        finished = time.time()
+
+        self.queue_wait_histogram.observe(max(0.0, started - submitted))
+        self.run_time_histogram.observe(max(0.0, finished - started))
+        return result
+
+    def prometheus_lines(self) -> List[str]:
+        prefix = f"endotwin_executor_{self.name}"
+        return [
+            f"# HELP {prefix}_workers Configured worker count",
+            f"# TYPE {prefix}_workers gauge",
+            f"{prefix}_workers {self.max_workers}",
+            f"# HELP {prefix}_pending Tasks queued or running",
+            f"# TYPE {prefix}_pending gauge",
+            f"{prefix}_pending {self.pending}",
+            *self.queue_wait_histogram.prometheus_lines(),
+            *self.run_time_histogram.prometheus_lines(),
+        ]
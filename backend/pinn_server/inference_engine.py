@@ -0,0 +1,256 @@
+"""
+Frozen, inference-only export of EndoPINN for serving.
+
+The training-time EndoPINN runs separate Linear and BatchNorm ops, marks the
+spatial coordinates as requiring grad and always evaluates the displacement
+head, none of which /predict needs. The export below:
+
+- folds ``fusion_bn`` and ``batch_norms`` (running statistics) into the
+  preceding Linear weights,
+- drops the spatial-coordinate columns of the fusion layer, since serving
+  always scores the origin (zero coordinates),
+- drops the displacement head,
+- optionally applies dynamic int8 quantization to every Linear layer
+  (weights stored as int8, activations quantized on the fly), for CPU-only
+  deployments,
+- scripts and freezes the result with TorchScript.
+
+Dropout stays active in the frozen graph so Monte Carlo sampling works
+unchanged; samples are drawn by tiling the batch as in
+EndoPINN._mc_forward_tiled(). Because folding uses the running statistics,
+the engine matches EndoPINN with ``apply_batch_norm=True``.
+
+The artifact is saved next to ``pinn_latest.pth`` (see ENGINE_FILENAMES) and
+records the checkpoint version it was exported from.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Tuple
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+from pinn_server.model import EndoPINN, mc_confidence, adaptive_mc_sampling
+
+logger = logging.getLogger(__name__)
+
+SERVING_PRECISIONS = ("fp32", "int8")
+ENGINE_FILENAMES = {
+    "fp32": "pinn_latest.frozen.pt",
+    "int8": "pinn_latest.frozen-int8.pt",
+}
+ENGINE_FILENAME = ENGINE_FILENAMES["fp32"]
+_VERSION_FILE = "source_version"
+
+
+def fold_batch_norm(linear: nn.Linear, bn: nn.BatchNorm1d) -> nn.Linear:
+    """
+    Return a Linear layer equivalent to ``bn(linear(x))`` with BatchNorm in eval mode.
+
+    W' = W * s[:, None], b' = (b - running_mean) * s + beta, s = gamma / sqrt(running_var + eps)
+    """
+    with torch.no_grad():
+        scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+        bias = linear.bias if linear.bias is not None else torch.zeros_like(bn.running_mean)
+
+        fused = nn.Linear(linear.in_features, linear.out_features)
+        fused.weight.copy_(linear.weight * scale[:, None])
+        fused.bias.copy_((bias - bn.running_mean) * scale + bn.bias)
+    return fused
+
+
+class FrozenEndoPINN(nn.Module):
+    """
+    Inference-only EndoPINN trunk with the prediction and stiffness heads.
+
+    forward() draws ``mc_samples`` dropout samples in one pass and returns
+    (predictions, stiffnesses), each shaped (mc_samples, batch_size, 1).
+    """
+
+    def __init__(self, model: EndoPINN):
+        super().__init__()
+        self.dropout_prob = float(model.dropout_prob)
+        feature_dim = model.imaging_dim + model.clinical_dim + model.pathology_dim
+
+        # Serving scores zero spatial coordinates, so their weight columns drop out
+        fusion = fold_batch_norm(model.fusion, model.fusion_bn)
+        trunk = nn.Linear(feature_dim, fusion.out_features)
+        with torch.no_grad():
+            trunk.weight.copy_(fusion.weight[:, :feature_dim])
+            trunk.bias.copy_(fusion.bias)
+
+        self.trunk = nn.ModuleList(
+            [trunk] + [fold_batch_norm(hidden, bn) for hidden, bn in zip(model.hidden_layers, model.batch_norms)]
+        )
+        self.prediction_hidden = _copy_linear(model.prediction_head[0])
+        self.prediction_out = _copy_linear(model.prediction_head[3])
+        self.stiffness_hidden = _copy_linear(model.stiffness_head[0])
+        self.stiffness_out = _copy_linear(model.stiffness_head[3])
+
+    def forward(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        mc_samples: int
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        batch_size = imaging_features.size(0)
+
+        # Sample-major tiling: rows [k * B, (k + 1) * B) hold MC sample k
+        x = torch.cat([imaging_features, clinical_features, pathology_features], dim=1).repeat(mc_samples, 1)
+        for layer in self.trunk:
+            x = F.dropout(F.relu(layer(x)), self.dropout_prob, True)
+
+        predictions = torch.sigmoid(self.prediction_out(
+            F.dropout(F.relu(self.prediction_hidden(x)), self.dropout_prob, True)
+        ))
+        stiffnesses = F.softplus(self.stiffness_out(
+            F.dropout(F.relu(self.stiffness_hidden(x)), self.dropout_prob, True)
+        )) * 15.0
+
+        return predictions.view(mc_samples, batch_size, 1), stiffnesses.view(mc_samples, batch_size, 1)
+
+
+def _copy_linear(linear: nn.Linear) -> nn.Linear:
+    copied = nn.Linear(linear.in_features, linear.out_features)
+    copied.load_state_dict(linear.state_dict())
+    return copied
+
+
+class InferenceEngine:
+    """
+    Serving wrapper around a frozen TorchScript FrozenEndoPINN.
+
+    Exposes the same Monte Carlo prediction methods as EndoPINN (with
+    BatchNorm always applied) so the server can use either interchangeably.
+    """
+
+    def __init__(self, module: torch.jit.ScriptModule, source_version: str = "", precision: str = "fp32"):
+        self.module = module
+        self.source_version = source_version
+        self.precision = precision
+
+    def sample(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        mc_samples: int
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Draw ``mc_samples`` dropout samples, each shaped (mc_samples, batch_size, 1)."""
+        with torch.no_grad():
+            return self.module(imaging_features, clinical_features, pathology_features, mc_samples)
+
+    def predict_with_confidence(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        mc_samples: int = 10
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Monte Carlo prediction; see EndoPINN.predict_with_confidence()."""
+        predictions, stiffnesses = self.sample(imaging_features, clinical_features, pathology_features, mc_samples)
+        return mc_confidence(predictions, stiffnesses)
+
+    def predict_with_adaptive_confidence(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        tolerance: float = 0.02,
+        min_samples: int = 4,
+        max_samples: int = 50,
+        chunk_size: int = 4
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, int]:
+        """Monte Carlo prediction with early exit; see EndoPINN.predict_with_adaptive_confidence()."""
+        return adaptive_mc_sampling(
+            lambda n: self.sample(imaging_features, clinical_features, pathology_features, n),
+            tolerance=tolerance,
+            min_samples=min_samples,
+            max_samples=max_samples,
+            chunk_size=chunk_size
+        )
+
+    def save(self, path: str):
+        """Save the frozen module with its source checkpoint version."""
+        torch.jit.save(self.module, path, _extra_files={_VERSION_FILE: self.source_version})
+        logger.info(f"Saved inference engine to {path}")
+
+
+def quantize_linear_layers(module: nn.Module) -> nn.Module:
+    """Apply dynamic int8 quantization to every Linear layer of ``module`` (CPU only)."""
+    return torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+
+
+def build_inference_engine(model: EndoPINN, source_version: str = "", precision: str = "fp32") -> InferenceEngine:
+    """
+    Fold, script and freeze a trained EndoPINN.
+
+    Args:
+        model: Trained model (left unchanged)
+        source_version: Version of the checkpoint the weights come from
+        precision: 'fp32', or 'int8' for dynamically quantized Linear layers
+
+    Returns:
+        InferenceEngine on the model's device (always CPU for 'int8')
+    """
+    if precision not in SERVING_PRECISIONS:
+        raise ValueError(f"Unsupported serving precision '{precision}', expected one of {list(SERVING_PRECISIONS)}")
+
+    device = next(model.parameters()).device
+    frozen = FrozenEndoPINN(model).eval()
+    if precision == "int8":
+        frozen = quantize_linear_layers(frozen)
+    else:
+        frozen = frozen.to(device)
+    module = torch.jit.freeze(torch.jit.script(frozen))
+    return InferenceEngine(module, source_version, precision)
+
+
+def export_inference_engine(
+    model: EndoPINN,
+    path: str,
+    source_version: str = "",
+    precision: str = "fp32"
+) -> InferenceEngine:
+    """Build the inference engine for ``model`` and save it to ``path``."""
+    engine = build_inference_engine(model, source_version, precision)
+    engine.save(path)
+    return engine
+
+
+def load_inference_engine(
+    path: str,
+    device: str = "cpu",
+    expected_version: Optional[str] = None,
+    precision: str = "fp32"
+) -> Optional[InferenceEngine]:
+    """
+    Load a saved inference engine.
+
+    ``precision`` must match the one the artifact was exported with (see
+    ENGINE_FILENAMES). Returns None if the file is missing, unreadable, or
+    was exported from a checkpoint other than ``expected_version``.
+    """
+    if not Path(path).exists():
+        return None
+
+    extra_files = {_VERSION_FILE: ""}
+    try:
+        # Quantized modules only run on the CPU
+        module = torch.jit.load(path, map_location="cpu" if precision == "int8" else device, _extra_files=extra_files)
+    except Exception as e:
+        logger.warning(f"Could not load inference engine from {path}: {e}")
+        return None
+
+    source_version = extra_files[_VERSION_FILE]
+    if isinstance(source_version, bytes):
+        source_version = source_version.decode()
+    if expected_version is not None and source_version != expected_version:
+        logger.info(f"Inference engine at {path} is stale ({source_version} != {expected_version})")
+        return None
+
+    logger.info(f"Loaded inference engine from {path}")
+    return InferenceEngine(module, source_version, precision)
@@ -0,0 +1,51 @@
+"""
+Minimal Prometheus metric helpers for the /metrics endpoint.
+
+The server renders its metrics by hand in the Prometheus text format; these
+helpers cover the cases that need more than a single line.
+"""
+
+import threading
+from typing import List, Sequence
+
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = sorted(buckets)
+        self._counts = [0] * len(self.buckets)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def prometheus_lines(self) -> List[str]:
+        with self._lock:
+            lines = [
+                f"# HELP {self.name} {self.help_text}",
+                f"# TYPE {self.name} histogram",
+            ]
+            for bound, count in zip(self.buckets, self._counts):
+                lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {self._count}')
+            lines.append(f"{self.name}_sum {self._sum:g}")
+            lines.append(f"{self.name}_count {self._count}")
+            return lines
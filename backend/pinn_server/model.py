@@ -5,14 +5,22 @@ This model combines multi-modal features from federated nodes and applies
 physics-based constraints derived from tissue biomechanics.
 """
 
+import copy
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import Tuple, Optional
+from typing import Callable, Dict, Iterable, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output heads of EndoPINN, in the order forward() returns them
+HEADS = ("prediction", "stiffness", "displacement")
+
+# Precisions of the data path (trunk and heads) during training
+TRAINING_PRECISIONS = ("fp32", "bf16")
+
 
 class EndoPINN(nn.Module):
     """
@@ -138,17 +146,93 @@ class EndoPINN(nn.Module):
             stiffness: (batch_size, 1) - Tissue stiffness in kPa
             displacement: (batch_size, 3) - Tissue displacement vector
         """
+        outputs = self.forward_heads(
+            imaging_features, clinical_features, pathology_features, spatial_coords,
+            heads=HEADS, coords_requires_grad=True
+        )
+        return outputs["prediction"], outputs["stiffness"], outputs["displacement"]
+
+    def forward_heads(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        spatial_coords: Optional[torch.Tensor] = None,
+        heads: Iterable[str] = ("prediction", "stiffness"),
+        coords_requires_grad: bool = False,
+        apply_batch_norm: Optional[bool] = None
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Forward pass that only evaluates the requested output heads.
+
+        Inference only consumes the prediction and stiffness heads and never
+        differentiates with respect to the spatial coordinates, so it can skip
+        the displacement head and the coordinate autograd setup. forward()
+        is this method with every head and coordinate gradients enabled, as
+        the Navier-Cauchy physics loss requires.
+
+        Args:
+            spatial_coords: (batch_size, 3) coordinates; zeros if absent
+            heads: Subset of HEADS to compute
+            coords_requires_grad: Mark ``spatial_coords`` as requiring grad
+            apply_batch_norm: Force BatchNorm on or off; defaults to skipping
+                it for a batch of one
+
+        Returns:
+            Dict mapping each requested head name to its output
+        """
+        heads = tuple(heads)
+        unknown = set(heads) - set(HEADS)
+        if unknown:
+            raise ValueError(f"Unknown heads {sorted(unknown)}, expected a subset of {list(HEADS)}")
+
         if spatial_coords is None:
             spatial_coords = torch.zeros((imaging_features.size(0), self.spatial_dim), device=imaging_features.device)
+        if coords_requires_grad:
             # Ensure coordinates have requires_grad for Navier-Cauchy
-        spatial_coords.requires_grad_(True)
-            
+            spatial_coords.requires_grad_(True)
+
+        # BatchNorm requires batch size > 1
+        if apply_batch_norm is None:
+            apply_batch_norm = imaging_features.size(0) > 1
+        x = self._encode(
+            imaging_features, clinical_features, pathology_features, spatial_coords,
+            apply_batch_norm=apply_batch_norm
+        )
+        return self._apply_heads(x, heads)
+
+    def _apply_heads(self, x: torch.Tensor, heads: Tuple[str, ...]) -> Dict[str, torch.Tensor]:
+        """Evaluate the requested output heads on the shared trunk features."""
+        outputs = {}
+        if "prediction" in heads:
+            outputs["prediction"] = self.prediction_head(x)
+        if "stiffness" in heads:
+            # Scale stiffness to reasonable range (0-15 kPa)
+            outputs["stiffness"] = self.stiffness_head(x) * 15.0
+        if "displacement" in heads:
+            outputs["displacement"] = self.displacement_head(x)
+        return outputs
+
+    def _encode(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        spatial_coords: torch.Tensor,
+        apply_batch_norm: bool
+    ) -> torch.Tensor:
+        """
+        Shared trunk: feature fusion and hidden layers.
+
+        ``apply_batch_norm`` is decided by the caller so that a tiled Monte
+        Carlo batch behaves exactly like the original (possibly size-1) batch.
+        """
         # Concatenate all features
         x = torch.cat([imaging_features, clinical_features, pathology_features, spatial_coords], dim=1)
         
         # Fusion layer
         x = self.fusion(x)
-        if x.size(0) > 1:  # BatchNorm requires batch size > 1
+        if apply_batch_norm:
             x = self.fusion_bn(x)
         x = F.relu(x)
         x = self.dropout(x)
@@ -156,21 +240,55 @@ class EndoPINN(nn.Module):
         # Hidden layers
         for hidden, bn in zip(self.hidden_layers, self.batch_norms):
             x = hidden(x)
-            if x.size(0) > 1:
+            if apply_batch_norm:
                 x = bn(x)
             x = F.relu(x)
             x = self.dropout(x)
-        
-        # Output heads
-        prediction = self.prediction_head(x)
-        stiffness = self.stiffness_head(x)
-        displacement = self.displacement_head(x)
-        
-        # Scale stiffness to reasonable range (0-15 kPa)
-        stiffness = stiffness * 15.0
-        
-        return prediction, stiffness, displacement
-    
+
+        return x
+
+    def fuse_features(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor
+    ) -> torch.Tensor:
+        """
+        Coordinate-independent part of the fusion layer, (batch_size, hidden_dims[0]).
+
+        ``fusion(cat([features, coords]))`` equals this plus the coordinate
+        columns of the fusion weight applied to ``coords``.
+        """
+        features = torch.cat([imaging_features, clinical_features, pathology_features], dim=1)
+        return F.linear(features, self.fusion.weight[:, :-self.spatial_dim], self.fusion.bias)
+
+    def point_displacement(
+        self,
+        spatial_coord: torch.Tensor,
+        fused_features: torch.Tensor,
+        apply_batch_norm: bool = True
+    ) -> torch.Tensor:
+        """
+        Displacement at a single point, for per-point derivatives with torch.func.
+
+        Takes one coordinate (3,) and that point's row of fuse_features(), and
+        returns (3,). Only the coordinate columns of the fusion layer are
+        evaluated here, so derivative passes skip the wide feature matmul.
+        Dropout is off and BatchNorm uses the running statistics as a fixed
+        affine map, so the field at one point does not depend on the rest of
+        the batch and can be differentiated to any order.
+        """
+        x = fused_features + F.linear(spatial_coord, self.fusion.weight[:, -self.spatial_dim:])
+        for linear, bn in zip([None, *self.hidden_layers], [self.fusion_bn, *self.batch_norms]):
+            if linear is not None:
+                x = linear(x)
+            if apply_batch_norm:
+                x = (x - bn.running_mean) * (bn.weight / torch.sqrt(bn.running_var + bn.eps)) + bn.bias
+            x = F.relu(x)
+
+        hidden, _, _, out = self.displacement_head
+        return out(F.relu(hidden(x)))
+
     def enable_mc_dropout(self):
         """Force dropout layers active during evaluation for Monte Carlo Uncertainty."""
         for m in self.modules():
@@ -183,10 +301,20 @@ class EndoPINN(nn.Module):
         clinical_features: torch.Tensor,
         pathology_features: torch.Tensor,
         spatial_coords: Optional[torch.Tensor] = None,
-        mc_samples: int = 10
+        mc_samples: int = 10,
+        vectorized: bool = True,
+        apply_batch_norm: Optional[bool] = None
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         Make prediction with rigorous Monte Carlo Dropout uncertainty quantification.
+
+        Args:
+            mc_samples: Number of stochastic forward passes
+            vectorized: Tile the batch ``mc_samples`` times and draw every
+                sample in a single forward pass with independent dropout
+                masks, instead of looping over ``mc_samples`` passes
+            apply_batch_norm: Force BatchNorm (running statistics) on or off.
+                Defaults to forward()'s rule of skipping it for a batch of one
         
         Returns:
             prediction: Mean Endometriosis probability (0-1)
@@ -197,46 +325,251 @@ class EndoPINN(nn.Module):
         self.eval()
         self.enable_mc_dropout()
         
-        predictions = []
-        stiffnesses = []
-        
         with torch.no_grad():
-            from torch.utils._pytree import tree_map # For older torch ignore gradient requirement, but MC Dropout evaluates
-            # Actually, standard forward pass with dropout requires inference mode off or standard no_grad
             # Since MC Dropout is active, dropout will inject variance into forward passes.
-            for _ in range(mc_samples):
-                pred, stiff, _ = self.forward(
-                    imaging_features, clinical_features, pathology_features, spatial_coords
+            if vectorized:
+                predictions, stiffnesses = self._mc_forward_tiled(
+                    imaging_features, clinical_features, pathology_features, spatial_coords,
+                    mc_samples, apply_batch_norm
                 )
-                predictions.append(pred)
-                stiffnesses.append(stiff)
-        
-        # Stack and calculate statistics
-        predictions = torch.stack(predictions)
-        stiffnesses = torch.stack(stiffnesses)
-        
-        mean_prediction = predictions.mean(dim=0)
-        mean_stiffness = stiffnesses.mean(dim=0)
-        
-        # Variance as uncertainty
-        stiffness_variance = stiffnesses.var(dim=0)
+            else:
+                samples = [
+                    self._mc_forward_tiled(
+                        imaging_features, clinical_features, pathology_features, spatial_coords,
+                        1, apply_batch_norm
+                    )
+                    for _ in range(mc_samples)
+                ]
+
+                # Stack samples along a leading axis
+                predictions = torch.cat([pred for pred, _ in samples])
+                stiffnesses = torch.cat([stiff for _, stiff in samples])
         
-        # Confidence is inversely proportional to variance. 
-        # Standard deviation of +/- 2 kPa gives near 0% confidence.
-        # std = sqrt(var). If std == 0, conf = 1.0. If std >= 2.0, conf = 0.0
-        std = torch.sqrt(stiffness_variance)
-        confidence = 1.0 - torch.clamp(std / 2.0, 0.0, 1.0)
+        mean_prediction, mean_stiffness, confidence = mc_confidence(predictions, stiffnesses)
         
         # Return model to normal eval mode (disable dropout)
         self.eval()
         
-        return mean_prediction, mean_stiffness, confidence.unsqueeze(-1) if confidence.dim() == 1 else confidence
+        return mean_prediction, mean_stiffness, confidence
+
+    def predict_with_adaptive_confidence(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        spatial_coords: Optional[torch.Tensor] = None,
+        tolerance: float = 0.02,
+        min_samples: int = 4,
+        max_samples: int = 50,
+        chunk_size: int = 4,
+        apply_batch_norm: Optional[bool] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, int]:
+        """
+        Monte Carlo Dropout with a convergence-based early exit.
+
+        Samples are drawn ``chunk_size`` at a time (each chunk in one tiled
+        forward pass) and folded into a running Welford mean/variance of the
+        prediction and stiffness. Sampling stops once the standard error of
+        the confidence score is below ``tolerance`` for every row, or when
+        ``max_samples`` is reached.
+
+        The standard error uses the normal approximation
+        SE(std) ≈ std / sqrt(2 (n - 1)); confidence = 1 - std / 2, so
+        SE(confidence) ≈ SE(std) / 2.
+
+        ``apply_batch_norm`` behaves as in predict_with_confidence().
+
+        Returns:
+            prediction: Mean Endometriosis probability (0-1)
+            stiffness: Mean Tissue stiffness
+            confidence: Confidence score (1 - normalized variance)
+            samples_used: Number of MC samples actually drawn
+        """
+        self.eval()
+        self.enable_mc_dropout()
+
+        with torch.no_grad():
+            result = adaptive_mc_sampling(
+                lambda n: self._mc_forward_tiled(
+                    imaging_features, clinical_features, pathology_features, spatial_coords,
+                    n, apply_batch_norm
+                ),
+                tolerance=tolerance,
+                min_samples=min_samples,
+                max_samples=max_samples,
+                chunk_size=chunk_size
+            )
+
+        # Return model to normal eval mode (disable dropout)
+        self.eval()
+
+        return result
+
+    def _mc_forward_tiled(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        spatial_coords: Optional[torch.Tensor],
+        mc_samples: int,
+        apply_batch_norm: Optional[bool] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Draw all Monte Carlo samples in one forward pass.
+
+        Unless ``apply_batch_norm`` is given, BatchNorm follows the untiled
+        batch size exactly like forward().
+
+        Returns:
+            predictions: (mc_samples, batch_size, 1)
+            stiffnesses: (mc_samples, batch_size, 1)
+        """
+        batch_size = imaging_features.size(0)
+        if spatial_coords is None:
+            spatial_coords = torch.zeros((batch_size, self.spatial_dim), device=imaging_features.device)
+
+        # Sample-major tiling: rows [k * B, (k + 1) * B) hold MC sample k
+        tiled = [
+            t.repeat(mc_samples, 1)
+            for t in (imaging_features, clinical_features, pathology_features, spatial_coords)
+        ]
+
+        # Keep the BatchNorm decision of the untiled batch
+        if apply_batch_norm is None:
+            apply_batch_norm = batch_size > 1
+        x = self._encode(*tiled, apply_batch_norm=apply_batch_norm)
+        outputs = self._apply_heads(x, ("prediction", "stiffness"))
+
+        return (
+            outputs["prediction"].view(mc_samples, batch_size, -1),
+            outputs["stiffness"].view(mc_samples, batch_size, -1),
+        )
+
+
+def training_autocast(precision: str, device_type: str = "cpu") -> torch.autocast:
+    """
+    Autocast context for the data-path forward of a training step.
+
+    'bf16' runs the trunk and heads under bfloat16 autocast; 'fp32' returns a
+    disabled context. Callers cast the outputs back to fp32 before the losses
+    and evaluate the physics derivatives (point_displacement) outside the
+    context, where second derivatives keep full precision.
+    """
+    if precision not in TRAINING_PRECISIONS:
+        raise ValueError(f"Unknown training precision '{precision}', expected one of {list(TRAINING_PRECISIONS)}")
+    return torch.autocast(device_type, dtype=torch.bfloat16, enabled=precision == "bf16")
+
+
+def mc_confidence(
+    predictions: torch.Tensor,
+    stiffnesses: torch.Tensor
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    """
+    Reduce Monte Carlo samples (leading axis) to means and a confidence score.
+
+    Returns:
+        prediction: Mean Endometriosis probability (0-1)
+        stiffness: Mean Tissue stiffness
+        confidence: Confidence score (1 - normalized variance)
+    """
+    mean_prediction = predictions.mean(dim=0)
+    mean_stiffness = stiffnesses.mean(dim=0)
+    
+    # Variance as uncertainty
+    stiffness_variance = stiffnesses.var(dim=0)
+    
+    # Confidence is inversely proportional to variance. 
+    # Standard deviation of +/- 2 kPa gives near 0% confidence.
+    # std = sqrt(var). If std == 0, conf = 1.0. If std >= 2.0, conf = 0.0
+    std = torch.sqrt(stiffness_variance)
+    confidence = 1.0 - torch.clamp(std / 2.0, 0.0, 1.0)
+
+    return mean_prediction, mean_stiffness, confidence.unsqueeze(-1) if confidence.dim() == 1 else confidence
+
+
+def adaptive_mc_sampling(
+    sample_fn: Callable[[int], Tuple[torch.Tensor, torch.Tensor]],
+    tolerance: float = 0.02,
+    min_samples: int = 4,
+    max_samples: int = 50,
+    chunk_size: int = 4
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, int]:
+    """
+    Draw Monte Carlo samples until the confidence score has converged.
+
+    ``sample_fn(n)`` returns ``n`` (predictions, stiffnesses) samples stacked
+    on a leading axis. See EndoPINN.predict_with_adaptive_confidence() for
+    the stopping rule.
+
+    Returns:
+        (prediction, stiffness, confidence, samples_used)
+    """
+    min_samples = max(2, min_samples)
+    max_samples = max(min_samples, max_samples)
+
+    count = 0
+    pred_stats = stiff_stats = None
+
+    while count < max_samples:
+        n_chunk = min(chunk_size, max_samples - count)
+        predictions, stiffnesses = sample_fn(n_chunk)
+        pred_stats = _welford_merge(pred_stats, predictions)
+        stiff_stats = _welford_merge(stiff_stats, stiffnesses)
+        count = stiff_stats[0]
+
+        if count >= min_samples:
+            std = torch.sqrt(stiff_stats[2] / (count - 1))
+            confidence_se = std / (2.0 * (2.0 * (count - 1)) ** 0.5)
+            # Clamped confidences (std >= 2 kPa) are already settled at 0
+            confidence_se = torch.where(std >= 2.0, torch.zeros_like(confidence_se), confidence_se)
+            if confidence_se.max().item() < tolerance:
+                break
+
+    _, mean_prediction, _ = pred_stats
+    _, mean_stiffness, stiffness_m2 = stiff_stats
+
+    std = torch.sqrt(stiffness_m2 / (count - 1))
+    confidence = 1.0 - torch.clamp(std / 2.0, 0.0, 1.0)
+
+    return mean_prediction, mean_stiffness, confidence, count
+
+
+def _welford_merge(
+    stats: Optional[Tuple[int, torch.Tensor, torch.Tensor]],
+    samples: torch.Tensor
+) -> Tuple[int, torch.Tensor, torch.Tensor]:
+    """
+    Fold a chunk of samples into running (count, mean, M2) statistics.
+
+    Uses Chan et al.'s pairwise update so a whole chunk of samples
+    (leading axis) is merged at once. The unbiased variance is M2 / (count - 1).
+    """
+    n_b = samples.size(0)
+    mean_b = samples.mean(dim=0)
+    m2_b = ((samples - mean_b) ** 2).sum(dim=0)
+    if stats is None:
+        return n_b, mean_b, m2_b
+
+    n_a, mean_a, m2_a = stats
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * (n_b / n)
+    m2 = m2_a + m2_b + delta ** 2 * (n_a * n_b / n)
+    return n, mean, m2
 
 
 class EnsemblePINN(nn.Module):
     """
     Ensemble of multiple PINN models for robust predictions.
     Useful for uncertainty quantification.
+
+    In eval mode the members run as one vectorized forward: their parameters
+    and buffers are stacked with torch.func.stack_module_state and every
+    layer is evaluated for all members at once as a batched matmul
+    (torch.baddbmm), so an ensemble costs about as many kernel launches as a
+    single model. The vectorized forward does not backpropagate into the
+    members, so training mode keeps the per-member loop (which also lets
+    BatchNorm update its running statistics).
     """
     
     def __init__(
@@ -254,6 +587,8 @@ class EnsemblePINN(nn.Module):
         self.models = nn.ModuleList([
             EndoPINN(**pinn_kwargs) for _ in range(num_models)
         ])
+        # Stacked member weights for the vectorized forward; rebuilt on demand
+        self._stacked: Optional[Dict[str, torch.Tensor]] = None
         
         logger.info(f"Initialized Ensemble with {num_models} models")
     
@@ -262,26 +597,42 @@ class EnsemblePINN(nn.Module):
         imaging_features: torch.Tensor,
         clinical_features: torch.Tensor,
         pathology_features: torch.Tensor,
-        spatial_coords: Optional[torch.Tensor] = None
+        spatial_coords: Optional[torch.Tensor] = None,
+        vectorized: Optional[bool] = None
     ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """
         Forward pass through ensemble.
+
+        Args:
+            vectorized: Evaluate all members in one batched-matmul forward. Defaults
+                to True in eval mode and False in training mode
         
         Returns:
             mean_prediction: Average prediction
             mean_stiffness: Average stiffness
             std_prediction: Standard deviation (uncertainty)
         """
-        predictions = []
-        stiffnesses = []
-        
-        for model in self.models:
-            pred, stiff, _ = model(imaging_features, clinical_features, pathology_features, spatial_coords)
-            predictions.append(pred)
-            stiffnesses.append(stiff)
-        
-        predictions = torch.stack(predictions)
-        stiffnesses = torch.stack(stiffnesses)
+        if vectorized is None:
+            vectorized = not self.training
+        if vectorized and self.training:
+            raise ValueError("The vectorized ensemble forward is inference-only; call eval() first")
+
+        if vectorized:
+            predictions, stiffnesses = self._vectorized_members(
+                imaging_features, clinical_features, pathology_features, spatial_coords
+            )
+        else:
+            predictions = []
+            stiffnesses = []
+            
+            for model in self.models:
+                # The ensemble never uses displacement or coordinate gradients
+                outputs = model.forward_heads(imaging_features, clinical_features, pathology_features, spatial_coords)
+                predictions.append(outputs["prediction"])
+                stiffnesses.append(outputs["stiffness"])
+            
+            predictions = torch.stack(predictions)
+            stiffnesses = torch.stack(stiffnesses)
         
         mean_pred = predictions.mean(dim=0)
         mean_stiff = stiffnesses.mean(dim=0)
@@ -289,6 +640,97 @@ class EnsemblePINN(nn.Module):
         
         return mean_pred, mean_stiff, std_pred
 
+    def _stacked_state(self) -> Dict[str, torch.Tensor]:
+        """
+        Return member parameters stacked on a leading (member) axis.
+
+        BatchNorm running statistics are pre-reduced to a per-feature scale
+        and shift. The stack is a copy built on first use; it is dropped by
+        train()/eval(), load_state_dict() and device/dtype moves. Call
+        invalidate_stacked_state() after modifying members in place directly.
+        """
+        if self._stacked is None:
+            params, buffers = torch.func.stack_module_state(list(self.models))
+            stacked = {name: value.detach() for name, value in params.items()}
+
+            member = self.models[0]
+            norms = {"fusion_bn": member.fusion_bn}
+            norms.update({f"batch_norms.{i}": bn for i, bn in enumerate(member.batch_norms)})
+            for name, bn in norms.items():
+                scale = stacked[f"{name}.weight"] / torch.sqrt(buffers[f"{name}.running_var"] + bn.eps)
+                stacked[f"{name}.scale"] = scale.unsqueeze(1)
+                stacked[f"{name}.shift"] = (stacked[f"{name}.bias"] - buffers[f"{name}.running_mean"] * scale).unsqueeze(1)
+            self._stacked = stacked
+        return self._stacked
+
+    def invalidate_stacked_state(self):
+        """Drop the stacked member weights used by the vectorized forward."""
+        self._stacked = None
+
+    def train(self, mode: bool = True):
+        self.invalidate_stacked_state()
+        return super().train(mode)
+
+    def load_state_dict(self, *args, **kwargs):
+        self.invalidate_stacked_state()
+        return super().load_state_dict(*args, **kwargs)
+
+    def _apply(self, fn, *args, **kwargs):
+        self.invalidate_stacked_state()
+        return super()._apply(fn, *args, **kwargs)
+
+    def _vectorized_members(
+        self,
+        imaging_features: torch.Tensor,
+        clinical_features: torch.Tensor,
+        pathology_features: torch.Tensor,
+        spatial_coords: Optional[torch.Tensor]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Evaluate every member's prediction and stiffness heads in one pass.
+
+        Mirrors EndoPINN.forward_heads() layer by layer, including the
+        batch-of-one BatchNorm rule and dropout when it is switched on for
+        Monte Carlo sampling (each member draws its own masks).
+
+        Returns:
+            predictions: (num_models, batch_size, 1)
+            stiffnesses: (num_models, batch_size, 1)
+        """
+        stacked = self._stacked_state()
+        member = self.models[0]
+        num_models = len(self.models)
+        batch_size = imaging_features.size(0)
+
+        if spatial_coords is None:
+            spatial_coords = torch.zeros((batch_size, member.spatial_dim), device=imaging_features.device)
+
+        def linear(x: torch.Tensor, name: str) -> torch.Tensor:
+            return torch.baddbmm(stacked[f"{name}.bias"].unsqueeze(1), x, stacked[f"{name}.weight"].transpose(1, 2))
+
+        def dropout(x: torch.Tensor, module: nn.Module) -> torch.Tensor:
+            return F.dropout(x, module.p, module.training)
+
+        apply_batch_norm = batch_size > 1
+        x = torch.cat([imaging_features, clinical_features, pathology_features, spatial_coords], dim=1)
+        x = x.unsqueeze(0).expand(num_models, -1, -1)
+
+        layers = [("fusion", "fusion_bn")]
+        layers += [(f"hidden_layers.{i}", f"batch_norms.{i}") for i in range(len(member.hidden_layers))]
+        for linear_name, bn_name in layers:
+            x = linear(x, linear_name)
+            if apply_batch_norm:
+                x = x * stacked[f"{bn_name}.scale"] + stacked[f"{bn_name}.shift"]
+            x = dropout(F.relu(x), member.dropout)
+
+        prediction = dropout(F.relu(linear(x, "prediction_head.0")), member.prediction_head[2])
+        prediction = torch.sigmoid(linear(prediction, "prediction_head.3"))
+
+        stiffness = dropout(F.relu(linear(x, "stiffness_head.0")), member.stiffness_head[2])
+        stiffness = F.softplus(linear(stiffness, "stiffness_head.3")) * 15.0
+
+        return prediction, stiffness
+
 
 def load_model(checkpoint_path: str, device: str = 'cpu') -> EndoPINN:
     """
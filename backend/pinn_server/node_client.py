@@ -0,0 +1,139 @@
+"""
+Shared HTTP client for the federated nodes.
+
+Every call to a node (health probes, feature fetches, training triggers)
+goes through one connection-pooled httpx.AsyncClient, so repeated calls
+reuse keep-alive connections instead of paying a TCP handshake each time.
+Concurrency per node is capped by a semaphore keyed on the node's origin,
+so a burst of calls to one slow node cannot take the whole pool.
+
+Each call carries a deadline covering the wait for a connection slot and
+the full request; multi-node operations run such calls concurrently through
+fan_out(), so their wall time is the slowest node's latency rather than the
+sum, with at most ``concurrency`` calls in flight across all nodes.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import httpx
+
+from pinn_server.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def fan_out(fn: Callable[[T], Awaitable[R]], items: Iterable[T], concurrency: int) -> List[R]:
+    """Await ``fn(item)`` for every item, at most ``concurrency`` at a time; results in item order."""
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def _call(item: T) -> R:
+        async with slots:
+            return await fn(item)
+
+    return await asyncio.gather(*(_call(item) for item in items))
+
+
+class NodeClient:
+    """
+    Pooled keep-alive client with per-node concurrency limits and deadlines.
+
+    The underlying client is created by start() (or on first use) and closed
+    by stop(). ``transport`` replaces the network transport, e.g. with an
+    httpx.MockTransport.
+    """
+
+    def __init__(
+        self,
+        per_node_connections: int = 4,
+        max_keepalive_connections: int = 32,
+        keepalive_expiry: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.per_node_connections = max(1, per_node_connections)
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._node_slots: Dict[Tuple[str, str, Optional[int]], asyncio.Semaphore] = {}
+        self.outcomes = {"ok": 0, "error": 0, "timeout": 0}
+        self.latency_histogram = Histogram(
+            "endotwin_node_request_seconds",
+            "Federated node request latency, including the wait for a connection slot",
+            _SECONDS_BUCKETS
+        )
+
+    def start(self):
+        """Create the pooled client if it does not exist yet."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=None,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                transport=self.transport
+            )
+            self._node_slots = {}
+            logger.info(f"Node client started (per-node connections={self.per_node_connections})")
+
+    async def stop(self):
+        """Close the client and its pooled connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def request(self, method: str, url: str, deadline: float, **kwargs) -> httpx.Response:
+        """
+        Send one request to a node and return its response.
+
+        ``deadline`` (seconds) bounds the whole call; asyncio.TimeoutError is
+        raised when it passes and httpx errors propagate.
+        """
+        self.start()
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self._send(method, url, **kwargs), deadline)
+        except asyncio.TimeoutError:
+            self.outcomes["timeout"] += 1
+            raise
+        except Exception:
+            self.outcomes["error"] += 1
+            raise
+        finally:
+            self.latency_histogram.observe(time.perf_counter() - start)
+        self.outcomes["ok"] += 1
+        return response
+
+    async def get(self, url: str, deadline: float, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, deadline, **kwargs)
+
+    async def post(self, url: str, deadline: float, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, deadline, **kwargs)
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self._slots(url):
+            # The deadline above is the real bound; no separate httpx timeout
+            return await self._client.request(method, url, timeout=None, **kwargs)
+
+    def _slots(self, url: str) -> asyncio.Semaphore:
+        parsed = httpx.URL(url)
+        origin = (parsed.scheme, parsed.host, parsed.port)
+        if origin not in self._node_slots:
+            self._node_slots[origin] = asyncio.Semaphore(self.per_node_connections)
+        return self._node_slots[origin]
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            "# HELP endotwin_node_requests_total Federated node requests by outcome",
+            "# TYPE endotwin_node_requests_total counter",
+            *(f'endotwin_node_requests_total{{outcome="{outcome}"}} {count}' for outcome, count in self.outcomes.items()),
+            *self.latency_histogram.prometheus_lines(),
+        ]
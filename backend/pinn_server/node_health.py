@@ -0,0 +1,214 @@
+"""
+Background health polling and circuit breaking for the federated nodes.
+
+Dashboard endpoints (/health, /stats, /status/nodes) used to probe every
+node live on each request, so one unreachable node added its full timeout
+to every refresh. NodeHealthMonitor instead polls all nodes concurrently
+(at most ``concurrency`` probes in flight) every ``interval`` seconds and
+keeps the last result per node (status, latency, ``is_training``) in
+memory; endpoints read that table. A table older than ``ttl`` seconds
+(poller not started yet, or stuck) is refreshed on read, with concurrent
+readers sharing one refresh.
+
+Each node also has a CircuitBreaker fed by the polls and by real calls
+(training triggers, feature fetches). After ``failure_threshold``
+consecutive failures the breaker opens and callers skip the node instead
+of waiting out its deadline; after ``reset_timeout`` seconds one call is
+let through to test it, and any success (including a poll) closes it.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pinn_server.node_client import fan_out
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATES = ("closed", "open", "half_open")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one node."""
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to the node now; half-open lets one trial call through at a time."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Node circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # A failed half-open trial restarts the open period
+            self.opened_at = time.monotonic()
+
+
+class NodeHealthMonitor:
+    """
+    Polled node health table with per-node circuit breakers, keyed by node URL.
+
+    ``nodes_fn()`` returns the current nodes as (key, display name, base
+    URL); ``probe_fn(url)`` returns a dict with ``status`` ('healthy',
+    'unhealthy' or 'unreachable'), ``latency_ms`` and ``is_training``.
+    """
+
+    def __init__(
+        self,
+        probe_fn: Callable[[str], Awaitable[Dict]],
+        nodes_fn: Callable[[], List[Tuple[str, str, str]]],
+        interval: float = 10.0,
+        ttl: float = 30.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        concurrency: int = 32
+    ):
+        self.probe_fn = probe_fn
+        self.nodes_fn = nodes_fn
+        self.interval = interval
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.concurrency = concurrency
+        self._table: Dict[str, Dict] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls_total = 0
+        self.skipped_calls_total = 0
+
+    def start(self):
+        """Start polling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Node health poller started (every {self.interval:g}s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        if url not in self._breakers:
+            self._breakers[url] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[url]
+
+    def allow(self, url: str) -> bool:
+        """Whether a call to the node should be attempted; counts the calls skipped."""
+        allowed = self.breaker(url).allow()
+        if not allowed:
+            self.skipped_calls_total += 1
+        return allowed
+
+    def record(self, url: str, ok: bool):
+        """Feed the outcome of a real call to the node's breaker."""
+        if ok:
+            self.breaker(url).record_success()
+        else:
+            self.breaker(url).record_failure()
+
+    async def statuses(self) -> Dict[str, Dict]:
+        """
+        Latest health of every node, keyed by node key.
+
+        Entries hold name, url, status, latency_ms, is_training, checked_at
+        (unix time of the probe) and breaker state.
+        """
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.ttl:
+            await self.refresh()
+        table = {}
+        for key, name, url in self.nodes_fn():
+            entry = self._table.get(url) or {
+                "status": "unknown", "latency_ms": None, "is_training": False, "checked_at": None
+            }
+            table[key] = {"name": name, "url": url, **entry, "breaker": self.breaker(url).state}
+        return table
+
+    async def refresh(self):
+        """Probe every node now; concurrent callers share one round of probes."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._poll())
+        await asyncio.shield(self._refresh_task)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Node health poll failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def _poll(self):
+        nodes = self.nodes_fn()
+        urls = [url for _, _, url in nodes]
+        probes = await fan_out(self.probe_fn, urls, self.concurrency)
+        checked_at = time.time()
+        for url, probe in zip(urls, probes):
+            self._table[url] = {**probe, "checked_at": checked_at}
+            self.record(url, probe["status"] == "healthy")
+        # Forget nodes that left the registry
+        for url in set(self._table) - set(urls):
+            del self._table[url]
+        for url in set(self._breakers) - set(urls):
+            del self._breakers[url]
+        self._refreshed_at = time.monotonic()
+        self.polls_total += 1
+
+    def prometheus_lines(self) -> List[str]:
+        lines = [
+            "# HELP endotwin_node_up 1 if the node's last health poll succeeded",
+            "# TYPE endotwin_node_up gauge",
+        ]
+        nodes = self.nodes_fn()
+        for key, _, url in nodes:
+            up = int(self._table.get(url, {}).get("status") == "healthy")
+            lines.append(f'endotwin_node_up{{node="{key}"}} {up}')
+        lines += [
+            "# HELP endotwin_node_circuit_open 1 while calls to the node are skipped",
+            "# TYPE endotwin_node_circuit_open gauge",
+        ]
+        for key, _, url in nodes:
+            lines.append(f'endotwin_node_circuit_open{{node="{key}"}} {int(self.breaker(url).state == "open")}')
+        lines += [
+            "# HELP endotwin_node_calls_skipped_total Node calls skipped by an open circuit",
+            "# TYPE endotwin_node_calls_skipped_total counter",
+            f"endotwin_node_calls_skipped_total {self.skipped_calls_total}",
+            "# HELP endotwin_node_health_polls_total Completed node health polls",
+            "# TYPE endotwin_node_health_polls_total counter",
+            f"endotwin_node_health_polls_total {self.polls_total}",
+        ]
+        return lines
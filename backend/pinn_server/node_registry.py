@@ -0,0 +1,173 @@
+"""
+Registry of the federated nodes the central server trains with.
+
+Nodes used to be three hard-coded services, one per modality. A rollout
+has many hospital sites per modality, so nodes now register themselves
+(POST /nodes/register) with their URL, modality and site, and heartbeat
+(POST /nodes/{node_id}/heartbeat) to stay listed. A dynamic node that
+misses heartbeats for ``heartbeat_ttl`` seconds drops out of every fan-out
+until it registers or heartbeats again.
+
+The services configured through IMAGING/CLINICAL/PATHOLOGY_SERVICE_URL are
+added as static nodes, with their modality as node id, and never expire,
+so existing deployments keep working unchanged.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODALITIES = ("imaging", "clinical", "pathology")
+
+
+class RegisteredNode:
+    """One federated node: where it is, what it holds and when it was last heard from."""
+
+    def __init__(self, node_id: str, url: str, modality: str, site: Optional[str] = None, static: bool = False):
+        self.id = node_id
+        self.url = url.rstrip("/")
+        self.modality = modality
+        self.site = site
+        self.static = static
+        self.registered_at = time.time()
+        self.last_heartbeat = time.time()
+
+    @property
+    def name(self) -> str:
+        """Display name, e.g. 'Imaging' or 'Imaging (site-a)'."""
+        label = self.modality.capitalize()
+        return f"{label} ({self.site})" if self.site else label
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.id,
+            "name": self.name,
+            "url": self.url,
+            "modality": self.modality,
+            "site": self.site,
+            "static": self.static,
+            "registered_at": self.registered_at,
+            "last_heartbeat": self.last_heartbeat,
+        }
+
+
+class NodeRegistry:
+    """
+    Thread-safe table of registered nodes.
+
+    Expired dynamic nodes are dropped lazily whenever the table is read.
+    """
+
+    def __init__(self, heartbeat_ttl: float = 60.0):
+        self.heartbeat_ttl = heartbeat_ttl
+        self._nodes: Dict[str, RegisteredNode] = {}
+        self._lock = threading.Lock()
+        self.expired_total = 0
+
+    def add_static(self, node_id: str, url: str, modality: str) -> RegisteredNode:
+        """Add a configured node that never expires."""
+        return self._put(RegisteredNode(node_id, url, modality, static=True))
+
+    def register(
+        self,
+        url: str,
+        modality: str,
+        site: Optional[str] = None,
+        node_id: Optional[str] = None
+    ) -> RegisteredNode:
+        """
+        Register a node, or re-register it after a restart or expiry.
+
+        A node re-registering with the same ``node_id``, or without one but
+        at an already registered URL, keeps its id. A node at the URL of a
+        configured node is that node: its registration counts as a heartbeat
+        and the configured node is returned. ValueError means the request
+        can never succeed as sent (unknown modality, or a clash with a
+        configured node).
+        """
+        if modality not in MODALITIES:
+            raise ValueError(f"Unknown modality '{modality}', expected one of {MODALITIES}")
+        url = url.rstrip("/")
+        with self._lock:
+            static = next((node for node in self._nodes.values() if node.static and node.url == url), None)
+            if static is not None:
+                if static.modality != modality:
+                    raise ValueError(f"{url} is configured as the {static.modality} node, not {modality}")
+                static.last_heartbeat = time.time()
+                return static
+            if node_id is None:
+                node_id = next((node.id for node in self._nodes.values() if node.url == url), None)
+            existing = self._nodes.get(node_id) if node_id is not None else None
+            if existing is not None and existing.static:
+                raise ValueError(f"Node id '{node_id}' belongs to the configured node at {existing.url}")
+            node = RegisteredNode(node_id or uuid.uuid4().hex[:12], url, modality, site)
+            if existing is not None:
+                node.registered_at = existing.registered_at
+            else:
+                logger.info(f"Registered {modality} node {node.id} at {url}")
+            self._nodes[node.id] = node
+        return node
+
+    def heartbeat(self, node_id: str) -> Optional[RegisteredNode]:
+        """Refresh a node's heartbeat; None if it is unknown or already expired (it should re-register)."""
+        with self._lock:
+            self._expire()
+            node = self._nodes.get(node_id)
+            if node is not None:
+                node.last_heartbeat = time.time()
+            return node
+
+    def deregister(self, node_id: str) -> bool:
+        with self._lock:
+            return self._nodes.pop(node_id, None) is not None
+
+    def get(self, node_id: str) -> Optional[RegisteredNode]:
+        with self._lock:
+            self._expire()
+            return self._nodes.get(node_id)
+
+    def nodes(self, modality: Optional[str] = None) -> List[RegisteredNode]:
+        """Live nodes in registration order, optionally of one modality."""
+        with self._lock:
+            self._expire()
+            return [node for node in self._nodes.values() if modality is None or node.modality == modality]
+
+    def targets(self) -> List[Tuple[str, str, str]]:
+        """Live nodes as (node id, display name, base URL)."""
+        return [(node.id, node.name, node.url) for node in self.nodes()]
+
+    def __len__(self) -> int:
+        return len(self.nodes())
+
+    def _put(self, node: RegisteredNode) -> RegisteredNode:
+        with self._lock:
+            self._nodes[node.id] = node
+        return node
+
+    def _expire(self):
+        cutoff = time.time() - self.heartbeat_ttl
+        expired = [
+            node_id for node_id, node in self._nodes.items()
+            if not node.static and node.last_heartbeat < cutoff
+        ]
+        for node_id in expired:
+            node = self._nodes.pop(node_id)
+            self.expired_total += 1
+            logger.warning(f"{node.modality} node {node_id} at {node.url} missed its heartbeats; dropped")
+
+    def prometheus_lines(self) -> List[str]:
+        counts = {modality: 0 for modality in MODALITIES}
+        for node in self.nodes():
+            counts[node.modality] += 1
+        return [
+            "# HELP endotwin_registered_nodes Live federated nodes by modality",
+            "# TYPE endotwin_registered_nodes gauge",
+            *(f'endotwin_registered_nodes{{modality="{modality}"}} {count}' for modality, count in counts.items()),
+            "# HELP endotwin_nodes_expired_total Nodes dropped for missing heartbeats",
+            "# TYPE endotwin_nodes_expired_total counter",
+            f"endotwin_nodes_expired_total {self.expired_total}",
+        ]
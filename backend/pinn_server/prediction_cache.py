@@ -0,0 +1,160 @@
+"""
+Content-addressed cache of /predict results with single-flight coalescing.
+
+The patient input form re-submits identical or near-identical slider states,
+and every submission used to pay for a full Monte Carlo dropout pass. Results
+are keyed on a hash of the feature vector, quantized to ``feature_step``, and
+the model version, so a retrained model never serves stale entries.
+
+Concurrent requests for the same key share one computation: the first caller
+starts it and the others await the same task. Entries expire after
+``ttl_seconds`` and the least recently used are evicted once the estimated
+size exceeds ``max_bytes``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def feature_key(features: np.ndarray, model_version: str, feature_step: float = 1e-3) -> str:
+    """
+    Hash a feature vector, snapped to ``feature_step``, together with the model version.
+
+    Args:
+        features: Concatenated imaging/clinical/pathology features
+        model_version: Identifier of the weights that will score the features
+        feature_step: Quantization step; features closer than this share a key
+
+    Returns:
+        Hex digest used as the cache key
+    """
+    quantized = np.round(np.asarray(features, dtype=np.float64) / feature_step).astype(np.int64)
+    digest = hashlib.sha256(quantized.tobytes())
+    digest.update(model_version.encode())
+    return digest.hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes."""
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement() + sys.getsizeof(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes + sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class PredictionCache:
+    """
+    TTL and byte-bounded LRU cache with single-flight computation.
+
+    Must be used from the event loop thread.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_bytes: int = 16 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _evict(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a fresh cached value without computing it."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        created, _, value = entry
+        if time.monotonic() - created >= self.ttl_seconds:
+            self._evict(key)
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting least recently used entries over ``max_bytes``."""
+        if key in self._entries:
+            self._evict(key)
+        size = estimate_size(value) + sys.getsizeof(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic(), size, value)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for ``key``, computing it at most once.
+
+        Concurrent callers with the same key await a single ``compute()``
+        task. The task is shielded, so a caller that disconnects does not
+        cancel the computation for the others. Failures are not cached.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, generation=self._generation: self._on_done(key, generation, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, generation: int, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            return
+        # Results computed against weights that were replaced meanwhile are dropped
+        if generation == self._generation:
+            self.put(key, task.result())
+
+    def invalidate(self):
+        """Drop every entry; in-flight computations finish but are not stored."""
+        self._entries.clear()
+        self._inflight.clear()
+        self.bytes = 0
+        self._generation += 1
+        logger.info("Prediction cache invalidated")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/coalesced counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
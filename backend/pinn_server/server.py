@@ -6,34 +6,57 @@ Physics-Informed Neural Network to make predictions.
 """
 
 import os
+import copy
+import functools
 import math
+import threading
+import time
+import uuid
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Callable, List, Literal, Optional, Dict
 from datetime import datetime
 import numpy as np
 import torch
 import json
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse as _BaseJSONResponse
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-import httpx
 import sys
 import asyncio
 from fastapi import WebSocket, WebSocketDisconnect
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from pinn_server.model import EndoPINN, save_model, load_model
+from pinn_server.model import EndoPINN, save_model, load_model, training_autocast
+from pinn_server.batching import MicroBatcher
+from pinn_server.executors import InstrumentedExecutor
+from pinn_server.node_client import NodeClient, fan_out
+from pinn_server.node_health import NodeHealthMonitor
+from pinn_server.node_registry import MODALITIES, NodeRegistry
+from pinn_server.training_jobs import TrainingCancelled, TrainingJob, TrainingJobQueue, TrainingThrottle
+from pinn_server.prediction_cache import PredictionCache, feature_key
+from pinn_server.inference_engine import (
+    InferenceEngine,
+    ENGINE_FILENAMES,
+    SERVING_PRECISIONS,
+    export_inference_engine,
+    build_inference_engine,
+    load_inference_engine
+)
 from utils.physics_loss import PINNLoss
+from utils.collocation import CollocationPool
 from utils.mesh_generator import (
     generate_simplified_uterus_mesh,
     apply_stiffness_colormap,
     generate_stiffness_map,
     mesh_to_glb_bytes
 )
+from utils.volume_synthesis import volume_cache
+from utils.prediction_store import prediction_store
+from utils.volume_encoding import encode_volume, VOLUME_ENCODINGS, VOLUME_DTYPES, VOLUME_HEADER_NAMES
 from utils.patient_manager import patient_manager
 from utils.settings_manager import settings_manager
 from utils.training_history_manager import training_history_manager
@@ -128,24 +151,127 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=VOLUME_HEADER_NAMES,
 )
 
 # Configuration
 MODEL_PATH = os.getenv("MODEL_PATH", "/app/data/models")
+# Configured per-modality nodes (empty = none); more nodes register at runtime through /nodes/register
 IMAGING_SERVICE_URL = os.getenv("IMAGING_SERVICE_URL", "http://localhost:8001")
 CLINICAL_SERVICE_URL = os.getenv("CLINICAL_SERVICE_URL", "http://localhost:8002")
 PATHOLOGY_SERVICE_URL = os.getenv("PATHOLOGY_SERVICE_URL", "http://localhost:8003")
+# Shared node HTTP client: concurrent requests per node and idle keep-alive connections kept
+NODE_CONNECTIONS_PER_NODE = int(os.getenv("NODE_CONNECTIONS_PER_NODE", "4"))
+NODE_KEEPALIVE_CONNECTIONS = int(os.getenv("NODE_KEEPALIVE_CONNECTIONS", "32"))
+# Background node health polling; endpoints read the last poll, re-probing if it is older than the TTL
+NODE_HEALTH_INTERVAL_SECONDS = float(os.getenv("NODE_HEALTH_INTERVAL_SECONDS", "10"))
+NODE_HEALTH_TTL_SECONDS = float(os.getenv("NODE_HEALTH_TTL_SECONDS", "30"))
+# Consecutive failures that open a node's circuit, and how long calls to it are skipped
+NODE_BREAKER_FAILURES = int(os.getenv("NODE_BREAKER_FAILURES", "3"))
+NODE_BREAKER_RESET_SECONDS = float(os.getenv("NODE_BREAKER_RESET_SECONDS", "30"))
+# Registered nodes are dropped after this long without a heartbeat
+NODE_HEARTBEAT_TTL_SECONDS = float(os.getenv("NODE_HEARTBEAT_TTL_SECONDS", "60"))
+# Node calls in flight at once during a fan-out (health polls, training triggers)
+NODE_FANOUT_CONCURRENCY = int(os.getenv("NODE_FANOUT_CONCURRENCY", "32"))
+VOLUME_CACHE_SIZE = int(os.getenv("VOLUME_CACHE_SIZE", "256"))
+VOLUME_GRID_SIZE = 64  # Default resolution of the VTK stiffness volume
+PREDICTION_TTL_SECONDS = float(os.getenv("PREDICTION_TTL_SECONDS", "300"))
+
+# Monte Carlo dropout: fixed MC_SAMPLES, or adaptive sampling with early exit
+MC_SAMPLES = int(os.getenv("MC_SAMPLES", "10"))
+MC_ADAPTIVE = os.getenv("MC_ADAPTIVE", "false").lower() in ("1", "true", "yes")
+MC_TOLERANCE = float(os.getenv("MC_TOLERANCE", "0.02"))
+MC_MIN_SAMPLES = int(os.getenv("MC_MIN_SAMPLES", "4"))
+MC_MAX_SAMPLES = int(os.getenv("MC_MAX_SAMPLES", "50"))
+MC_CHUNK_SIZE = int(os.getenv("MC_CHUNK_SIZE", "4"))
+
+# Micro-batching of concurrent prediction requests
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "32"))
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+
+# /predict/batch: records per EndoPINN forward chunk
+BATCH_PREDICT_CHUNK_SIZE = int(os.getenv("BATCH_PREDICT_CHUNK_SIZE", "256"))
+
+# 'frozen' serves /predict from the folded TorchScript engine, 'eager' from EndoPINN
+SERVING_ENGINE = os.getenv("SERVING_ENGINE", "frozen").lower()
+# 'int8' dynamically quantizes the frozen engine's Linear layers (CPU only);
+# overridden at runtime by the 'serving_precision' setting (PUT /config)
+SERVING_PRECISION = os.getenv("SERVING_PRECISION", "fp32").lower()
+
+# /predict result cache, keyed on quantized features + model version
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "600"))
+PREDICTION_CACHE_MAX_BYTES = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+PREDICTION_CACHE_FEATURE_STEP = float(os.getenv("PREDICTION_CACHE_FEATURE_STEP", "0.001"))
+
+# Worker pools for CPU-bound work kept off the event loop
+COMPUTE_POOL_SIZE = int(os.getenv("COMPUTE_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+PARSER_POOL_SIZE = int(os.getenv("PARSER_POOL_SIZE", "2"))
+
+# Derivatives for the Navier-Cauchy training loss: 'autograd' or 'fd'
+PHYSICS_RESIDUAL_MODE = os.getenv("PHYSICS_RESIDUAL_MODE", "autograd").lower()
+PHYSICS_FD_STEP = float(os.getenv("PHYSICS_FD_STEP", "0.01"))  # Stencil spacing for 'fd'
+# Memory budget of the physics loss: collocation points per backpropagated chunk (0 = no chunking)
+PHYSICS_CHUNK_SIZE = int(os.getenv("PHYSICS_CHUNK_SIZE", "0"))
+# Weighting of the data/physics/elastic losses: 'gradnorm', or the single-backward 'relobralo' / 'uncertainty'
+LOSS_BALANCING = os.getenv("LOSS_BALANCING", "gradnorm").lower()
+
+# Idle /train/events streams send a keep-alive comment this often
+TRAINING_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("TRAINING_EVENTS_KEEPALIVE_SECONDS", "15"))
+# While /predict sees more than this many requests/s, training runs on TRAINING_THROTTLED_THREADS
+# intra-op threads so inference latency holds during retraining (0 = never throttle)
+TRAINING_THROTTLE_RPS = float(os.getenv("TRAINING_THROTTLE_RPS", "2"))
+TRAINING_THROTTLED_THREADS = int(os.getenv("TRAINING_THROTTLED_THREADS", "1"))
+
+# Collocation points for the physics loss: a quasi-random pool inside the anatomy,
+# with PHYSICS_POINTS drawn per step and RAR resampling every RAR_RESAMPLE_EVERY steps
+COLLOCATION_POOL_SIZE = int(os.getenv("COLLOCATION_POOL_SIZE", "65536"))
+COLLOCATION_METHOD = os.getenv("COLLOCATION_METHOD", "sobol").lower()
+PHYSICS_POINTS = int(os.getenv("PHYSICS_POINTS", "256"))
+RAR_RESAMPLE_EVERY = int(os.getenv("RAR_RESAMPLE_EVERY", "50"))
+RAR_CANDIDATES = int(os.getenv("RAR_CANDIDATES", "2048"))
 
 # Global state
 model: Optional[EndoPINN] = None
+model_version: str = ""  # Identifies the serving weights; part of the prediction cache key
+inference_engine: Optional[InferenceEngine] = None  # Frozen export of `model` used for serving
+serving_precision: str = SERVING_PRECISION  # Precision of the frozen engine: 'fp32' or 'int8'
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 training_history: List[Dict] = []
 is_training: bool = False
 prediction_count: int = 0  # Track number of predictions made
 total_epochs_trained: int = 0  # Track total training epochs
+mc_samples_total: int = 0  # MC dropout samples drawn across all predictions
+mc_predictions_total: int = 0  # Predictions that ran MC dropout (cache hits excluded)
+mc_stats_lock = threading.Lock()  # Guards the MC counters; inference runs on compute_executor threads
+# The eager MC path toggles the shared model's dropout modules, so concurrent
+# calls would switch dropout off under each other; the frozen engine is stateless
+eager_inference_lock = threading.Lock()
+collocation_pool: Optional[CollocationPool] = None  # Built on first training run
+training_steps_total: int = 0  # Optimizer steps across all training runs (drives RAR refreshes)
+
+# Track per-modality training success counts (summed over sites) for dynamic contribution computation
+_node_success_counts: Dict[str, int] = {modality: 0 for modality in MODALITIES}
+
+# Torch/NumPy inference and synthesis, document parsing, central training
+compute_executor = InstrumentedExecutor(
+    "compute", COMPUTE_POOL_SIZE, kind="thread", initializer=lambda: training_throttle.pin_inference_threads()
+)
+parser_executor = InstrumentedExecutor("parser", PARSER_POOL_SIZE, kind="process")
+training_executor = InstrumentedExecutor("training", 1, kind="thread")
+
+# One pooled keep-alive client for every federated node call
+node_client = NodeClient(NODE_CONNECTIONS_PER_NODE, NODE_KEEPALIVE_CONNECTIONS)
 
-# Track per-node training success counts for dynamic contribution computation
-_node_success_counts: Dict[str, int] = {"imaging": 0, "clinical": 0, "pathology": 0}
+# Federated nodes: the configured services plus any that register at runtime
+node_registry = NodeRegistry(heartbeat_ttl=NODE_HEARTBEAT_TTL_SECONDS)
+for _modality, _url in zip(MODALITIES, (IMAGING_SERVICE_URL, CLINICAL_SERVICE_URL, PATHOLOGY_SERVICE_URL)):
+    if _url:
+        node_registry.add_static(_modality, _url, _modality)
+
+prediction_cache = PredictionCache(
+    ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+    max_bytes=PREDICTION_CACHE_MAX_BYTES
+)
 
 
 from pydantic import BaseModel, Field, conlist
@@ -178,24 +304,33 @@ class PredictRequest(BaseModel):
 
 
 class PredictResponse(BaseModel):
+    prediction_id: str
     prediction: float
     stiffness: float
     confidence: float
     risk_level: str
+    mc_samples_used: int
     timestamp: str
+    volume_dimensions: List[int]
 
 
 class TrainRequest(BaseModel):
     epochs: int = Field(10, ge=1, le=1000, description="Federated training epochs")
     learning_rate: float = Field(0.001, gt=0.0, description="Optimizer learning rate")
     batch_size: int = Field(4, ge=1, le=128, description="Batch size for training")
+    precision: Literal["fp32", "bf16"] = Field(
+        "fp32", description="Central model data-path precision; 'bf16' autocasts the trunk and heads"
+    )
+    priority: int = Field(0, ge=-10, le=10, description="Queued jobs with a higher priority start first")
+    resume_job_id: Optional[str] = Field(
+        None, description="Start from the checkpoint a cancelled job saved instead of the current central model"
+    )
 
 
 class TrainResponse(BaseModel):
     status: str
     message: str
-    epochs_completed: int
-    final_loss: float
+    job_id: str
 
 
 class HealthResponse(BaseModel):
@@ -205,78 +340,128 @@ class HealthResponse(BaseModel):
     federated_nodes: Dict[str, str]
 
 
+class NodeRegisterRequest(BaseModel):
+    url: str = Field(..., description="Base URL the central server reaches the node at")
+    modality: Literal["imaging", "clinical", "pathology"]
+    site: Optional[str] = Field(None, description="Hospital site label")
+    node_id: Optional[str] = Field(None, description="Id from an earlier registration, to keep it across restarts")
+
+
 class NodeStatus(BaseModel):
+    node_id: Optional[str] = None
+    modality: Optional[str] = None
+    site: Optional[str] = None
     name: str
     url: str
     status: str
     is_training: bool
+    latency_ms: Optional[float] = None
+    checked_at: Optional[float] = None
+    breaker: str = "closed"
 
 
 # ==================== Helper Functions ====================
 
 async def fetch_features_from_node(node_url: str, node_name: str) -> Optional[np.ndarray]:
-    """Fetch features from a federated node."""
+    """Fetch features from a federated node; None if it fails or its circuit is open."""
+    if not node_health.allow(node_url):
+        logger.warning(f"Skipping feature fetch from {node_name}: circuit open")
+        return None
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{node_url}/features")
-            
-            if response.status_code == 200:
-                data = response.json()
-                features = np.array(data['features'], dtype=np.float32)
-                logger.info(f"Fetched {len(features)} features from {node_name}")
-                return features
-            else:
-                logger.warning(f"{node_name} returned {response.status_code}")
-                return None
-                
+        response = await node_client.get(f"{node_url}/features", deadline=10.0)
+        node_health.record(node_url, response.status_code == 200)
+
+        if response.status_code == 200:
+            data = response.json()
+            features = np.array(data['features'], dtype=np.float32)
+            logger.info(f"Fetched {len(features)} features from {node_name}")
+            return features
+        else:
+            logger.warning(f"{node_name} returned {response.status_code}")
+            return None
+
     except Exception as e:
-        logger.error(f"Error fetching from {node_name}: {e}")
+        node_health.record(node_url, False)
+        logger.error(f"Error fetching from {node_name}: {e!r}")
         return None
 
 
 async def trigger_node_training(node_url: str, node_name: str, epochs: int) -> bool:
-    """Trigger training on a federated node."""
+    """Trigger training on a federated node; False if it fails or its circuit is open."""
+    if not node_health.allow(node_url):
+        logger.warning(f"Skipping {node_name} training: circuit open")
+        return False
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{node_url}/train",
-                json={"epochs": epochs}
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"{node_name} training started")
-                return True
-            else:
-                logger.warning(f"{node_name} training failed: {response.status_code}")
-                return False
-                
+        response = await node_client.post(f"{node_url}/train", deadline=60.0, json={"epochs": epochs})
+        node_health.record(node_url, response.status_code == 200)
+
+        if response.status_code == 200:
+            logger.info(f"{node_name} training started")
+            return True
+        else:
+            logger.warning(f"{node_name} training failed: {response.status_code}")
+            return False
+
     except Exception as e:
-        logger.error(f"Error triggering {node_name} training: {e}")
+        node_health.record(node_url, False)
+        logger.error(f"Error triggering {node_name} training: {e!r}")
         return False
 
 
+async def probe_node(node_url: str, deadline: float = 5.0) -> Dict:
+    """One /health call to a node: its status, round-trip latency and whether it is training."""
+    start = time.perf_counter()
+    try:
+        response = await node_client.get(f"{node_url}/health", deadline=deadline)
+    except Exception:
+        return {"status": "unreachable", "latency_ms": None, "is_training": False}
+    latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    if response.status_code != 200:
+        return {"status": "unhealthy", "latency_ms": latency_ms, "is_training": False}
+    try:
+        is_training_node = bool(response.json().get("is_training", False))
+    except ValueError:
+        is_training_node = False
+    return {"status": "healthy", "latency_ms": latency_ms, "is_training": is_training_node}
+
+
 async def check_node_health(node_url: str) -> str:
     """Check health of a federated node."""
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{node_url}/health")
-            if response.status_code == 200:
-                return "healthy"
-            return "unhealthy"
-    except:
-        return "unreachable"
+    return (await probe_node(node_url))["status"]
+
+
+# Polled node health table and circuit breakers; endpoints read node_health.statuses()
+node_health = NodeHealthMonitor(
+    probe_node, node_registry.targets,
+    interval=NODE_HEALTH_INTERVAL_SECONDS, ttl=NODE_HEALTH_TTL_SECONDS,
+    failure_threshold=NODE_BREAKER_FAILURES, reset_timeout=NODE_BREAKER_RESET_SECONDS,
+    concurrency=NODE_FANOUT_CONCURRENCY
+)
+
+
+def checkpoint_version(path: Path, name: Optional[str] = None) -> str:
+    """
+    Version string of a saved checkpoint, derived from its size and mtime.
+
+    ``name`` replaces the file name, for a checkpoint written under a
+    temporary name that keeps its size and mtime when renamed to ``name``.
+    """
+    stat = path.stat()
+    return f"{name or path.name}:{stat.st_size}:{stat.st_mtime_ns}"
 
 
 def initialize_model():
     """Initialize or load the PINN model."""
-    global model
+    global model, model_version
     
     model_file = Path(MODEL_PATH) / "pinn_latest.pth"
     
     if model_file.exists():
         try:
             model = load_model(str(model_file), device=str(device))
+            model_version = checkpoint_version(model_file)
             logger.info("Loaded existing model")
+            initialize_inference_engine()
             return
         except Exception as e:
             logger.warning(f"Could not load model: {e}")
@@ -289,8 +474,229 @@ def initialize_model():
         hidden_dims=[256, 128, 64],
         dropout=0.3
     ).to(device)
+    # Randomly initialized weights are unique to this process
+    model_version = f"init:{uuid.uuid4().hex}"
     
     logger.info(f"Initialized new model on {device}")
+    initialize_inference_engine()
+
+
+def resolve_serving_precision(requested: str) -> str:
+    """Validate a requested serving precision; int8 falls back to fp32 off-CPU."""
+    if requested not in SERVING_PRECISIONS:
+        raise ValueError(f"serving_precision must be one of {list(SERVING_PRECISIONS)}")
+    if requested == "int8" and device.type != "cpu":
+        logger.warning("int8 serving is CPU-only; serving fp32 on this device")
+        return "fp32"
+    return requested
+
+
+def initialize_inference_engine():
+    """
+    Load the frozen serving engine exported from the current checkpoint.
+
+    A missing or stale artifact is re-exported next to pinn_latest.pth; a
+    model without a checkpoint gets an in-memory engine. The new engine
+    replaces the serving one only once it is ready; if it cannot be built
+    the previous engine keeps serving.
+    """
+    global inference_engine
+
+    if SERVING_ENGINE != "frozen":
+        inference_engine = None
+        logger.info("Serving /predict from the eager EndoPINN model")
+        return
+
+    try:
+        if model_version.startswith("init:"):
+            engine = build_inference_engine(model, model_version, serving_precision)
+        else:
+            engine_file = Path(MODEL_PATH) / ENGINE_FILENAMES[serving_precision]
+            engine = load_inference_engine(
+                str(engine_file), device=str(device), expected_version=model_version, precision=serving_precision
+            )
+            if engine is None:
+                engine = export_inference_engine(model, str(engine_file), model_version, serving_precision)
+    except Exception as e:
+        # An engine exported from other weights must not outlive them
+        if inference_engine is not None and inference_engine.source_version != model_version:
+            inference_engine = None
+        fallback = "the previous engine" if inference_engine is not None else "the eager model"
+        logger.warning(f"Could not build inference engine, serving {fallback}: {e}")
+        return
+
+    inference_engine = engine
+    logger.info(f"Serving /predict from the frozen {serving_precision} engine")
+
+
+def run_mc_inference(
+    imaging_tensor: torch.Tensor,
+    clinical_tensor: torch.Tensor,
+    pathology_tensor: torch.Tensor,
+    apply_batch_norm: Optional[bool] = None
+):
+    """
+    Run Monte Carlo dropout inference with the configured sampling mode.
+
+    Returns:
+        (prediction, stiffness, confidence, samples_used)
+    """
+    global mc_samples_total, mc_predictions_total
+
+    # Training may have lowered the default thread count this worker started with
+    training_throttle.pin_inference_threads()
+
+    # The frozen engine has BatchNorm folded in with its running statistics
+    if inference_engine is not None and apply_batch_norm:
+        return _run_engine_inference(imaging_tensor, clinical_tensor, pathology_tensor)
+
+    with eager_inference_lock, torch.no_grad():
+        model.eval()
+        if MC_ADAPTIVE:
+            prediction, stiffness, confidence, samples_used = model.predict_with_adaptive_confidence(
+                imaging_tensor, clinical_tensor, pathology_tensor,
+                tolerance=MC_TOLERANCE,
+                min_samples=MC_MIN_SAMPLES,
+                max_samples=MC_MAX_SAMPLES,
+                chunk_size=MC_CHUNK_SIZE,
+                apply_batch_norm=apply_batch_norm
+            )
+        else:
+            prediction, stiffness, confidence = model.predict_with_confidence(
+                imaging_tensor, clinical_tensor, pathology_tensor,
+                mc_samples=MC_SAMPLES,
+                apply_batch_norm=apply_batch_norm
+            )
+            samples_used = MC_SAMPLES
+
+    with mc_stats_lock:
+        mc_samples_total += samples_used * imaging_tensor.size(0)
+        mc_predictions_total += imaging_tensor.size(0)
+    return prediction, stiffness, confidence, samples_used
+
+
+def _run_engine_inference(imaging_tensor, clinical_tensor, pathology_tensor):
+    """run_mc_inference() on the frozen inference engine."""
+    global mc_samples_total, mc_predictions_total
+
+    engine = inference_engine
+    if MC_ADAPTIVE:
+        prediction, stiffness, confidence, samples_used = engine.predict_with_adaptive_confidence(
+            imaging_tensor, clinical_tensor, pathology_tensor,
+            tolerance=MC_TOLERANCE,
+            min_samples=MC_MIN_SAMPLES,
+            max_samples=MC_MAX_SAMPLES,
+            chunk_size=MC_CHUNK_SIZE
+        )
+    else:
+        prediction, stiffness, confidence = engine.predict_with_confidence(
+            imaging_tensor, clinical_tensor, pathology_tensor,
+            mc_samples=MC_SAMPLES
+        )
+        samples_used = MC_SAMPLES
+
+    with mc_stats_lock:
+        mc_samples_total += samples_used * imaging_tensor.size(0)
+        mc_predictions_total += imaging_tensor.size(0)
+    return prediction, stiffness, confidence, samples_used
+
+
+def _batched_mc_inference(imaging_tensor, clinical_tensor, pathology_tensor):
+    """
+    Inference entry point for the micro-batcher.
+
+    BatchNorm (running statistics) is always applied so a request's result
+    does not depend on how many other requests share its batch.
+    """
+    return run_mc_inference(imaging_tensor, clinical_tensor, pathology_tensor, apply_batch_norm=True)
+
+
+async def cached_inference(
+    imaging_feat: np.ndarray,
+    clinical_feat: np.ndarray,
+    pathology_feat: np.ndarray
+):
+    """
+    Score one patient through the prediction cache and the micro-batcher.
+
+    Identical (after quantization) feature vectors scored by the same model
+    version reuse the cached MC dropout result; concurrent identical requests
+    share a single computation.
+
+    Returns:
+        (prediction, stiffness, confidence, samples_used) as raw model outputs;
+        samples_used is 0 when the result came from the cache or from an
+        identical request's computation
+    """
+    features = np.concatenate([imaging_feat, clinical_feat, pathology_feat])
+    key = feature_key(features, model_version, PREDICTION_CACHE_FEATURE_STEP)
+    computed = False
+
+    async def _compute():
+        nonlocal computed
+        computed = True
+        prediction, stiffness, confidence, samples_used = await predict_batcher.submit(
+            torch.from_numpy(imaging_feat).unsqueeze(0).to(device),
+            torch.from_numpy(clinical_feat).unsqueeze(0).to(device),
+            torch.from_numpy(pathology_feat).unsqueeze(0).to(device)
+        )
+        return float(prediction.item()), float(stiffness.item()), float(confidence.item()), samples_used
+
+    prediction, stiffness, confidence, samples_used = await prediction_cache.get_or_compute(key, _compute)
+    return prediction, stiffness, confidence, samples_used if computed else 0
+
+
+predict_batcher = MicroBatcher(
+    _batched_mc_inference,
+    max_batch_size=PREDICT_BATCH_MAX_SIZE,
+    max_wait_ms=PREDICT_BATCH_MAX_WAIT_MS,
+    executor=compute_executor
+)
+
+
+def finalize_prediction(
+    pred_value: float,
+    stiff_value: float,
+    conf_value: float,
+    imaging_feat: np.ndarray,
+    clinical_feat: np.ndarray,
+    pathology_feat: np.ndarray,
+    log_proxy: bool = True
+):
+    """
+    Clamp model outputs to their valid ranges, or fall back to a feature proxy.
+
+    Returns:
+        (prediction, stiffness, confidence) as plain floats
+    """
+    # ── Sanitize / fallback ───────────────────────────────────────────────
+    # Untrained model outputs NaN/Inf for any input.
+    # Instead of hardcoding 0.5/3.0/0.5 (which ignores patient data), compute
+    # a clinically-motivated proxy from normalised feature means so that
+    # patient slider changes actually affect the result even pre-training.
+    if not math.isfinite(pred_value) or not math.isfinite(stiff_value) or not math.isfinite(conf_value):
+        img_mean  = float(np.mean(imaging_feat))    # features are 0-1 normalised
+        clin_mean = float(np.mean(clinical_feat))
+        path_mean = float(np.mean(pathology_feat))
+
+        # Weighted combination — imaging carries most diagnostic signal
+        proxy_pred = img_mean * 0.40 + clin_mean * 0.35 + path_mean * 0.25
+        pred_value  = max(0.0, min(1.0, proxy_pred))
+        stiff_value = max(0.5, min(15.0, 1.0 + pred_value * 9.0))  # 1–10 kPa
+        # Confidence is lower for mid-range predictions, higher at extremes
+        conf_value  = max(0.3, min(0.85, 0.5 + 0.35 * abs(proxy_pred - 0.5) * 2))
+        if log_proxy:
+            logger.info(
+                f"[PROXY] img={img_mean:.3f} clin={clin_mean:.3f} path={path_mean:.3f}"
+                f" → pred={pred_value:.3f} stiff={stiff_value:.2f} conf={conf_value:.2f} (model untrained)"
+            )
+    else:
+        pred_value  = max(0.0, min(1.0,  pred_value))
+        stiff_value = max(0.0, min(15.0, stiff_value))
+        conf_value  = max(0.0, min(1.0,  conf_value))
+    # ─────────────────────────────────────────────────────────────────────
+
+    return pred_value, stiff_value, conf_value
 
 
 def classify_risk(prediction: float) -> str:
@@ -308,19 +714,13 @@ def classify_risk(prediction: float) -> str:
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
-    imaging_status = await check_node_health(IMAGING_SERVICE_URL)
-    clinical_status = await check_node_health(CLINICAL_SERVICE_URL)
-    pathology_status = await check_node_health(PATHOLOGY_SERVICE_URL)
+    probes = await node_health.statuses()
     
     return {
         "status": "healthy",
         "model_loaded": model is not None,
         "device": str(device),
-        "federated_nodes": {
-            "imaging": imaging_status,
-            "clinical": clinical_status,
-            "pathology": pathology_status
-        }
+        "federated_nodes": {key: probe["status"] for key, probe in probes.items()}
     }
 
 
@@ -344,6 +744,7 @@ async def predict(request: PredictRequest):
     """
     if model is None:
         raise HTTPException(status_code=503, detail="Model not initialized")
+    training_throttle.record_request()
     
     try:
         # Get features
@@ -365,47 +766,14 @@ async def predict(request: PredictRequest):
                 detail="Features must match required dimensions (128, 64, 64)"
             )
         
-        # Convert to tensors
-        imaging_tensor = torch.tensor(imaging_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        clinical_tensor = torch.tensor(clinical_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        pathology_tensor = torch.tensor(pathology_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        
-        # Make prediction
-        model.eval()
-        with torch.no_grad():
-            prediction, stiffness, confidence = model.predict_with_confidence(
-                imaging_tensor, clinical_tensor, pathology_tensor
-            )
-        
-        pred_value = float(prediction.squeeze().cpu().numpy())
-        stiff_value = float(stiffness.squeeze().cpu().numpy())
-        conf_value = float(confidence.squeeze().cpu().numpy())
-
-        # ── Sanitize / fallback ───────────────────────────────────────────────
-        # Untrained model outputs NaN/Inf for any input.
-        # Instead of hardcoding 0.5/3.0/0.5 (which ignores patient data), compute
-        # a clinically-motivated proxy from normalised feature means so that
-        # patient slider changes actually affect the result even pre-training.
-        if not math.isfinite(pred_value) or not math.isfinite(stiff_value) or not math.isfinite(conf_value):
-            img_mean  = float(np.mean(imaging_feat))    # features are 0-1 normalised
-            clin_mean = float(np.mean(clinical_feat))
-            path_mean = float(np.mean(pathology_feat))
-
-            # Weighted combination — imaging carries most diagnostic signal
-            proxy_pred = img_mean * 0.40 + clin_mean * 0.35 + path_mean * 0.25
-            pred_value  = max(0.0, min(1.0, proxy_pred))
-            stiff_value = max(0.5, min(15.0, 1.0 + pred_value * 9.0))  # 1–10 kPa
-            # Confidence is lower for mid-range predictions, higher at extremes
-            conf_value  = max(0.3, min(0.85, 0.5 + 0.35 * abs(proxy_pred - 0.5) * 2))
-            logger.info(
-                f"[PROXY] img={img_mean:.3f} clin={clin_mean:.3f} path={path_mean:.3f}"
-                f" → pred={pred_value:.3f} stiff={stiff_value:.2f} conf={conf_value:.2f} (model untrained)"
-            )
-        else:
-            pred_value  = max(0.0, min(1.0,  pred_value))
-            stiff_value = max(0.0, min(15.0, stiff_value))
-            conf_value  = max(0.0, min(1.0,  conf_value))
-        # ─────────────────────────────────────────────────────────────────────
+        # Make prediction (served from the cache for repeated feature vectors)
+        pred_value, stiff_value, conf_value, mc_samples_used = await cached_inference(
+            imaging_feat, clinical_feat, pathology_feat
+        )
+
+        pred_value, stiff_value, conf_value = finalize_prediction(
+            pred_value, stiff_value, conf_value, imaging_feat, clinical_feat, pathology_feat
+        )
 
         risk = classify_risk(pred_value)
 
@@ -415,64 +783,22 @@ async def predict(request: PredictRequest):
         global prediction_count
         prediction_count += 1
         
-        # ── 3D Volume Generation for VTK.js ──
-        grid_size = 64
-        volume = np.zeros((grid_size, grid_size, grid_size), dtype=np.float32)
-        center = grid_size // 2
-
-        for z in range(grid_size):
-            for y in range(grid_size):
-                for x in range(grid_size):
-                    dx = x - center
-                    dy = y - center
-                    dz = z - center
-                    
-                    taper = max(0.4, 1.0 + (dy / (grid_size / 2)) * 0.6)
-                    body_dist = math.sqrt((dx / (14 * taper))**2 + (dy / 18)**2 + (dz / 10)**2)
-                    is_cervix = dy < -10 and dy > -22 and math.sqrt((dx/6)**2 + (dz/6)**2) < 1.0
-                    is_l_horn = dy > 6 and dy < 16 and dx < -8 and math.sqrt(((dx+12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
-                    is_r_horn = dy > 6 and dy < 16 and dx > 8 and math.sqrt(((dx-12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
-                    
-                    cavity_taper = max(0.1, 1.0 + (dy / 15) * 1.5)
-                    cavity_dist = math.sqrt((dx / (6 * cavity_taper))**2 + ((dy - 2) / 12)**2 + (dz / 2.5)**2)
-
-                    if body_dist <= 1.0 or is_cervix or is_l_horn or is_r_horn:
-                        if cavity_dist <= 1.0 and dy > -10:
-                            volume[z, y, x] = 0.5  # Cavity
-                        elif is_cervix:
-                            volume[z, y, x] = 3.0  # Cervix
-                        else:
-                            noise = math.sin(x*0.5) * math.cos(y*0.5) * math.sin(z*0.5) * 0.2
-                            volume[z, y, x] = 1.5 + noise  # Myometrium
-
-        if risk in ["HIGH", "MODERATE"]:
-            l_center_x = center + 5
-            l_center_y = center - 2
-            l_center_z = center + 6  
-            radius = min(12, int(stiff_value * 1.5)) 
-            for z in range(grid_size):
-                for y in range(grid_size):
-                    for x in range(grid_size):
-                        if volume[z, y, x] > 0.0:  
-                            dist = math.sqrt((x-l_center_x)**2 + (y-l_center_y)**2 + (z-l_center_z)**2)
-                            if dist < radius:
-                                intensity = stiff_value * (1 - (dist/radius)**2)
-                                volume[z, y, x] = max(volume[z, y, x], intensity)
-
-        stiffness_volume = volume.flatten().tolist()
-        
+        # The 3D volume for VTK.js is materialized lazily by /predict/{id}/volume
+        prediction_id = prediction_store.add(risk, stiff_value)
+
         result_payload = {
+            "prediction_id": prediction_id,
             "prediction": pred_value,
             "stiffness": stiff_value,
             "confidence": conf_value,
             "risk_level": risk,
+            "mc_samples_used": mc_samples_used,
             "timestamp": datetime.now().isoformat(),
-            "vtk_volume": stiffness_volume,
-            "volume_dimensions": [grid_size, grid_size, grid_size]
+            "volume_dimensions": [VOLUME_GRID_SIZE] * 3
         }
         
         # Broadcast prediction result to all connected WebSocket clients
-        await manager.broadcast(result_payload)
+        await manager.broadcast(result_payload, prediction_id=prediction_id)
 
         return result_payload
 
@@ -498,8 +824,7 @@ async def predict_from_upload(file: UploadFile = File(...)):
         
         dicom_metadata = None
         if is_dicom:
-            parser = DicomParser()
-            dicom_data = parser.parse_dcm(content)
+            dicom_data = await parser_executor.run(DicomParser().parse_dcm, content)
             dicom_metadata = dicom_data["metadata"]
 
             # Build deterministic proxy features from DICOM metadata hash
@@ -520,119 +845,220 @@ async def predict_from_upload(file: UploadFile = File(...)):
             }
         else:
             # Standard PDF/Image parsing
-            parsed_result = get_patient_features_from_document(content, file.filename)
+            parsed_result = await parser_executor.run(get_patient_features_from_document, content, file.filename)
         
         imaging_feat = np.array(parsed_result["imaging_features"], dtype=np.float32)
         clinical_feat = np.array(parsed_result["clinical_features"], dtype=np.float32)
         pathology_feat = np.array(parsed_result["pathology_features"], dtype=np.float32)
         
-        # Convert to tensors
-        imaging_tensor = torch.tensor(imaging_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        clinical_tensor = torch.tensor(clinical_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        pathology_tensor = torch.tensor(pathology_feat, dtype=torch.float32).unsqueeze(0).to(device)
-        
-        # Make prediction
-        model.eval()
-        with torch.no_grad():
-            prediction, stiffness, confidence = model.predict_with_confidence(
-                imaging_tensor, clinical_tensor, pathology_tensor
-            )
-        
-        pred_value = float(prediction.squeeze().cpu().numpy())
-        stiff_value = float(stiffness.squeeze().cpu().numpy())
-        conf_value = float(confidence.squeeze().cpu().numpy())
-
-        # Clean up / Bounds
-        if not math.isfinite(pred_value) or not math.isfinite(stiff_value) or not math.isfinite(conf_value):
-             pred_value = 0.5
-             stiff_value = 5.0
-             conf_value = 0.5
+        # Make prediction (served from the cache for repeated feature vectors)
+        pred_value, stiff_value, conf_value, mc_samples_used = await cached_inference(
+            imaging_feat, clinical_feat, pathology_feat
+        )
 
-        pred_value  = max(0.0, min(1.0,  pred_value))
-        stiff_value = max(0.0, min(15.0, stiff_value))
-        conf_value  = max(0.0, min(1.0,  conf_value))
+        pred_value, stiff_value, conf_value = finalize_prediction(
+            pred_value, stiff_value, conf_value, imaging_feat, clinical_feat, pathology_feat
+        )
         
         risk = classify_risk(pred_value)
         
         global prediction_count
         prediction_count += 1
         
-        # ── 3D Volume Generation for VTK.js ──
-        # Generate an anatomically accurate 64x64x64 grid simulating a uterus.
-        grid_size = 64
-        volume = np.zeros((grid_size, grid_size, grid_size), dtype=np.float32)
-        center = grid_size // 2
-
-        for z in range(grid_size):
-            for y in range(grid_size):
-                for x in range(grid_size):
-                    dx = x - center
-                    dy = y - center
-                    dz = z - center
-                    
-                    taper = max(0.4, 1.0 + (dy / (grid_size / 2)) * 0.6)
-                    body_dist = math.sqrt((dx / (14 * taper))**2 + (dy / 18)**2 + (dz / 10)**2)
-                    is_cervix = dy < -10 and dy > -22 and math.sqrt((dx/6)**2 + (dz/6)**2) < 1.0
-                    is_l_horn = dy > 6 and dy < 16 and dx < -8 and math.sqrt(((dx+12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
-                    is_r_horn = dy > 6 and dy < 16 and dx > 8 and math.sqrt(((dx-12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
-                    
-                    cavity_taper = max(0.1, 1.0 + (dy / 15) * 1.5)
-                    cavity_dist = math.sqrt((dx / (6 * cavity_taper))**2 + ((dy - 2) / 12)**2 + (dz / 2.5)**2)
-
-                    if body_dist <= 1.0 or is_cervix or is_l_horn or is_r_horn:
-                        if cavity_dist <= 1.0 and dy > -10:
-                            volume[z, y, x] = 0.5  # Cavity
-                        elif is_cervix:
-                            volume[z, y, x] = 3.0  # Cervix
-                        else:
-                            noise = math.sin(x*0.5) * math.cos(y*0.5) * math.sin(z*0.5) * 0.2
-                            volume[z, y, x] = 1.5 + noise  # Myometrium
-
-        if risk in ["HIGH", "MODERATE"]:
-            # Inject a simulated lesion (higher stiffness) in the posterior cul-de-sac / posterior wall
-            l_center_x = center + 5
-            l_center_y = center - 2
-            l_center_z = center + 6  # Posteriorly shifted
-            radius = min(12, int(stiff_value * 1.5)) # Size based on stiffness
-            for z in range(grid_size):
-                for y in range(grid_size):
-                    for x in range(grid_size):
-                        if volume[z, y, x] > 0.0:  # Only if inside uterus
-                            dist = math.sqrt((x-l_center_x)**2 + (y-l_center_y)**2 + (z-l_center_z)**2)
-                            if dist < radius:
-                                intensity = stiff_value * (1 - (dist/radius)**2)
-                                volume[z, y, x] = max(volume[z, y, x], intensity)
-
-        # Flatten for JSON serialization
-        stiffness_volume = volume.flatten().tolist()
+        # The 3D volume for VTK.js is materialized lazily by /predict/{id}/volume
+        prediction_id = prediction_store.add(risk, stiff_value)
 
         result_payload = {
+            "prediction_id": prediction_id,
             "prediction": pred_value,
             "stiffness": stiff_value,
             "confidence": conf_value,
             "risk_level": risk,
+            "mc_samples_used": mc_samples_used,
             "timestamp": datetime.now().isoformat(),
             "parsed_features": parsed_result["parsed_report"],
-            "vtk_volume": stiffness_volume,
-            "volume_dimensions": [grid_size, grid_size, grid_size]
+            "volume_dimensions": [VOLUME_GRID_SIZE] * 3
         }
         
         if dicom_metadata:
             result_payload["dicom_metadata"] = dicom_metadata
         
-        await manager.broadcast(result_payload)
+        await manager.broadcast(result_payload, prediction_id=prediction_id)
         return result_payload
 
     except Exception as e:
         logger.error(f"Prediction from upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _read_batch_records(request: Request):
+    """
+    Return an async iterator over the raw records of a /predict/batch body.
+
+    Accepts a JSON array (application/json), an NDJSON stream
+    (application/x-ndjson) or a multipart upload with an NDJSON ``file``.
+    Malformed bodies are rejected here, before the response starts
+    streaming; records are parsed lazily as chunks are scored.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart body must contain an NDJSON 'file'")
+
+        async def _lines():
+            for line in upload.file:
+                if line.strip():
+                    yield line
+        return _lines()
+
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # The body must be drained before the response starts: once streaming,
+        # Starlette listens for client disconnects on the same receive channel
+        body = await request.body()
+
+        async def _lines():
+            start = 0
+            while start < len(body):
+                end = body.find(b"\n", start)
+                if end < 0:
+                    end = len(body)
+                line = body[start:end]
+                start = end + 1
+                if line.strip():
+                    yield line
+        return _lines()
+
+    try:
+        records = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of prediction requests")
+
+    async def _records():
+        for record in records:
+            yield record
+    return _records()
+
+
+def _predict_chunk(records: List[tuple], include_volume: bool) -> List[dict]:
+    """Score one chunk of validated (index, PredictRequest) records in a single forward pass."""
+    imaging_feat = np.array([r.imaging.features for _, r in records], dtype=np.float32)
+    clinical_feat = np.array([r.clinical.features for _, r in records], dtype=np.float32)
+    pathology_feat = np.array([r.pathology.features for _, r in records], dtype=np.float32)
+
+    prediction, stiffness, confidence, mc_samples_used = run_mc_inference(
+        torch.from_numpy(imaging_feat).to(device),
+        torch.from_numpy(clinical_feat).to(device),
+        torch.from_numpy(pathology_feat).to(device),
+        apply_batch_norm=True
+    )
+    prediction = prediction.view(-1).cpu().tolist()
+    stiffness = stiffness.view(-1).cpu().tolist()
+    confidence = confidence.view(-1).cpu().tolist()
+
+    results = []
+    for row, (index, record) in enumerate(records):
+        pred_value, stiff_value, conf_value = finalize_prediction(
+            prediction[row], stiffness[row], confidence[row],
+            imaging_feat[row], clinical_feat[row], pathology_feat[row],
+            log_proxy=False
+        )
+        risk = classify_risk(pred_value)
+        result = {
+            "index": index,
+            "patient_id": record.patient_id,
+            "prediction": pred_value,
+            "stiffness": stiff_value,
+            "confidence": conf_value,
+            "risk_level": risk,
+            "mc_samples_used": mc_samples_used,
+        }
+        if include_volume:
+            result["prediction_id"] = prediction_store.add(risk, stiff_value)
+        results.append(result)
+    return results
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request, chunk_size: int = BATCH_PREDICT_CHUNK_SIZE, include_volume: bool = False):
+    """
+    Score many patients in one call, streaming one NDJSON line per patient.
+
+    The body is a JSON array, an NDJSON stream or a multipart NDJSON upload
+    of PredictRequest-shaped records. Records are scored in chunks of
+    ``chunk_size`` through a single EndoPINN forward each, and each chunk's
+    lines are streamed as soon as it completes, so memory stays flat
+    regardless of the number of records.
+
+    Query params:
+        chunk_size     - records per forward pass (1-4096)
+        include_volume - register each result for /predict/{id}/volume
+                         (volumes are still only built on request)
+
+    Invalid records yield ``{"index": i, "error": "..."}`` lines.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not initialized")
+    if not 1 <= chunk_size <= 4096:
+        raise HTTPException(status_code=400, detail="chunk_size must be between 1 and 4096")
+
+    records = await _read_batch_records(request)
+
+    async def _score(chunk: List[tuple], chunk_number: int) -> str:
+        global prediction_count
+        training_throttle.record_request()
+        start = time.perf_counter()
+        lines = await compute_executor.run(_predict_chunk, chunk, include_volume)
+        elapsed = time.perf_counter() - start
+        prediction_count += len(lines)
+        logger.info(
+            f"Batch chunk {chunk_number}: {len(lines)} records in {elapsed * 1000:.1f} ms "
+            f"({len(lines) / max(elapsed, 1e-9):.0f} records/s)"
+        )
+        return "".join(json.dumps(line) + "\n" for line in lines)
+
+    async def _stream():
+        chunk: List[tuple] = []
+        chunk_number = 0
+        index = 0
+
+        async for raw in records:
+            try:
+                if isinstance(raw, (bytes, str)):
+                    record = PredictRequest.model_validate_json(raw)
+                else:
+                    record = PredictRequest.model_validate(raw)
+            except Exception as e:
+                yield json.dumps({"index": index, "error": str(e)}) + "\n"
+                index += 1
+                continue
+
+            chunk.append((index, record))
+            index += 1
+            if len(chunk) >= chunk_size:
+                chunk_number += 1
+                yield await _score(chunk, chunk_number)
+                chunk = []
+
+        if chunk:
+            yield await _score(chunk, chunk_number + 1)
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
 @app.get("/metrics")
 async def get_metrics():
     """
     Prometheus-compatible metrics endpoint for Production Monitoring.
-    Exposes inference throughput, connection count, and training epochs.
+    Exposes inference throughput, connection count, training epochs and
+    stiffness volume / prediction cache effectiveness.
     """
+    volume_stats = volume_cache.stats()
+    cache_stats = prediction_cache.stats()
+    engine = inference_engine
     metrics = [
         "# HELP endotwin_predictions_total Total number of predictions made",
         "# TYPE endotwin_predictions_total counter",
@@ -644,161 +1070,383 @@ async def get_metrics():
         
         "# HELP endotwin_active_websockets Current number of active UI streams",
         "# TYPE endotwin_active_websockets gauge",
-        f"endotwin_active_websockets {len(active_connections)}"
+        f"endotwin_active_websockets {len(manager.active_connections)}",
+
+        "# HELP endotwin_volume_cache_hits_total Stiffness volume cache hits",
+        "# TYPE endotwin_volume_cache_hits_total counter",
+        f"endotwin_volume_cache_hits_total {volume_stats['hits']}",
+
+        "# HELP endotwin_volume_cache_misses_total Stiffness volume cache misses",
+        "# TYPE endotwin_volume_cache_misses_total counter",
+        f"endotwin_volume_cache_misses_total {volume_stats['misses']}",
+
+        "# HELP endotwin_volume_cache_entries Memoized lesion volumes",
+        "# TYPE endotwin_volume_cache_entries gauge",
+        f"endotwin_volume_cache_entries {volume_stats['entries']}",
+
+        "# HELP endotwin_mc_samples_total Monte Carlo dropout samples drawn",
+        "# TYPE endotwin_mc_samples_total counter",
+        f"endotwin_mc_samples_total {mc_samples_total}",
+
+        "# HELP endotwin_mc_samples_saved MC samples saved by adaptive early exit versus a fixed MC_SAMPLES",
+        "# TYPE endotwin_mc_samples_saved gauge",
+        f"endotwin_mc_samples_saved {mc_predictions_total * MC_SAMPLES - mc_samples_total}",
+
+        "# HELP endotwin_mc_predictions_total Predictions that ran MC dropout (prediction cache hits excluded)",
+        "# TYPE endotwin_mc_predictions_total counter",
+        f"endotwin_mc_predictions_total {mc_predictions_total}",
+
+        "# HELP endotwin_mc_samples_avg Average MC samples per prediction that ran MC dropout",
+        "# TYPE endotwin_mc_samples_avg gauge",
+        f"endotwin_mc_samples_avg {mc_samples_total / max(mc_predictions_total, 1):.3f}",
+
+        "# HELP endotwin_prediction_cache_hits_total /predict results served from the cache",
+        "# TYPE endotwin_prediction_cache_hits_total counter",
+        f"endotwin_prediction_cache_hits_total {cache_stats['hits']}",
+
+        "# HELP endotwin_prediction_cache_misses_total /predict results computed",
+        "# TYPE endotwin_prediction_cache_misses_total counter",
+        f"endotwin_prediction_cache_misses_total {cache_stats['misses']}",
+
+        "# HELP endotwin_prediction_cache_coalesced_total Requests that awaited an identical in-flight computation",
+        "# TYPE endotwin_prediction_cache_coalesced_total counter",
+        f"endotwin_prediction_cache_coalesced_total {cache_stats['coalesced']}",
+
+        "# HELP endotwin_prediction_cache_bytes Estimated size of cached results",
+        "# TYPE endotwin_prediction_cache_bytes gauge",
+        f"endotwin_prediction_cache_bytes {cache_stats['bytes']}",
+
+        "# HELP endotwin_inference_engine_frozen 1 if /predict is served by the frozen TorchScript engine",
+        "# TYPE endotwin_inference_engine_frozen gauge",
+        f'endotwin_inference_engine_frozen{{precision="{engine.precision if engine else serving_precision}"}} {int(engine is not None)}',
+
+        "# HELP endotwin_collocation_refreshes_total RAR refreshes of the collocation pool sampling weights",
+        "# TYPE endotwin_collocation_refreshes_total counter",
+        f"endotwin_collocation_refreshes_total {collocation_pool.refreshes if collocation_pool is not None else 0}",
+
+        *predict_batcher.prometheus_lines(),
+        *compute_executor.prometheus_lines(),
+        *parser_executor.prometheus_lines(),
+        *training_executor.prometheus_lines(),
+        *training_jobs.prometheus_lines(),
+        *training_throttle.prometheus_lines(),
+        *node_client.prometheus_lines(),
+        *node_health.prometheus_lines(),
+        *node_registry.prometheus_lines()
     ]
     return _BaseJSONResponse(content={"status": "ok", "metrics": "\n".join(metrics)})
 
 # ====================================================================================
 
-@app.post("/train", response_model=TrainResponse)
-async def train_federated(request: TrainRequest, background_tasks: BackgroundTasks):
+def get_collocation_pool() -> CollocationPool:
+    """Return the physics collocation pool, building it on first use."""
+    global collocation_pool
+    if collocation_pool is None:
+        collocation_pool = CollocationPool(
+            num_points=COLLOCATION_POOL_SIZE,
+            method=COLLOCATION_METHOD,
+            resample_every=RAR_RESAMPLE_EVERY,
+            num_candidates=RAR_CANDIDATES
+        )
+    return collocation_pool
+
+
+def _train_central_model(
+    request: TrainRequest,
+    on_epoch: Optional[Callable[[Dict], None]] = None,
+    before_batch: Optional[Callable[[], None]] = None,
+    resume_from: Optional[str] = None
+):
     """
-    Trigger federated training across all nodes and update the central model.
+    Train a copy of the central model on the local data loaders.
+
+    Runs on the training executor so the event loop stays responsive; the
+    caller swaps the returned model in once training completes. ``on_epoch``
+    is called (on the training thread) with each finished epoch's entry.
+    ``before_batch`` runs before every batch; raising TrainingCancelled from
+    it stops training, saves a checkpoint under MODEL_PATH/checkpoints and
+    re-raises with its path. ``resume_from`` is such a checkpoint to start
+    from instead of the central model.
+
+    Returns:
+        (trained_model, checkpoint version, inference engine or None, epoch_history)
     """
-    global is_training, training_history
-    
-    if is_training:
-        raise HTTPException(status_code=409, detail="Training already in progress")
+    global training_steps_total
+    from utils.data_loader import get_train_val_loaders
+    from utils.physics_loss import PINNLoss, GradNormWeighting, make_loss_balancer, shared_gradient_norms
     
-    if model is None:
-        raise HTTPException(status_code=503, detail="Model not initialized")
+    # Train a copy so concurrent inference keeps serving the current weights
+    trained_model = copy.deepcopy(model)
+    optimizer = torch.optim.Adam(trained_model.parameters(), lr=request.learning_rate)
+    loss_fn = PINNLoss(
+        lambda_physics=0.1, lambda_elastic=0.05,
+        residual_mode=PHYSICS_RESIDUAL_MODE, fd_step=PHYSICS_FD_STEP,
+        chunk_size=PHYSICS_CHUNK_SIZE or None
+    )
+    balancer = make_loss_balancer(LOSS_BALANCING, num_losses=3).to(device)
+    use_grad_norm = isinstance(balancer, GradNormWeighting)
+    if use_grad_norm and loss_fn.chunk_size is not None:
+        raise ValueError("GradNorm needs the full physics graph; unset PHYSICS_CHUNK_SIZE or change LOSS_BALANCING")
+    # Learned weights (GradNorm, uncertainty) get their own optimizer; ReLoBRaLo has none
+    balancer_params = list(balancer.parameters())
+    balancer_optimizer = torch.optim.Adam(balancer_params, lr=0.025) if balancer_params else None
+    if resume_from is not None:
+        checkpoint = torch.load(resume_from, map_location=device)
+        trained_model.load_state_dict(checkpoint['model_state_dict'])
+        if 'optimizer_state_dict' in checkpoint:
+            optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+        logger.info(f"Resuming training from {resume_from}")
     
-    is_training = True
-    import math
+    # Get real data loaders
+    train_loader, val_loader = get_train_val_loaders(batch_size=request.batch_size)
+    pool = get_collocation_pool()
+    if resume_from is None:
+        # Residuals scored for the previous run's model say nothing about this one
+        pool.reset()
     
-    try:
-        # 1. Trigger training on all federated nodes
-        logger.info("Triggering training on federated nodes...")
+    trained_model.train()
+    epoch_history = []
 
-        imaging_ok = await trigger_node_training(IMAGING_SERVICE_URL, "Imaging", request.epochs)
-        clinical_ok = await trigger_node_training(CLINICAL_SERVICE_URL, "Clinical", request.epochs)
-        pathology_ok = await trigger_node_training(PATHOLOGY_SERVICE_URL, "Pathology", request.epochs)
+    def _between_batches():
+        # Cancellation and the inference-load thread cap take effect between batches
+        if before_batch is None:
+            return
+        try:
+            before_batch()
+        except TrainingCancelled:
+            # Keep the partial run; a later /train can resume from it with resume_job_id
+            checkpoint_dir = Path(MODEL_PATH) / "checkpoints"
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            checkpoint_path = checkpoint_dir / f"pinn_cancelled_{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.pth"
+            last_loss = epoch_history[-1]['loss'] if epoch_history else None
+            save_model(trained_model, str(checkpoint_path), optimizer, len(epoch_history), last_loss)
+            logger.info(f"Training cancelled after {len(epoch_history)} epochs; checkpoint saved to {checkpoint_path}")
+            raise TrainingCancelled(str(checkpoint_path))
+
+    for epoch in range(request.epochs):
+        epoch_start = time.perf_counter()
+        epoch_loss = 0.0
+        epoch_physics_loss = 0.0
+        epoch_data_loss = 0.0
+        num_batches = 0
+        epoch_samples = 0
+
+        for batch in train_loader:
+            _between_batches()
+
+            # Get REAL patient data from batch
+            imaging_batch = batch['imaging'].to(device)
+            clinical_batch = batch['clinical'].to(device)
+            pathology_batch = batch['pathology'].to(device)
+            labels = batch['labels'].to(device)
+            
+            # Spatial coordinates inside the anatomy, in the [0,1]^3 uterus bounding box
+            batch_size = imaging_batch.size(0)
+            spatial_coords = pool.sample(batch_size)[0].to(device).requires_grad_(True)
+
+            # ── NaN guard: skip batch if inputs are NaNs ───────
+            if not (torch.isfinite(imaging_batch).all() and torch.isfinite(clinical_batch).all() and torch.isfinite(pathology_batch).all()):
+                logger.warning(f"Epoch {epoch+1}: Input batch contains NaNs. Skipping batch.")
+                continue
+
+            # Forward pass (bf16 autocast if requested; the losses and physics derivatives stay fp32)
+            with training_autocast(request.precision, device.type):
+                outputs = trained_model(imaging_batch, clinical_batch, pathology_batch, spatial_coords)
+            prediction, stiffness, displacement = (output.float() for output in outputs)
+
+            # ── NaN guard: skip batch if outputs contain NaNs ───────
+            if not (torch.isfinite(prediction).all() and torch.isfinite(stiffness).all() and torch.isfinite(displacement).all()):
+                optimizer.zero_grad()
+                logger.warning(f"Epoch {epoch+1}: Model produced NaN/Inf. Skipping batch.")
+                continue
+
+            # Clamp stiffness to physiologically valid range (kPa)
+            stiffness = torch.clamp(stiffness, 0.0, 10.0)
+
+            # ── NaN guard: skip batch if target labels are NaNs ───────
+            if not torch.isfinite(labels).all():
+                logger.warning(f"Epoch {epoch+1}: Target labels contain NaNs. Skipping batch.")
+                continue
+
+            # Physics points come from the collocation pool, independent of the batch size;
+            # each is paired with a random patient of the batch
+            displacement_fn = functools.partial(trained_model.point_displacement, apply_batch_norm=batch_size > 1)
+            fused_features = trained_model.fuse_features(imaging_batch, clinical_batch, pathology_batch)
+
+            def _patient_residuals(points: torch.Tensor) -> torch.Tensor:
+                patients = torch.randint(batch_size, (points.size(0),), device=device)
+                return loss_fn.pointwise_residual(
+                    points.to(device), stiffness[patients], displacement_fn, (fused_features[patients].detach(),)
+                )
+
+            pool.maybe_refresh(training_steps_total + 1, _patient_residuals)
+            physics_coords, _ = pool.sample(PHYSICS_POINTS)
+            patients = torch.randint(batch_size, (PHYSICS_POINTS,), device=device)
+
+            optimizer.zero_grad()
+            if balancer_optimizer is not None:
+                balancer_optimizer.zero_grad()
+            physics_loss = None
+            if loss_fn.chunk_size is not None:
+                # Backpropagate the physics term chunk by chunk with its current balancing weight;
+                # the weighted loss below then only carries the data and elastic terms' gradients
+                physics_loss = loss_fn.physics_backward(
+                    physics_coords.to(device), stiffness[patients], displacement_fn,
+                    (fused_features[patients],), weight=balancer.normalized_weights()[1].detach()
+                )
+
+            # Compute unweighted raw loss components
+            # Physics residual differentiates the per-point displacement field
+            _, loss_dict, raw_losses = loss_fn(
+                (prediction, stiffness, displacement), labels, physics_coords.to(device),
+                displacement_fn=displacement_fn,
+                point_inputs=(fused_features[patients],),
+                point_stiffness=stiffness[patients],
+                physics_loss=physics_loss
+            )
 
-        # Track per-node successes for dynamic contribution calculation
-        global _node_success_counts
-        if imaging_ok:
-            _node_success_counts["imaging"] += request.epochs
-        if clinical_ok:
-            _node_success_counts["clinical"] += request.epochs
-        if pathology_ok:
-            _node_success_counts["pathology"] += request.epochs
-
-        if not (imaging_ok and clinical_ok and pathology_ok):
-            logger.warning("Some nodes did not start training successfully")
-        
-        # 2. Train central model with REAL data
-        from utils.data_loader import get_train_val_loaders
-        from utils.physics_loss import PINNLoss, GradNormWeighting
-        
-        optimizer = torch.optim.Adam(model.parameters(), lr=request.learning_rate)
-        loss_fn = PINNLoss(lambda_physics=0.1, lambda_elastic=0.05)
-        grad_norm = GradNormWeighting(num_losses=3, alpha=0.12).to(device)
-        grad_norm_optimizer = torch.optim.Adam(grad_norm.parameters(), lr=0.025)
-        
-        # Get real data loaders
-        train_loader, val_loader = get_train_val_loaders(batch_size=request.batch_size)
-        
-        model.train()
-        epoch_history = []
-
-        for epoch in range(request.epochs):
-            epoch_loss = 0.0
-            epoch_physics_loss = 0.0
-            epoch_data_loss = 0.0
-            num_batches = 0
-
-            for batch in train_loader:
-                # Get REAL patient data from batch
-                imaging_batch = batch['imaging'].to(device)
-                clinical_batch = batch['clinical'].to(device)
-                pathology_batch = batch['pathology'].to(device)
-                labels = batch['labels'].to(device)
-                
-                # Mock spatial coordinates for the physical region [0,1]^3 representing the uterus bounding box
-                batch_size = imaging_batch.size(0)
-                spatial_coords = torch.rand((batch_size, 3), device=device, requires_grad=True)
-
-                # ── NaN guard: skip batch if inputs are NaNs ───────
-                if not (torch.isfinite(imaging_batch).all() and torch.isfinite(clinical_batch).all() and torch.isfinite(pathology_batch).all()):
-                    logger.warning(f"Epoch {epoch+1}: Input batch contains NaNs. Skipping batch.")
-                    continue
+            if not math.isfinite(loss_dict['total']):
+                optimizer.zero_grad()
+                logger.warning(f"Epoch {epoch+1}: Loss produced NaN ({loss_dict}). Skipping batch.")
+                continue
+
+            # Apply dynamic loss weighting
+            weighted_loss = balancer(raw_losses)
+
+            if use_grad_norm:
+                # GradNorm compares each loss's gradient norm on the shared fusion layer,
+                # one extra backward per loss through the retained graph
+                task_grad_norms = shared_gradient_norms(raw_losses, trained_model.fusion.weight)
+                weighted_loss.backward()
+                balancer_optimizer.zero_grad()
+                balancer.update_weights(raw_losses, task_grad_norms).backward()
+                balancer_optimizer.step()
+            else:
+                # One backward; uncertainty weights learn through it, ReLoBRaLo from the loss values
+                weighted_loss.backward()
+                if balancer_optimizer is not None:
+                    balancer_optimizer.step()
+                balancer.update(raw_losses)
+
+            # Gradient clipping (prevents gradient explosion)
+            torch.nn.utils.clip_grad_norm_(trained_model.parameters(), max_norm=1.0)
+            optimizer.step()
+            training_steps_total += 1
+
+            epoch_loss += loss_dict['total']
+            epoch_physics_loss += loss_dict['physics']
+            epoch_data_loss += loss_dict['data']
+            num_batches += 1
+            epoch_samples += batch_size
+
+        # Average losses over batches — skip NaN values
+        def _safe_avg(total, n):
+            val = total / max(n, 1)
+            return val if math.isfinite(val) else 0.0
+
+        avg_loss    = _safe_avg(epoch_loss, num_batches)
+        avg_physics = _safe_avg(epoch_physics_loss, num_batches)
+        avg_data    = _safe_avg(epoch_data_loss, num_batches)
+
+        epoch_time = time.perf_counter() - epoch_start
+        epoch_entry = {
+            "epoch": epoch,
+            "loss": avg_loss,
+            "data_loss": avg_data,
+            "physics_loss": avg_physics,
+            "precision": request.precision,
+            "epoch_time_s": round(epoch_time, 4),
+            "samples_per_s": round(epoch_samples / max(epoch_time, 1e-9), 2),
+            "timestamp": datetime.now().isoformat()
+        }
+        epoch_history.append(epoch_entry)
+        training_history.append(epoch_entry)
+        if on_epoch is not None:
+            on_epoch(epoch_entry)
+
+        logger.info(
+            f"Epoch {epoch+1}/{request.epochs} ({request.precision}, {epoch_entry['epoch_time_s']:.2f}s), "
+            f"Loss: {avg_loss:.4f}, Physics: {avg_physics:.4f}"
+        )
 
-                # Forward pass
-                prediction, stiffness, displacement = model(imaging_batch, clinical_batch, pathology_batch, spatial_coords)
+    # Save model to PVC. The checkpoint and the frozen serving engine are written
+    # under temporary names and renamed into place together once both exist, so a
+    # failed export leaves the previous pinn_latest.pth for the next restart
+    Path(MODEL_PATH).mkdir(parents=True, exist_ok=True)
+    save_path = Path(MODEL_PATH) / "pinn_latest.pth"
+    engine_path = Path(MODEL_PATH) / ENGINE_FILENAMES[serving_precision]
+    staged_save_path = save_path.with_name(save_path.name + ".tmp")
+    staged_engine_path = engine_path.with_name(engine_path.name + ".tmp")
+    try:
+        save_model(trained_model, str(staged_save_path), optimizer, request.epochs, epoch_history[-1]['loss'])
+        trained_model.eval()
+        trained_version = checkpoint_version(staged_save_path, name=save_path.name)
+        engine = None
+        if SERVING_ENGINE == "frozen":
+            engine = export_inference_engine(trained_model, str(staged_engine_path), trained_version, serving_precision)
+            os.replace(staged_engine_path, engine_path)
+        os.replace(staged_save_path, save_path)
+    finally:
+        staged_save_path.unlink(missing_ok=True)
+        staged_engine_path.unlink(missing_ok=True)
 
-                # ── NaN guard: skip batch if outputs contain NaNs ───────
-                if not (torch.isfinite(prediction).all() and torch.isfinite(stiffness).all() and torch.isfinite(displacement).all()):
-                    optimizer.zero_grad()
-                    grad_norm_optimizer.zero_grad()
-                    logger.warning(f"Epoch {epoch+1}: Model produced NaN/Inf. Skipping batch.")
-                    continue
+    return trained_model, trained_version, engine, epoch_history
 
-                # Clamp stiffness to physiologically valid range (kPa)
-                stiffness = torch.clamp(stiffness, 0.0, 10.0)
 
-                # ── NaN guard: skip batch if target labels are NaNs ───────
-                if not torch.isfinite(labels).all():
-                    logger.warning(f"Epoch {epoch+1}: Target labels contain NaNs. Skipping batch.")
-                    continue
+async def _run_training_job(job: TrainingJob) -> Dict:
+    """
+    Run one federated training round for a queued /train job.
 
-                # Compute unweighted raw loss components
-                _, loss_dict, raw_losses = loss_fn((prediction, stiffness, displacement), labels, spatial_coords)
+    Triggers the federated nodes, trains the central model on the training
+    executor and swaps it in. Runs on the training job worker, one job at a
+    time; exceptions mark the job failed. A cancelled job stops at the next
+    batch and leaves the central model unchanged.
+    """
+    global is_training, model, model_version, inference_engine
+    request = TrainRequest(**job.params)
+    resume_from = None
+    if request.resume_job_id is not None:
+        resumed = training_jobs.get(request.resume_job_id)
+        if resumed is None or resumed.checkpoint is None:
+            raise RuntimeError(f"No checkpoint to resume from for job {request.resume_job_id}")
+        resume_from = resumed.checkpoint
 
-                if not math.isfinite(loss_dict['total']):
-                    optimizer.zero_grad()
-                    grad_norm_optimizer.zero_grad()
-                    logger.warning(f"Epoch {epoch+1}: Loss produced NaN ({loss_dict}). Skipping batch.")
-                    continue
+    if model is None:
+        raise RuntimeError("Model not initialized")
+
+    is_training = True
+    try:
+        # 1. Trigger training on all federated nodes
+        logger.info(f"Training job {job.id}: triggering training on federated nodes...")
 
-                # Apply GradNorm Dynamic Weighting
-                weighted_loss = grad_norm(raw_losses)
+        nodes = node_registry.nodes()
+        started = await fan_out(
+            lambda node: trigger_node_training(node.url, node.name, request.epochs), nodes, NODE_FANOUT_CONCURRENCY
+        )
 
-                # 1. Standard Backward pass + gradient clipping (prevents gradient explosion)
-                optimizer.zero_grad()
-                weighted_loss.backward(retain_graph=True)
-                
-                # 2. GradNorm update
-                # Find the shared feature layer (last fusion layer before heads)
-                shared_layer_grad = model.fusion.weight.grad
-                if shared_layer_grad is not None:
-                    grad_norm_optimizer.zero_grad()
-                    l_grad = grad_norm.update_weights(raw_losses, shared_layer_grad)
-                    l_grad.backward()
-                    grad_norm_optimizer.step()
-                
-                torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=1.0)
-                optimizer.step()
-
-                epoch_loss += loss_dict['total']
-                epoch_physics_loss += loss_dict['physics']
-                epoch_data_loss += loss_dict['data']
-                num_batches += 1
-
-            # Average losses over batches — skip NaN values
-            def _safe_avg(total, n):
-                val = total / max(n, 1)
-                return val if math.isfinite(val) else 0.0
-
-            avg_loss    = _safe_avg(epoch_loss, num_batches)
-            avg_physics = _safe_avg(epoch_physics_loss, num_batches)
-            avg_data    = _safe_avg(epoch_data_loss, num_batches)
-
-            epoch_entry = {
-                "epoch": epoch,
-                "loss": avg_loss,
-                "data_loss": avg_data,
-                "physics_loss": avg_physics,
-                "timestamp": datetime.now().isoformat()
-            }
-            epoch_history.append(epoch_entry)
-            training_history.append(epoch_entry)
+        # Track per-modality successes for dynamic contribution calculation
+        global _node_success_counts
+        for node, node_ok in zip(nodes, started):
+            if node_ok:
+                _node_success_counts[node.modality] += request.epochs
 
-            logger.info(f"Epoch {epoch+1}/{request.epochs}, Loss: {avg_loss:.4f}, Physics: {avg_physics:.4f}")
+        if not all(started):
+            logger.warning(f"{started.count(False)} of {len(nodes)} nodes did not start training successfully")
+        job.raise_if_cancelled()
+        
+        # 2. Train central model with REAL data (off the event loop), streaming epochs to the job
+        trained_model, trained_version, engine, epoch_history = await training_executor.run(
+            _train_central_model, request,
+            functools.partial(training_jobs.record_epoch, job),
+            functools.partial(_before_training_batch, job),
+            resume_from
+        )
+        model = trained_model
+        inference_engine = engine
 
-        # Save model to PVC
-        Path(MODEL_PATH).mkdir(parents=True, exist_ok=True)
-        save_path = Path(MODEL_PATH) / "pinn_latest.pth"
-        save_model(model, str(save_path), optimizer, request.epochs, epoch_history[-1]['loss'])
+        # The new pinn_latest.pth changes the cache key; drop results from the old weights
+        model_version = trained_version
+        prediction_cache.invalidate()
 
         final_loss = epoch_history[-1]["loss"]
 
@@ -821,44 +1469,145 @@ async def train_federated(request: TrainRequest, background_tasks: BackgroundTas
         total_epochs_trained += request.epochs
 
         return {
-            "status": "success",
-            "message": "Federated training completed",
             "epochs_completed": request.epochs,
-            "final_loss": final_loss
+            "final_loss": final_loss,
+            "model_version": trained_version
         }
 
-    except Exception as e:
-        logger.error(f"Training error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
-
     finally:
         is_training = False
 
 
+def _before_training_batch(job: TrainingJob):
+    """Runs on the training thread before each batch."""
+    job.raise_if_cancelled()
+    training_throttle.apply()
+
+
+training_jobs = TrainingJobQueue(_run_training_job)
+training_throttle = TrainingThrottle(TRAINING_THROTTLE_RPS, TRAINING_THROTTLED_THREADS)
+
+
+@app.post("/train", response_model=TrainResponse, status_code=202)
+async def train_federated(request: TrainRequest):
+    """
+    Queue a federated training round and return its job id immediately.
+
+    Jobs run one at a time in the background, higher ``priority`` first;
+    follow one with GET /train/jobs/{job_id} or the /train/events stream.
+    ``resume_job_id`` continues from the checkpoint of a cancelled job.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not initialized")
+    if request.resume_job_id is not None:
+        resumed = training_jobs.get(request.resume_job_id)
+        if resumed is None or resumed.checkpoint is None:
+            raise HTTPException(status_code=400, detail="resume_job_id must name a cancelled job with a checkpoint")
+
+    job = training_jobs.submit(request.model_dump(), request.epochs, request.priority)
+    logger.info(
+        f"Queued training job {job.id} ({request.epochs} epochs, priority {request.priority}, "
+        f"{training_jobs.pending} pending)"
+    )
+    return {
+        "status": "queued",
+        "message": "Federated training queued",
+        "job_id": job.id
+    }
+
+
+@app.get("/train/jobs")
+async def list_training_jobs():
+    """All remembered training jobs, oldest first, without their per-epoch entries."""
+    return {"jobs": [job.to_dict(include_epochs=False) for job in training_jobs.jobs()]}
+
+
+@app.get("/train/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """State, per-epoch loss and throughput, and ETA of one training job."""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return job.to_dict()
+
+
+@app.post("/train/jobs/{job_id}/cancel")
+async def cancel_training_job(job_id: str):
+    """
+    Cancel a training job.
+
+    A queued job is cancelled immediately. A running job stops at the next
+    batch boundary, saves a checkpoint (reported as ``checkpoint`` on the
+    job) and becomes ``cancelled``; the central model is left unchanged.
+    """
+    job = training_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    if job.done and job.status != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Training job already {job.status}")
+    return job.to_dict(include_epochs=False)
+
+
+@app.get("/train/events")
+async def stream_training_events(job_id: Optional[str] = None):
+    """
+    Server-Sent Events stream of training job progress.
+
+    Each event is named after its type (queued, started, epoch, completed,
+    failed, cancelling, cancelled) and carries the job summary as JSON;
+    ``epoch`` events add the finished epoch's entry. ``job_id`` restricts the stream to one job.
+    """
+    if job_id is not None and training_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    queue = training_jobs.subscribe()
+
+    async def _stream():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), TRAINING_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if job_id is not None and message["job"]["job_id"] != job_id:
+                    continue
+                yield f"event: {message['event']}\ndata: {json.dumps(message, cls=_SafeEncoder)}\n\n"
+        finally:
+            training_jobs.unsubscribe(queue)
+
+    return StreamingResponse(_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _build_colored_mesh_glb(stiffness: float) -> bytes:
+    """Build the stiffness-coloured uterus mesh as GLB; runs on the compute executor."""
+    # Generate base mesh
+    mesh = generate_simplified_uterus_mesh()
+
+    # Generate stiffness map
+    prediction = min(max((stiffness - 1.5) / 7.0, 0.0), 1.0)
+    stiffness_values = generate_stiffness_map(
+        num_vertices=len(mesh.vertices),
+        prediction=prediction,
+        base_stiffness=1.5,
+        lesion_stiffness=stiffness
+    )
+
+    # Apply colormap
+    mesh = apply_stiffness_colormap(mesh, stiffness_values, colormap='RdYlGn_r')
+
+    # Convert to GLB
+    return mesh_to_glb_bytes(mesh)
+
+
 @app.get("/mesh/{stiffness}")
 async def get_colored_mesh(stiffness: float):
     """
     Generate a 3D mesh colored by stiffness prediction.
     """
     try:
-        # Generate base mesh
-        mesh = generate_simplified_uterus_mesh()
-        
-        # Generate stiffness map
-        prediction = min(max((stiffness - 1.5) / 7.0, 0.0), 1.0)
-        stiffness_values = generate_stiffness_map(
-            num_vertices=len(mesh.vertices),
-            prediction=prediction,
-            base_stiffness=1.5,
-            lesion_stiffness=stiffness
-        )
-        
-        # Apply colormap
-        mesh = apply_stiffness_colormap(mesh, stiffness_values, colormap='RdYlGn_r')
-        
-        # Convert to GLB
         from fastapi.responses import Response
-        glb_bytes = mesh_to_glb_bytes(mesh)
+        glb_bytes = await compute_executor.run(_build_colored_mesh_glb, stiffness)
         
         return Response(
             content=glb_bytes,
@@ -870,6 +1619,115 @@ async def get_colored_mesh(stiffness: float):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/predict/{prediction_id}/volume")
+async def get_prediction_volume(
+    prediction_id: str,
+    resolution: int = VOLUME_GRID_SIZE,
+    format: str = "raw",
+    dtype: str = "float32"
+):
+    """
+    Materialize the stiffness volume of a recent prediction on demand.
+
+    Query params:
+        resolution - voxels per axis (16-256)
+        format     - 'raw' (dense bytes), 'rle' (sparse runs) or 'json'
+        dtype      - 'float32' or 'float16' for binary formats
+
+    Predictions are kept for PREDICTION_TTL_SECONDS; the encoded volume is
+    cached with them so repeated fetches and the WebSocket broadcast share
+    one computation.
+    """
+    if format not in VOLUME_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(VOLUME_ENCODINGS)}")
+    if dtype not in VOLUME_DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype must be one of {list(VOLUME_DTYPES)}")
+    if not 16 <= resolution <= 256:
+        raise HTTPException(status_code=400, detail="resolution must be between 16 and 256")
+
+    try:
+        payload, headers = await compute_executor.run(
+            prediction_store.volume, prediction_id, resolution, format, dtype
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Prediction {prediction_id} not found or expired")
+    except Exception as e:
+        logger.error(f"Volume generation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if format == "json":
+        return {
+            "prediction_id": prediction_id,
+            "vtk_volume": payload,
+            "volume_dimensions": [resolution] * 3
+        }
+
+    from fastapi.responses import Response
+    return Response(
+        content=payload,
+        media_type="application/octet-stream",
+        headers=headers
+    )
+
+
+def _stiffness_volume_payload(risk_level: str, stiffness: float, grid_size: int, encoding: str, dtype: str):
+    """Build (or reuse) a stiffness volume and encode it; runs on the compute executor."""
+    volume = volume_cache.get(risk_level, stiffness, grid_size)
+    if encoding == "json":
+        return volume.flatten().tolist(), {}
+    return encode_volume(volume, encoding, dtype)
+
+
+@app.get("/volume/{stiffness}")
+async def get_stiffness_volume(
+    stiffness: float,
+    risk_level: str = "low",
+    encoding: str = "raw",
+    dtype: str = "float32",
+    grid_size: int = 64
+):
+    """
+    Return the anatomical stiffness volume for the VTK viewer.
+
+    Query params:
+        risk_level - risk level the lesion overlay is keyed on
+        encoding   - 'raw' (dense bytes), 'rle' (sparse runs) or 'json'
+        dtype      - 'float32' or 'float16' for binary encodings
+        grid_size  - voxels per axis (16-256)
+
+    Binary encodings are served as application/octet-stream with the
+    dimensions, dtype and encoding in X-Volume-* headers.
+    """
+    if encoding not in VOLUME_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"encoding must be one of {list(VOLUME_ENCODINGS)}")
+    if dtype not in VOLUME_DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype must be one of {list(VOLUME_DTYPES)}")
+    if not 16 <= grid_size <= 256:
+        raise HTTPException(status_code=400, detail="grid_size must be between 16 and 256")
+
+    try:
+        payload, headers = await compute_executor.run(
+            _stiffness_volume_payload, risk_level, stiffness, grid_size, encoding, dtype
+        )
+
+        if encoding == "json":
+            return {
+                "vtk_volume": payload,
+                "volume_dimensions": [grid_size] * 3
+            }
+
+        from fastapi.responses import Response
+        return Response(
+            content=payload,
+            media_type="application/octet-stream",
+            headers=headers
+        )
+
+    except Exception as e:
+        logger.error(f"Volume generation error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/logs")
 async def get_logs(since: str = None, limit: int = 100):
     """
@@ -888,13 +1746,11 @@ async def get_logs(since: str = None, limit: int = 100):
 @app.get("/stats")
 async def get_stats():
     """Get application statistics for dashboard KPIs."""
-    # Get node statuses
-    imaging_status = await check_node_health(IMAGING_SERVICE_URL)
-    clinical_status = await check_node_health(CLINICAL_SERVICE_URL)
-    pathology_status = await check_node_health(PATHOLOGY_SERVICE_URL)
+    # Get node statuses (from the background poller)
+    probes = await node_health.statuses()
     
     # Count active nodes
-    statuses = [imaging_status, clinical_status, pathology_status]
+    statuses = [probe["status"] for probe in probes.values()]
     active_nodes = sum(1 for status in statuses if status == "healthy")
     total_nodes = len(statuses)
     
@@ -915,38 +1771,71 @@ async def get_stats():
 
 @app.get("/status/nodes")
 async def get_node_status():
-    """Get status of all federated nodes."""
-    nodes = [
-        ("Imaging", IMAGING_SERVICE_URL),
-        ("Clinical", CLINICAL_SERVICE_URL),
-        ("Pathology", PATHOLOGY_SERVICE_URL)
-    ]
+    """Get status of all federated nodes, as of the last background health poll."""
+    probes = await node_health.statuses()
     
     statuses = []
-    for name, url in nodes:
-        health = await check_node_health(url)
-        
-        # Try to get training status
-        is_training_node = False
-        try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                resp = await client.get(f"{url}/health")
-                if resp.status_code == 200:
-                    data = resp.json()
-                    is_training_node = data.get("is_training", False)
-        except:
-            pass
-        
+    for node_id, probe in probes.items():
+        node = node_registry.get(node_id)
         statuses.append({
-            "name": name,
-            "url": url,
-            "status": health,
-            "is_training": is_training_node
+            "node_id": node_id,
+            "modality": node.modality if node else None,
+            "site": node.site if node else None,
+            "name": probe["name"],
+            "url": probe["url"],
+            "status": probe["status"],
+            "is_training": probe["is_training"],
+            "latency_ms": probe["latency_ms"],
+            "checked_at": probe["checked_at"],
+            "breaker": probe["breaker"]
         })
     
     return {"nodes": statuses}
 
 
+@app.post("/nodes/register")
+async def register_node(request: NodeRegisterRequest):
+    """
+    Register a federated node, or re-register it after a restart.
+
+    The node must then heartbeat at least every ``heartbeat_ttl_s`` seconds
+    to stay in the training and health fan-outs. Registering at the URL
+    of a configured node returns that node; 400 means the request cannot
+    succeed as sent and should not be retried.
+    """
+    try:
+        node = node_registry.register(request.url, request.modality, request.site, request.node_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**node.to_dict(), "heartbeat_ttl_s": node_registry.heartbeat_ttl}
+
+
+@app.post("/nodes/{node_id}/heartbeat")
+async def node_heartbeat(node_id: str):
+    """Keep a registered node listed; 404 means it expired and must register again."""
+    node = node_registry.heartbeat(node_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Node not registered")
+    return {"node_id": node.id, "last_heartbeat": node.last_heartbeat}
+
+
+@app.delete("/nodes/{node_id}")
+async def deregister_node(node_id: str):
+    """Remove a registered node, e.g. on graceful shutdown."""
+    node = node_registry.get(node_id)
+    if node is not None and node.static:
+        raise HTTPException(status_code=400, detail="Configured nodes cannot be deregistered")
+    if not node_registry.deregister(node_id):
+        raise HTTPException(status_code=404, detail="Node not registered")
+    return {"message": f"Node {node_id} deregistered"}
+
+
+@app.get("/nodes")
+async def list_nodes(modality: Optional[str] = None):
+    """Live registered nodes, optionally of one modality."""
+    return {"nodes": [node.to_dict() for node in node_registry.nodes(modality)]}
+
+
 # ==================== Patient Management Endpoints ====================
 
 @app.post("/patients")
@@ -1004,25 +1893,75 @@ async def delete_patient(patient_id: str):
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # Per-connection binary volume preference: (encoding, dtype), or None for JSON
+        self.volume_formats: Dict[WebSocket, Optional[tuple]] = {}
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, volume_format: Optional[tuple] = None):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.volume_formats[websocket] = volume_format
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
-
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            await connection.send_json(message)
+        self.volume_formats.pop(websocket, None)
+
+    async def broadcast(self, message: dict, prediction_id: Optional[str] = None):
+        """
+        Send a message to every client, serialising it once per format.
+
+        When ``prediction_id`` is given the prediction's stiffness volume is
+        attached: JSON clients receive it as ``vtk_volume``, clients that opted
+        into a binary volume format receive the message followed by a binary
+        frame. Volumes come from the prediction store, so they are shared with
+        /predict/{id}/volume and only materialized if someone is listening.
+        """
+        frames: Dict[Optional[tuple], tuple] = {}
+
+        for connection in list(self.active_connections):
+            volume_format = self.volume_formats.get(connection) if prediction_id else None
+
+            if volume_format not in frames:
+                if prediction_id is None:
+                    frames[None] = (json.dumps(message, separators=(",", ":")), None)
+                elif volume_format is None:
+                    volume, _ = await compute_executor.run(
+                        prediction_store.volume, prediction_id, VOLUME_GRID_SIZE, "json"
+                    )
+                    frames[None] = (json.dumps({**message, "vtk_volume": volume}, separators=(",", ":")), None)
+                else:
+                    encoding, dtype = volume_format
+                    payload, _ = await compute_executor.run(
+                        prediction_store.volume, prediction_id, VOLUME_GRID_SIZE, encoding, dtype
+                    )
+                    header = {**message, "volume_encoding": encoding, "volume_dtype": dtype}
+                    frames[volume_format] = (json.dumps(header, separators=(",", ":")), payload)
+
+            text, payload = frames[volume_format]
+            await connection.send_text(text)
+            if payload is not None:
+                await connection.send_bytes(payload)
 
 manager = ConnectionManager()
 
 
 @app.websocket("/ws/stream")
-async def websocket_stream(websocket: WebSocket):
-    """Real-time streaming endpoint for physics predictions and matrix tensors."""
-    await manager.connect(websocket)
+async def websocket_stream(websocket: WebSocket, volume_encoding: str = "json", volume_dtype: str = "float32"):
+    """
+    Real-time streaming endpoint for physics predictions and matrix tensors.
+
+    Query params:
+        volume_encoding - 'json' (default), or 'raw'/'rle' to receive the
+                          stiffness volume as a binary frame after each message
+        volume_dtype    - 'float32' (default) or 'float16' for binary frames
+    """
+    volume_format = None
+    if volume_encoding != "json":
+        if volume_encoding not in VOLUME_ENCODINGS or volume_dtype not in VOLUME_DTYPES:
+            await websocket.close(code=1003)
+            return
+        volume_format = (volume_encoding, volume_dtype)
+
+    await manager.connect(websocket, volume_format)
     try:
         while True:
             data = await websocket.receive_text()
@@ -1050,7 +1989,27 @@ async def get_config():
 
 @app.put("/config")
 async def update_config(settings_data: dict):
-    """Update application settings."""
+    """
+    Update application settings.
+
+    Setting ``serving_precision`` ('fp32' or 'int8') rebuilds the frozen
+    serving engine at that precision.
+    """
+    global serving_precision
+
+    if "serving_precision" in settings_data:
+        try:
+            precision = resolve_serving_precision(str(settings_data["serving_precision"]).lower())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        settings_data = {**settings_data, "serving_precision": precision}
+
+        if precision != serving_precision:
+            serving_precision = precision
+            await compute_executor.run(initialize_inference_engine)
+            # Quantized and fp32 engines score slightly differently
+            prediction_cache.invalidate()
+
     try:
         settings = settings_manager.update_settings(settings_data)
         logger.info(f"Settings updated: {settings}")
@@ -1155,14 +2114,36 @@ async def startup_event():
     logger.info("PINN Central Server Starting...")
     logger.info(f"Device: {device}")
     logger.info(f"Model path: {MODEL_PATH}")
-    logger.info(f"Imaging service: {IMAGING_SERVICE_URL}")
-    logger.info(f"Clinical service: {CLINICAL_SERVICE_URL}")
-    logger.info(f"Pathology service: {PATHOLOGY_SERVICE_URL}")
+    logger.info(f"Imaging service: {IMAGING_SERVICE_URL or '(none configured)'}")
+    logger.info(f"Clinical service: {CLINICAL_SERVICE_URL or '(none configured)'}")
+    logger.info(f"Pathology service: {PATHOLOGY_SERVICE_URL or '(none configured)'}")
     logger.info("=" * 50)
 
-    # Initialize model
+    # Initialize model (and its frozen serving engine at the configured precision)
+    global serving_precision
+    try:
+        serving_precision = resolve_serving_precision(
+            str(settings_manager.get_settings().get("serving_precision", SERVING_PRECISION)).lower()
+        )
+    except ValueError as e:
+        logger.warning(f"{e}; serving fp32")
+        serving_precision = "fp32"
     initialize_model()
 
+    # Build the static anatomy template once; predictions only overlay lesions
+    volume_cache.max_entries = VOLUME_CACHE_SIZE
+    volume_cache.template(VOLUME_GRID_SIZE)
+    prediction_store.ttl_seconds = PREDICTION_TTL_SECONDS
+
+    # Worker pools for CPU-bound stages, then the /predict micro-batcher on top
+    compute_executor.start()
+    parser_executor.start()
+    training_executor.start()
+    predict_batcher.start()
+    training_jobs.start()
+    node_client.start()
+    node_health.start()
+
     # Restore total epochs trained from persisted history
     global total_epochs_trained
     try:
@@ -1173,6 +2154,18 @@ async def startup_event():
         logger.warning(f"Could not restore training history: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background workers on shutdown."""
+    await predict_batcher.stop()
+    await training_jobs.stop()
+    await node_health.stop()
+    await node_client.stop()
+    compute_executor.shutdown(wait=False)
+    parser_executor.shutdown(wait=False)
+    training_executor.shutdown(wait=False)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
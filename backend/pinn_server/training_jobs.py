@@ -0,0 +1,373 @@
+"""
+Background training jobs for /train.
+
+A federated round (node triggers plus several epochs of central training)
+takes minutes, far longer than an HTTP request should stay open. /train
+instead submits a TrainingJob to the TrainingJobQueue and returns its id at
+once. A single worker task on the event loop runs the jobs one after the
+other, highest priority first and FIFO within a priority; the CPU-bound
+epochs themselves run on the training executor.
+
+Progress is published as events to every subscriber (the /train/events
+Server-Sent Events stream) and kept on the job for /train/jobs/{id}:
+
+- ``queued``, ``started``, ``completed``, ``failed``, ``cancelled``: job
+  state changes; ``cancelling`` when a running job is asked to stop
+- ``epoch``: one finished epoch with its loss, throughput and the job's ETA
+
+Epochs are reported from the training thread; record_epoch() hands them to
+the event loop, which owns the job state and the subscriber queues.
+
+A queued job is cancelled at once. A running one is cancelled
+cooperatively: cancel() sets a flag that the training loop checks between
+batches through TrainingJob.raise_if_cancelled(), and the loop saves a
+checkpoint before letting TrainingCancelled propagate.
+
+TrainingThrottle keeps retraining from starving inference: while /predict
+traffic is above a threshold, the training thread runs with fewer torch
+intra-op threads.
+"""
+
+import asyncio
+import collections
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+
+
+class TrainingCancelled(Exception):
+    """Raised on the training thread when its job was cancelled; carries the checkpoint path if one was saved."""
+
+    def __init__(self, checkpoint: Optional[str] = None):
+        super().__init__("Training cancelled")
+        self.checkpoint = checkpoint
+
+
+class TrainingJob:
+    """State and per-epoch progress of one training run."""
+
+    def __init__(self, params: Dict[str, Any], epochs: int, priority: int = 0):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.epochs_total = epochs
+        self.priority = priority
+        self.status = "queued"
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.epochs: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.checkpoint: Optional[str] = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def raise_if_cancelled(self):
+        """Raise TrainingCancelled if cancel() was called; the training loop calls this between batches."""
+        if self._cancel.is_set():
+            raise TrainingCancelled()
+
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time from the mean epoch time so far; None before the first epoch."""
+        if self.done:
+            return 0.0
+        if not self.epochs or self.started is None:
+            return None
+        per_epoch = (time.time() - self.started) / len(self.epochs)
+        return round(per_epoch * max(0, self.epochs_total - len(self.epochs)), 2)
+
+    def to_dict(self, include_epochs: bool = True) -> Dict[str, Any]:
+        job = {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "cancel_requested": self.cancel_requested,
+            "params": self.params,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "epochs_total": self.epochs_total,
+            "epochs_completed": len(self.epochs),
+            "eta_s": self.eta_seconds(),
+            "result": self.result,
+            "error": self.error,
+            "checkpoint": self.checkpoint,
+        }
+        if include_epochs:
+            job["epochs"] = self.epochs
+        return job
+
+
+class TrainingJobQueue:
+    """
+    Priority queue of training jobs run one at a time, with progress fan-out.
+
+    ``run_fn(job)`` is the coroutine that performs a job and returns its
+    result dict; TrainingCancelled marks the job cancelled and any other
+    exception marks it failed. A higher ``priority`` starts first; equal
+    priorities start in submission order. A running job is never preempted
+    by a later, higher-priority one; cancel it to make room. At most
+    ``max_jobs`` jobs are remembered; the oldest finished ones are forgotten
+    first.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[TrainingJob], Awaitable[Dict[str, Any]]],
+        max_jobs: int = 100,
+        subscriber_buffer: int = 256
+    ):
+        self.run_fn = run_fn
+        self.max_jobs = max_jobs
+        self.subscriber_buffer = subscriber_buffer
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._subscribers: List[asyncio.Queue] = []
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.current: Optional[TrainingJob] = None
+
+    @property
+    def pending(self) -> int:
+        """Jobs waiting to start."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the worker task on the running event loop."""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.PriorityQueue()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Training job worker started")
+
+    async def stop(self):
+        """Stop the worker; a running job is abandoned and queued jobs fail."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, _, job = self._queue.get_nowait()
+            if not job.done:
+                self._finish(job, error="Training worker stopped")
+
+    def submit(self, params: Dict[str, Any], epochs: int, priority: int = 0) -> TrainingJob:
+        """Queue a job and return it; must be called on the event loop."""
+        self.start()
+        job = TrainingJob(params, epochs, priority)
+        self._jobs[job.id] = job
+        self._forget_old_jobs()
+        self._queue.put_nowait((-priority, next(self._sequence), job))
+        self._publish("queued", job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """
+        Cancel a job; returns it, or None if unknown.
+
+        A queued job is marked cancelled immediately. A running job keeps
+        status ``running`` until the training loop reaches the next batch
+        boundary and stops. Finished jobs are returned unchanged.
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job.cancel_requested:
+            return job
+        job._cancel.set()
+        if job.status == "queued":
+            # Left in the queue; the worker skips it
+            self._finish(job, cancelled=True)
+        else:
+            self._publish("cancelling", job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[TrainingJob]:
+        """Known jobs, oldest first."""
+        return list(self._jobs.values())
+
+    def record_epoch(self, job: TrainingJob, entry: Dict[str, Any]):
+        """Report a finished epoch; safe to call from the training thread."""
+        self._loop.call_soon_threadsafe(self._add_epoch, job, dict(entry))
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every subsequent event as a dict."""
+        queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    async def _run(self):
+        while True:
+            _, _, job = await self._queue.get()
+            if job.done:
+                continue
+            self.current = job
+            job.status = "running"
+            job.started = time.time()
+            self._publish("started", job)
+            try:
+                result = await self.run_fn(job)
+            except TrainingCancelled as e:
+                logger.info(f"Training job {job.id} cancelled (checkpoint: {e.checkpoint})")
+                job.checkpoint = e.checkpoint
+                self._finish(job, cancelled=True)
+            except Exception as e:
+                logger.error(f"Training job {job.id} failed: {e}", exc_info=True)
+                self._finish(job, error=str(e))
+            else:
+                self._finish(job, result=result)
+            finally:
+                self.current = None
+
+    def _add_epoch(self, job: TrainingJob, entry: Dict[str, Any]):
+        job.epochs.append(entry)
+        self._publish("epoch", job, epoch=entry)
+
+    def _finish(
+        self,
+        job: TrainingJob,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        cancelled: bool = False
+    ):
+        job.finished = time.time()
+        job.result = result
+        job.error = error
+        if cancelled:
+            job.status = "cancelled"
+        else:
+            job.status = "failed" if error is not None else "completed"
+        self._publish(job.status, job)
+
+    def _publish(self, event: str, job: TrainingJob, **extra):
+        message = {"event": event, "job": job.to_dict(include_epochs=False), **extra}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # A stalled subscriber misses events rather than holding up training
+                logger.warning("Training event subscriber is not keeping up; dropping an event")
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        while len(self._jobs) > self.max_jobs and finished:
+            self._jobs.pop(finished.pop(0))
+
+    def prometheus_lines(self) -> List[str]:
+        counts = {state: 0 for state in JOB_STATES}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return [
+            "# HELP endotwin_training_jobs Remembered training jobs by state",
+            "# TYPE endotwin_training_jobs gauge",
+            *(f'endotwin_training_jobs{{state="{state}"}} {count}' for state, count in counts.items()),
+        ]
+
+
+class TrainingThrottle:
+    """
+    Caps training's torch intra-op threads while inference traffic is high.
+
+    The /predict handlers call record_request(); the training loop calls
+    apply() on the training thread between batches. While more than
+    ``busy_rps`` requests per second arrived over the last ``window_s``
+    seconds, apply() limits the calling thread to ``throttled_threads``
+    intra-op threads, leaving the remaining cores to inference; otherwise it
+    restores the thread count the process started with.
+
+    torch.set_num_threads() also sets the process-wide default that threads
+    created afterwards start with, so a pool worker spawned while training is
+    throttled would run inference on ``throttled_threads`` for good.
+    Inference workers therefore call pin_inference_threads() when they start
+    (as the executor initializer) and before each inference call.
+    ``busy_rps <= 0`` disables the throttle.
+    """
+
+    def __init__(self, busy_rps: float, throttled_threads: int = 1, window_s: float = 10.0):
+        self.busy_rps = busy_rps
+        self.throttled_threads = max(1, throttled_threads)
+        self.window_s = window_s
+        self.full_threads = torch.get_num_threads()
+        self._requests = collections.deque()
+        self._lock = threading.Lock()
+        self.throttled = False
+        self.throttled_batches_total = 0
+
+    def record_request(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._requests.append(now)
+            self._expire(now)
+
+    def request_rate(self, now: Optional[float] = None) -> float:
+        """Requests per second over the last ``window_s`` seconds."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            return len(self._requests) / self.window_s
+
+    def training_threads(self, now: Optional[float] = None) -> int:
+        """Intra-op thread count training should use right now."""
+        if self.busy_rps > 0 and self.request_rate(now) > self.busy_rps:
+            return min(self.throttled_threads, self.full_threads)
+        return self.full_threads
+
+    def apply(self):
+        """Set the calling (training) thread's intra-op threads for the next batch."""
+        threads = self.training_threads()
+        self.throttled = threads < self.full_threads
+        if self.throttled:
+            self.throttled_batches_total += 1
+        if torch.get_num_threads() != threads:
+            logger.info(f"Training intra-op threads -> {threads} (predict rate {self.request_rate():.1f}/s)")
+            torch.set_num_threads(threads)
+
+    def pin_inference_threads(self):
+        """Give the calling (inference) thread the full intra-op thread count."""
+        if torch.get_num_threads() != self.full_threads:
+            torch.set_num_threads(self.full_threads)
+
+    def _expire(self, now: float):
+        while self._requests and self._requests[0] < now - self.window_s:
+            self._requests.popleft()
+
+    def prometheus_lines(self) -> List[str]:
+        return [
+            "# HELP endotwin_training_throttled 1 while training runs with capped intra-op threads",
+            "# TYPE endotwin_training_throttled gauge",
+            f"endotwin_training_throttled {int(self.throttled)}",
+            "# HELP endotwin_training_throttled_batches_total Training batches run with capped intra-op threads",
+            "# TYPE endotwin_training_throttled_batches_total counter",
+            f"endotwin_training_throttled_batches_total {self.throttled_batches_total}",
+            "# HELP endotwin_predict_request_rate /predict requests per second over the throttle window",
+            "# TYPE endotwin_predict_request_rate gauge",
+            f"endotwin_predict_request_rate {self.request_rate():.3f}",
+        ]
@@ -0,0 +1,73 @@
+import asyncio
+
+import torch
+
+from pinn_server.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    def infer(x, y):
+        calls.append(x.size(0))
+        return x * 2, y + 1, "shared"
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=8, max_wait_ms=50)
+        batcher.start()
+        try:
+            requests = [
+                batcher.submit(torch.full((rows, 2), float(i)), torch.full((rows, 1), float(i)))
+                for i, rows in enumerate([1, 2, 1])
+            ]
+            return await asyncio.gather(*requests)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+
+    assert calls == [4]
+    for i, (doubled, shifted, extra) in enumerate(results):
+        assert torch.all(doubled == 2 * i)
+        assert torch.all(shifted == i + 1)
+        assert extra == "shared"
+    assert [r[0].size(0) for r in results] == [1, 2, 1]
+
+
+def test_batch_is_capped_at_max_batch_size():
+    calls = []
+
+    def infer(x):
+        calls.append(x.size(0))
+        return (x,)
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=2, max_wait_ms=50)
+        batcher.start()
+        try:
+            await asyncio.gather(*(batcher.submit(torch.zeros(1, 1)) for _ in range(5)))
+        finally:
+            await batcher.stop()
+        return batcher
+
+    batcher = asyncio.run(scenario())
+    assert calls == [2, 2, 1]
+    assert batcher.batch_size_histogram.count == 3
+
+
+def test_inference_errors_propagate_to_every_request():
+    def infer(x):
+        raise ValueError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=4, max_wait_ms=10)
+        batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(torch.zeros(1, 1)) for _ in range(2)), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
@@ -0,0 +1,60 @@
+import pytest
+import torch
+
+from utils.collocation import CollocationPool, anatomy_mask, inside_mask, sample_in_mask
+
+
+@pytest.mark.parametrize("method", ["sobol", "lhs"])
+def test_pool_points_lie_inside_the_anatomy(method):
+    mask = anatomy_mask()
+    points = sample_in_mask(4096, mask, method=method)
+
+    assert points.shape == (4096, 3)
+    assert inside_mask(points, mask).all()
+    # Uniform points in the unit cube mostly miss the uterus
+    assert inside_mask(torch.rand(4096, 3), mask).float().mean() < 0.2
+
+
+def test_sample_size_is_independent_of_pool_and_batch():
+    pool = CollocationPool(num_points=2048)
+    points, indices = pool.sample(300)
+
+    assert points.shape == (300, 3)
+    torch.testing.assert_close(points, pool.points[indices])
+
+
+def test_rar_refresh_concentrates_sampling_on_large_residuals():
+    pool = CollocationPool(num_points=2048, resample_every=10, num_candidates=2048, rar_offset=0.1)
+    hot = pool.points[:, 0] > pool.points[:, 0].quantile(0.9)
+
+    def residual_fn(points):
+        return torch.where(points[:, 0] > pool.points[:, 0].quantile(0.9), 100.0, 1.0)
+
+    assert not pool.maybe_refresh(5, residual_fn)
+    assert pool.maybe_refresh(10, residual_fn)
+    assert pool.refreshes == 1
+
+    _, indices = pool.sample(5000)
+    # 10% of the pool carries the large residuals and now most of the draws
+    assert hot[indices].float().mean() > 0.7
+
+
+def test_zero_residuals_keep_uniform_weights():
+    pool = CollocationPool(num_points=1024, resample_every=1)
+    pool.maybe_refresh(1, lambda points: torch.zeros(points.size(0)))
+
+    assert pool.refreshes == 1
+    assert torch.all(pool.weights == 1.0)
+
+
+def test_reset_restores_uniform_sampling():
+    pool = CollocationPool(num_points=1024, resample_every=1, num_candidates=1024)
+    points = pool.points.clone()
+    pool.maybe_refresh(1, lambda points: points[:, 0] * 100.0)
+    assert not torch.all(pool.weights == 1.0)
+
+    pool.reset()
+
+    assert torch.isnan(pool.residuals).all()
+    assert torch.all(pool.weights == 1.0)
+    assert torch.equal(pool.points, points)
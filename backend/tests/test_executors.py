@@ -0,0 +1,82 @@
+import asyncio
+import math
+import threading
+import time
+
+import pytest
+import torch
+
+from pinn_server.batching import MicroBatcher
+from pinn_server.executors import InstrumentedExecutor
+
+
+def test_thread_executor_records_queue_wait():
+    executor = InstrumentedExecutor("test", max_workers=1)
+
+    async def scenario():
+        try:
+            return await asyncio.gather(
+                executor.run(time.sleep, 0.05),
+                executor.run(threading.current_thread),
+            )
+        finally:
+            executor.shutdown()
+
+    _, worker = asyncio.run(scenario())
+
+    assert worker is not threading.main_thread()
+    assert executor.run_time_histogram.count == 2
+    # The second task queued behind the first on the single worker
+    assert executor.queue_wait_histogram.mean > 0.015
+    assert executor.pending == 0
+
+
+def test_executor_propagates_exceptions():
+    executor = InstrumentedExecutor("test", max_workers=1)
+
+    async def scenario():
+        try:
+            await executor.run(math.sqrt, -1.0)
+        finally:
+            executor.shutdown()
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+    assert executor.pending == 0
+
+
+def test_process_executor_runs_picklable_functions():
+    executor = InstrumentedExecutor("parser", max_workers=1, kind="process")
+
+    async def scenario():
+        try:
+            return await executor.run(math.factorial, 10)
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == math.factorial(10)
+    assert executor.queue_wait_histogram.count == 1
+
+
+def test_micro_batcher_dispatches_on_executor():
+    executor = InstrumentedExecutor("test", max_workers=1)
+    threads = []
+
+    def infer(x):
+        threads.append(threading.current_thread())
+        return (x + 1,)
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_wait_ms=1, executor=executor)
+        batcher.start()
+        try:
+            return await batcher.submit(torch.zeros(2, 1))
+        finally:
+            await batcher.stop()
+            executor.shutdown()
+
+    (result,) = asyncio.run(scenario())
+
+    assert torch.all(result == 1)
+    assert threads and threads[0] is not threading.main_thread()
+    assert executor.run_time_histogram.count == 1
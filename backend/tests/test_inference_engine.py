@@ -0,0 +1,102 @@
+import pytest
+import torch
+
+from pinn_server.model import EndoPINN
+from pinn_server.inference_engine import (
+    build_inference_engine,
+    export_inference_engine,
+    load_inference_engine,
+    fold_batch_norm,
+)
+
+pytestmark = [
+    pytest.mark.filterwarnings("ignore::FutureWarning"),
+    pytest.mark.filterwarnings("ignore:.*quantize:UserWarning"),
+]
+
+
+def _model(dropout: float = 0.3) -> EndoPINN:
+    torch.manual_seed(1)
+    model = EndoPINN(dropout=dropout)
+    for bn in [model.fusion_bn, *model.batch_norms]:
+        bn.running_mean.uniform_(-0.5, 0.5)
+        bn.running_var.uniform_(0.5, 2.0)
+        bn.weight.data.uniform_(0.5, 1.5)
+        bn.bias.data.uniform_(-0.2, 0.2)
+    return model.eval()
+
+
+def _inputs(batch_size: int = 4):
+    torch.manual_seed(0)
+    return torch.rand(batch_size, 128), torch.rand(batch_size, 64), torch.rand(batch_size, 64)
+
+
+def test_fold_batch_norm_matches_linear_then_bn():
+    model = _model()
+    x = torch.rand(8, model.fusion.in_features)
+    fused = fold_batch_norm(model.fusion, model.fusion_bn)
+    torch.testing.assert_close(fused(x), model.fusion_bn(model.fusion(x)), rtol=1e-5, atol=1e-5)
+
+
+@pytest.mark.parametrize("batch_size", [1, 5])
+def test_engine_matches_eager_mc_with_same_dropout_masks(batch_size):
+    model = _model()
+    engine = build_inference_engine(model)
+    inputs = _inputs(batch_size)
+
+    torch.manual_seed(42)
+    eager = model.predict_with_confidence(*inputs, mc_samples=8, apply_batch_norm=True)
+    torch.manual_seed(42)
+    frozen = engine.predict_with_confidence(*inputs, mc_samples=8)
+
+    for e, f in zip(eager, frozen):
+        assert f.shape == e.shape
+        torch.testing.assert_close(f, e, rtol=1e-4, atol=1e-4)
+
+
+def test_adaptive_sampling_on_engine():
+    engine = build_inference_engine(_model())
+    prediction, stiffness, confidence, samples_used = engine.predict_with_adaptive_confidence(
+        *_inputs(3), min_samples=4, max_samples=12
+    )
+    assert prediction.shape == stiffness.shape == confidence.shape == (3, 1)
+    assert 4 <= samples_used <= 12
+
+
+def test_saved_engine_records_source_version(tmp_path):
+    path = str(tmp_path / "engine.pt")
+    engine = export_inference_engine(_model(dropout=0.0), path, source_version="ckpt-1")
+
+    loaded = load_inference_engine(path, expected_version="ckpt-1")
+    assert loaded is not None and loaded.source_version == "ckpt-1"
+    torch.testing.assert_close(
+        loaded.predict_with_confidence(*_inputs(), mc_samples=2),
+        engine.predict_with_confidence(*_inputs(), mc_samples=2)
+    )
+
+    assert load_inference_engine(path, expected_version="ckpt-2") is None
+    assert load_inference_engine(str(tmp_path / "missing.pt")) is None
+
+
+def test_int8_engine_stays_close_to_fp32(tmp_path):
+    model = _model()
+    fp32 = build_inference_engine(model)
+    int8 = export_inference_engine(model, str(tmp_path / "int8.pt"), "ckpt-1", precision="int8")
+    inputs = _inputs(16)
+
+    torch.manual_seed(7)
+    reference = fp32.predict_with_confidence(*inputs, mc_samples=4)
+    torch.manual_seed(7)
+    quantized = int8.predict_with_confidence(*inputs, mc_samples=4)
+
+    assert int8.precision == "int8"
+    assert (quantized[0] - reference[0]).abs().max() < 0.05
+    assert (quantized[1] - reference[1]).abs().max() < 0.5
+
+    loaded = load_inference_engine(str(tmp_path / "int8.pt"), expected_version="ckpt-1", precision="int8")
+    assert loaded is not None and loaded.precision == "int8"
+
+
+def test_unknown_precision_is_rejected():
+    with pytest.raises(ValueError):
+        build_inference_engine(_model(), precision="int4")
@@ -0,0 +1,171 @@
+import pytest
+import torch
+
+from pinn_server.model import EndoPINN, EnsemblePINN, training_autocast
+
+
+def _inputs(batch_size: int):
+    torch.manual_seed(0)
+    return (
+        torch.rand(batch_size, 128),
+        torch.rand(batch_size, 64),
+        torch.rand(batch_size, 64),
+    )
+
+
+def _model(dropout: float) -> EndoPINN:
+    torch.manual_seed(1)
+    model = EndoPINN(dropout=dropout)
+    # Non-trivial running statistics so skipping/applying BatchNorm is observable
+    for bn in [model.fusion_bn, *model.batch_norms]:
+        bn.running_mean.uniform_(-0.5, 0.5)
+        bn.running_var.uniform_(0.5, 2.0)
+    return model
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+def test_vectorized_mc_matches_sequential_without_dropout(batch_size):
+    model = _model(dropout=0.0)
+    inputs = _inputs(batch_size)
+
+    sequential = model.predict_with_confidence(*inputs, mc_samples=5, vectorized=False)
+    vectorized = model.predict_with_confidence(*inputs, mc_samples=5, vectorized=True)
+
+    for expected, actual in zip(sequential, vectorized):
+        assert actual.shape == expected.shape
+        torch.testing.assert_close(actual, expected)
+
+
+def test_vectorized_mc_draws_independent_masks():
+    model = _model(dropout=0.3)
+    inputs = _inputs(1)
+
+    model.eval()
+    model.enable_mc_dropout()
+    with torch.no_grad():
+        predictions, stiffnesses = model._mc_forward_tiled(*inputs, None, mc_samples=8)
+
+    assert predictions.shape == (8, 1, 1)
+    assert stiffnesses.std(dim=0).item() > 0.0
+
+
+def test_welford_merge_matches_batch_statistics():
+    from pinn_server.model import _welford_merge
+
+    torch.manual_seed(2)
+    samples = torch.randn(11, 3, 1)
+    stats = None
+    for chunk in samples.split(4):
+        stats = _welford_merge(stats, chunk)
+
+    count, mean, m2 = stats
+    assert count == 11
+    torch.testing.assert_close(mean, samples.mean(dim=0))
+    torch.testing.assert_close(m2 / (count - 1), samples.var(dim=0))
+
+
+def test_adaptive_mc_stops_early_when_converged():
+    model = _model(dropout=0.0)
+    inputs = _inputs(4)
+
+    pred, stiff, conf, used = model.predict_with_adaptive_confidence(*inputs, min_samples=4, chunk_size=2)
+    expected = model.predict_with_confidence(*inputs, mc_samples=4)
+
+    assert used == 4
+    for actual, reference in zip((pred, stiff, conf), expected):
+        torch.testing.assert_close(actual, reference)
+
+
+def test_adaptive_mc_respects_max_samples():
+    model = _model(dropout=0.3)
+    inputs = _inputs(2)
+
+    *_, used = model.predict_with_adaptive_confidence(*inputs, tolerance=0.0, max_samples=10, chunk_size=4)
+    assert used == 10
+
+
+def test_forward_heads_matches_forward_and_skips_unrequested_heads():
+    model = _model(dropout=0.0).eval()
+    inputs = _inputs(4)
+    displacement_calls = []
+    model.displacement_head.register_forward_hook(lambda *_: displacement_calls.append(1))
+
+    coords = torch.zeros(4, 3)
+    outputs = model.forward_heads(*inputs, coords)
+    assert set(outputs) == {"prediction", "stiffness"}
+    assert not displacement_calls
+    assert not coords.requires_grad
+
+    prediction, stiffness, displacement = model(*inputs)
+    torch.testing.assert_close(outputs["prediction"], prediction)
+    torch.testing.assert_close(outputs["stiffness"], stiffness)
+    assert displacement.shape == (4, 3)
+    assert len(displacement_calls) == 1
+
+
+def test_forward_heads_rejects_unknown_heads():
+    with pytest.raises(ValueError):
+        _model(dropout=0.0).forward_heads(*_inputs(2), heads=("prediction", "strain"))
+
+
+def test_point_displacement_matches_eval_forward():
+    model = _model(dropout=0.3).eval()
+    inputs = _inputs(4)
+    coords = torch.rand(4, 3)
+
+    expected = model.forward_heads(*inputs, coords, heads=("displacement",))["displacement"]
+    per_point = torch.func.vmap(model.point_displacement)(coords, model.fuse_features(*inputs))
+
+    torch.testing.assert_close(per_point, expected)
+
+
+@pytest.mark.parametrize("batch_size", [1, 6])
+def test_vectorized_ensemble_matches_member_loop(batch_size):
+    torch.manual_seed(3)
+    ensemble = EnsemblePINN(num_models=4)
+    for member in ensemble.models:
+        for bn in [member.fusion_bn, *member.batch_norms]:
+            bn.running_mean.uniform_(-0.5, 0.5)
+            bn.running_var.uniform_(0.5, 2.0)
+    ensemble.eval()
+    inputs = _inputs(batch_size)
+
+    with torch.no_grad():
+        looped = ensemble(*inputs, vectorized=False)
+        vectorized = ensemble(*inputs)
+        for expected, actual in zip(looped, vectorized):
+            torch.testing.assert_close(actual, expected, rtol=1e-5, atol=1e-5, equal_nan=True)
+
+        # In-place edits to a member need an explicit refresh of the stack
+        ensemble.models[0].fusion.weight.mul_(2.0)
+        ensemble.invalidate_stacked_state()
+        torch.testing.assert_close(ensemble(*inputs)[1], ensemble(*inputs, vectorized=False)[1], rtol=1e-5, atol=1e-5)
+
+
+def test_vectorized_ensemble_is_inference_only():
+    ensemble = EnsemblePINN(num_models=2).train()
+    with pytest.raises(ValueError):
+        ensemble(*_inputs(2), vectorized=True)
+
+
+def test_bf16_training_autocast_tracks_fp32():
+    model = _model(dropout=0.0).train()
+    inputs = _inputs(8)
+    coords = torch.rand(8, 3)
+
+    with training_autocast("fp32"):
+        reference = model(*inputs, coords.clone())
+    with training_autocast("bf16"):
+        outputs = model(*inputs, coords.clone())
+
+    assert all(output.dtype == torch.float32 for output in reference)
+    assert outputs[2].dtype == torch.bfloat16
+    for expected, actual in zip(reference, outputs):
+        torch.testing.assert_close(actual.float(), expected, rtol=5e-2, atol=5e-2)
+
+    # Gradients reach the fp32 parameters through the bf16 data path
+    outputs[0].float().mean().backward()
+    assert model.fusion.weight.grad.dtype == torch.float32
+
+    with pytest.raises(ValueError):
+        training_autocast("fp16")
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from pinn_server.node_client import NodeClient, fan_out
+
+
+def _slow_nodes(delays, active=None, peak=None):
+    """MockTransport answering /health after a per-host delay, tracking concurrent requests per host."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if active is not None:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        try:
+            await asyncio.sleep(delays[host])
+        finally:
+            if active is not None:
+                active[host] -= 1
+        return httpx.Response(200, json={"status": "healthy", "is_training": host == "b"})
+
+    return httpx.MockTransport(handler)
+
+
+def test_fan_out_takes_the_slowest_node_not_the_sum():
+    delays = {"a": 0.1, "b": 0.2, "c": 0.3}
+
+    async def scenario():
+        client = NodeClient(transport=_slow_nodes(delays))
+        client.start()
+        try:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(client.get(f"http://{host}:8000/health", deadline=5.0) for host in delays)
+            )
+            return time.perf_counter() - start, responses, client
+        finally:
+            await client.stop()
+
+    elapsed, responses, client = asyncio.run(scenario())
+
+    assert [r.json()["is_training"] for r in responses] == [False, True, False]
+    assert 0.3 <= elapsed < 0.5
+    assert client.outcomes == {"ok": 3, "error": 0, "timeout": 0}
+
+
+def test_concurrency_is_capped_per_node():
+    active, peak = {}, {}
+
+    async def scenario():
+        client = NodeClient(per_node_connections=2, transport=_slow_nodes({"a": 0.02, "b": 0.02}, active, peak))
+        try:
+            await asyncio.gather(
+                *(client.get(f"http://{host}:8000/health", deadline=5.0) for host in "ab" * 6)
+            )
+        finally:
+            await client.stop()
+
+    asyncio.run(scenario())
+    assert peak == {"a": 2, "b": 2}
+
+
+def test_deadline_bounds_a_hung_node():
+    async def scenario():
+        client = NodeClient(transport=_slow_nodes({"hung": 10.0}))
+        try:
+            start = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get("http://hung:8000/health", deadline=0.05)
+            return time.perf_counter() - start, client
+        finally:
+            await client.stop()
+
+    elapsed, client = asyncio.run(scenario())
+    assert elapsed < 1.0
+    assert client.outcomes["timeout"] == 1
+
+
+def test_fan_out_bounds_concurrency_and_keeps_order():
+    in_flight = []
+    peak = []
+
+    async def call(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(item)
+        return item * 2
+
+    results = asyncio.run(fan_out(call, range(20), concurrency=4))
+
+    assert results == [item * 2 for item in range(20)]
+    assert max(peak) == 4
@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from pinn_server.node_health import CircuitBreaker, NodeHealthMonitor
+
+NODES = [("imaging", "Imaging", "http://imaging"), ("clinical", "Clinical", "http://clinical")]
+
+
+def test_breaker_opens_after_consecutive_failures_and_half_opens_for_one_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time
+
+    # A failed trial reopens; a success closes
+    breaker.record_failure()
+    assert breaker.state == "open"
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_statuses_come_from_the_table_until_the_ttl_expires():
+    probes = []
+
+    async def probe(url):
+        probes.append(url)
+        return {"status": "healthy" if "imaging" in url else "unreachable", "latency_ms": 1.0, "is_training": False}
+
+    async def scenario():
+        monitor = NodeHealthMonitor(probe, lambda: NODES, ttl=0.1)
+        first = await monitor.statuses()
+        cached = await monitor.statuses()
+        probes_before_expiry = len(probes)
+        await asyncio.sleep(0.15)
+        await monitor.statuses()
+        return first, cached, probes_before_expiry
+
+    first, cached, probes_before_expiry = asyncio.run(scenario())
+
+    assert probes_before_expiry == 2
+    assert len(probes) == 4
+    assert first == cached
+    assert first["imaging"]["status"] == "healthy"
+    assert first["clinical"]["status"] == "unreachable"
+    assert first["clinical"]["name"] == "Clinical"
+    assert first["imaging"]["checked_at"] is not None
+
+
+def test_concurrent_readers_share_one_poll():
+    calls = []
+
+    async def probe(url):
+        calls.append(url)
+        await asyncio.sleep(0.05)
+        return {"status": "healthy", "latency_ms": 50.0, "is_training": False}
+
+    async def scenario():
+        monitor = NodeHealthMonitor(probe, lambda: NODES)
+        await asyncio.gather(*(monitor.statuses() for _ in range(5)))
+
+    asyncio.run(scenario())
+    assert len(calls) == len(NODES)
+
+
+def test_failed_polls_open_the_circuit_and_a_healthy_poll_closes_it():
+    healthy = {"http://imaging": True, "http://clinical": False}
+
+    async def probe(url):
+        return {"status": "healthy" if healthy[url] else "unreachable", "latency_ms": None, "is_training": False}
+
+    async def scenario():
+        monitor = NodeHealthMonitor(probe, lambda: NODES, interval=0.01, failure_threshold=2)
+        monitor.start()
+        try:
+            while monitor.polls_total < 2:
+                await asyncio.sleep(0.01)
+            opened = (monitor.breaker("http://clinical").state, monitor.allow("http://clinical"))
+            healthy["http://clinical"] = True
+            polls = monitor.polls_total
+            while monitor.polls_total <= polls:
+                await asyncio.sleep(0.01)
+            return monitor, opened
+        finally:
+            await monitor.stop()
+
+    monitor, opened = asyncio.run(scenario())
+
+    assert opened == ("open", False)
+    assert monitor.allow("http://clinical")
+    assert monitor.allow("http://imaging")
+    assert monitor.skipped_calls_total == 1
+    assert 'endotwin_node_circuit_open{node="clinical"} 0' in monitor.prometheus_lines()
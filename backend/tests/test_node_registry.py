@@ -0,0 +1,70 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pinn_server.node_registry import NodeRegistry
+
+
+def test_register_heartbeat_and_expire():
+    registry = NodeRegistry(heartbeat_ttl=0.05)
+    registry.add_static("imaging", "http://imaging:8000", "imaging")
+    site_a = registry.register("http://site-a:8000/", "clinical", site="site-a")
+    site_b = registry.register("http://site-b:8000", "clinical", site="site-b")
+
+    assert [node.id for node in registry.nodes()] == ["imaging", site_a.id, site_b.id]
+    assert site_a.url == "http://site-a:8000"
+    assert site_a.name == "Clinical (site-a)"
+    assert [node.id for node in registry.nodes("clinical")] == [site_a.id, site_b.id]
+
+    time.sleep(0.03)
+    assert registry.heartbeat(site_a.id) is site_a
+    time.sleep(0.03)
+
+    # site-b missed its heartbeat; the configured node never expires
+    assert [node.id for node in registry.nodes()] == ["imaging", site_a.id]
+    assert registry.heartbeat(site_b.id) is None
+    assert registry.expired_total == 1
+    assert 'endotwin_registered_nodes{modality="clinical"} 1' in registry.prometheus_lines()
+
+
+def test_reregistration_keeps_the_node_id():
+    registry = NodeRegistry()
+    first = registry.register("http://site-a:8000", "pathology", site="site-a")
+
+    again_by_url = registry.register("http://site-a:8000", "pathology", site="site-a")
+    moved = registry.register("http://site-a-new:8000", "pathology", site="site-a", node_id=first.id)
+
+    assert again_by_url.id == moved.id == first.id
+    assert moved.registered_at == first.registered_at
+    assert [node.url for node in registry.nodes()] == ["http://site-a-new:8000"]
+
+
+def test_register_rejects_unknown_modalities_and_reserved_ids():
+    registry = NodeRegistry()
+    registry.add_static("imaging", "http://imaging:8000", "imaging")
+
+    with pytest.raises(ValueError):
+        registry.register("http://x:8000", "genomics")
+    with pytest.raises(ValueError):
+        registry.register("http://x:8000", "imaging", node_id="imaging")
+    assert not registry.deregister("missing")
+
+
+def test_registering_at_a_configured_url_returns_the_configured_node():
+    registry = NodeRegistry()
+    configured = registry.add_static("imaging", "http://imaging:8000", "imaging")
+
+    assert registry.register("http://imaging:8000/", "imaging", site="site-a") is configured
+    assert len(registry) == 1
+    with pytest.raises(ValueError, match="configured as the imaging node"):
+        registry.register("http://imaging:8000", "clinical")
+
+
+def test_concurrent_registrations_at_one_url_share_a_node():
+    registry = NodeRegistry()
+    with ThreadPoolExecutor(8) as pool:
+        nodes = list(pool.map(lambda _: registry.register("http://site-a:8000", "clinical"), range(64)))
+
+    assert len({node.id for node in nodes}) == 1
+    assert len(registry) == 1
@@ -1,7 +1,18 @@
 import pytest
 import torch
 import torch.nn as nn
-from utils.physics_loss import navier_cauchy_residual
+from torch.func import jacfwd, jacrev, vmap
+from utils.physics_loss import (
+    GradNormWeighting,
+    PINNLoss,
+    ReLoBRaLoWeighting,
+    UncertaintyWeighting,
+    make_loss_balancer,
+    navier_cauchy_residual,
+    navier_cauchy_residual_fd,
+    residual_from_hessian,
+    shared_gradient_norms,
+)
 
 def test_navier_cauchy_static_equilibrium():
     """
@@ -66,5 +77,165 @@ def test_navier_cauchy_linear_displacement():
     
     assert torch.allclose(residual, torch.zeros_like(residual), atol=1e-5), "Linear displacement should yield zero residual"
 
+def _smooth_displacement(x):
+    """Nonlinear pointwise field with non-zero second derivatives."""
+    return torch.stack([
+        torch.sin(x[..., 0]) * x[..., 1] ** 2,
+        x[..., 0] * x[..., 2] ** 3,
+        torch.exp(x[..., 1]) * x[..., 2] * x[..., 0]
+    ], dim=-1)
+
+def _exact_residual(coords, youngs_modulus):
+    """Reference residual of _smooth_displacement from per-point torch.func Hessians."""
+    hessian = vmap(jacfwd(jacrev(_smooth_displacement)))(coords)
+    return residual_from_hessian(hessian, youngs_modulus)
+
+def test_autograd_residual_matches_per_point_hessians():
+    """
+    The autograd.grad residual must agree with independently computed
+    per-point Hessians, including gradients w.r.t. the stiffness.
+    """
+    batch_size = 32
+    coords = torch.rand((batch_size, 3), dtype=torch.float64, requires_grad=True)
+    youngs_modulus = torch.rand((batch_size, 1), dtype=torch.float64, requires_grad=True)
+
+    residual = navier_cauchy_residual(_smooth_displacement(coords), coords, youngs_modulus)
+    (residual_grad,) = torch.autograd.grad(residual, youngs_modulus)
+
+    reference = _exact_residual(coords.detach(), youngs_modulus)
+    (reference_grad,) = torch.autograd.grad(reference, youngs_modulus)
+
+    assert reference.item() > 0
+    assert torch.allclose(residual, reference)
+    assert torch.allclose(residual_grad, reference_grad)
+
+def test_fd_residual_converges_to_exact():
+    """Central differences are O(h²): shrinking the stencil tightens agreement."""
+    coords = torch.rand((32, 3), dtype=torch.float64)
+    youngs_modulus = torch.rand((32, 1), dtype=torch.float64)
+    exact = _exact_residual(coords, youngs_modulus)
+
+    errors = [
+        (navier_cauchy_residual_fd(_smooth_displacement, coords, youngs_modulus, step=step) - exact).abs() / exact
+        for step in (1e-1, 1e-2)
+    ]
+
+    assert errors[1] < 1e-3
+    assert errors[1] < errors[0] / 50
+
+def test_pinn_loss_residual_modes():
+    coords = torch.rand((16, 3), dtype=torch.float64)
+    stiffness = torch.full((16, 1), 5.0, dtype=torch.float64)
+    residuals = {
+        mode: PINNLoss(residual_mode=mode, fd_step=1e-3).physics_residual(
+            None, coords, stiffness, displacement_fn=_smooth_displacement
+        )
+        for mode in ("autograd", "fd")
+    }
+
+    assert torch.allclose(residuals["autograd"], _exact_residual(coords, stiffness))
+    assert torch.allclose(residuals["fd"], residuals["autograd"], rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        PINNLoss(residual_mode="spectral")
+    with pytest.raises(ValueError):
+        PINNLoss(residual_mode="fd").physics_residual(_smooth_displacement(coords), coords, stiffness)
+
+class _PatientField(nn.Module):
+    """Per-point displacement with a per-point input, like EndoPINN.point_displacement."""
+    def __init__(self):
+        super().__init__()
+        self.net = nn.Sequential(nn.Linear(3, 16), nn.Tanh(), nn.Linear(16, 3))
+
+    def forward(self, coord, feature):
+        return self.net(coord) * feature
+
+def _param_grads(module):
+    # The output bias does not reach the second derivatives, so its grad stays None
+    return [torch.zeros_like(p) if p.grad is None else p.grad.clone() for p in module.parameters()]
+
+@pytest.mark.parametrize("mode", ["autograd", "fd"])
+def test_chunked_physics_backward_matches_full(mode):
+    """Chunked backward accumulates the same gradients as one full-batch backward."""
+    torch.manual_seed(0)
+    field = _PatientField().double()
+    coords = torch.rand((37, 3), dtype=torch.float64)
+    weights = torch.rand((37, 2), dtype=torch.float64, requires_grad=True)
+    stiffness, feature = weights[:, :1] * 5.0, weights[:, 1:]
+
+    full_loss = PINNLoss(residual_mode=mode)
+    reference = full_loss.physics_residual(None, coords, stiffness, field, (feature,))
+    (0.5 * reference).backward(retain_graph=True)
+    expected = [weights.grad.clone()] + _param_grads(field)
+
+    weights.grad = None
+    field.zero_grad()
+    chunked_loss = PINNLoss(residual_mode=mode, chunk_size=8)
+    residual = chunked_loss.physics_backward(coords, stiffness, field, (feature,), weight=0.5)
+    grads = [weights.grad] + _param_grads(field)
+
+    assert not residual.requires_grad
+    assert torch.allclose(residual, reference.detach())
+    assert all(torch.allclose(g, e) for g, e in zip(grads, expected))
+    assert torch.allclose(
+        chunked_loss.pointwise_residual(coords, stiffness, field, (feature,)),
+        full_loss.pointwise_residual(coords, stiffness, field, (feature,))
+    )
+
+def test_chunked_physics_loss_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        PINNLoss(chunk_size=0)
+
+def test_relobralo_upweights_the_slowest_loss():
+    balancer = ReLoBRaLoWeighting(num_losses=3, alpha=0.0, expected_rho=1.0)
+    balancer.update(torch.tensor([1.0, 1.0, 0.0]))
+    # The first loss stalls while the second halves; the zero loss stays at zero
+    balancer.update(torch.tensor([1.0, 0.5, 0.0]))
+
+    weights = balancer.normalized_weights()
+    assert weights.sum().item() == pytest.approx(3.0)
+    assert weights[0] > weights[1] > weights[2]
+    assert balancer(torch.tensor([1.0, 2.0, 3.0])).item() == pytest.approx((weights * torch.tensor([1.0, 2.0, 3.0])).sum().item())
+
+def test_relobralo_lookback_leaves_the_global_rng_alone():
+    torch.manual_seed(0)
+    expected = torch.rand(4)
+
+    torch.manual_seed(0)
+    balancer = ReLoBRaLoWeighting(num_losses=3, expected_rho=0.5, seed=1)
+    for step in range(5):
+        balancer.update(torch.tensor([1.0, 0.5, 0.25]) / (step + 1))
+    assert torch.equal(torch.rand(4), expected)
+
+    replay = ReLoBRaLoWeighting(num_losses=3, expected_rho=0.5, seed=1)
+    for step in range(5):
+        replay.update(torch.tensor([1.0, 0.5, 0.25]) / (step + 1))
+    assert torch.equal(replay.normalized_weights(), balancer.normalized_weights())
+
+def test_uncertainty_weighting_learns_in_one_backward():
+    balancer = UncertaintyWeighting(num_losses=2, log_var_range=(-1.0, 1.0))
+    losses = torch.tensor([4.0, 0.0], requires_grad=True)
+    balancer(losses).backward()
+
+    # d/ds (exp(-s) L + s) = 1 - L at s = 0
+    assert torch.allclose(balancer.log_vars.grad, torch.tensor([-3.0, 1.0]))
+    with torch.no_grad():
+        balancer.log_vars.fill_(-5.0)
+    assert torch.allclose(balancer.normalized_weights(), torch.full((2,), torch.e))
+
+def test_grad_norm_uses_per_loss_gradient_norms():
+    layer = nn.Linear(4, 2)
+    out = layer(torch.rand(8, 4))
+    losses = torch.stack([out.pow(2).mean(), out.abs().mean(), out.detach().mean()])
+    norms = shared_gradient_norms(losses, layer.weight)
+
+    assert norms.shape == (3,) and norms[2] == 0
+    grad_norm = GradNormWeighting(num_losses=3)
+    grad_norm.update_weights(losses, norms).backward()
+    assert torch.isfinite(grad_norm.weights.grad).all()
+
+    with pytest.raises(ValueError):
+        make_loss_balancer("pcgrad")
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
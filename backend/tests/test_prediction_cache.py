@@ -0,0 +1,96 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from pinn_server.prediction_cache import PredictionCache, feature_key
+
+
+def test_feature_key_quantizes_and_includes_model_version():
+    # Slider positions on the 1e-3 grid, as sent by the patient input form
+    features = np.round(np.random.default_rng(0).random(256), 3)
+
+    assert feature_key(features, "v1") == feature_key(features + 1e-5, "v1")
+    assert feature_key(features, "v1") != feature_key(features + 1e-2, "v1")
+    assert feature_key(features, "v1") != feature_key(features, "v2")
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    cache = PredictionCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 0.4, 3.2, 0.9, 10
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+        results.append(await cache.get_or_compute("k", compute))
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(r == (0.4, 3.2, 0.9, 10) for r in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 4
+    assert cache.stats()["hits"] == 1
+
+
+def test_failures_are_not_cached():
+    cache = PredictionCache()
+    attempts = []
+
+    async def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", compute)
+        return await cache.get_or_compute("k", compute)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert len(attempts) == 2
+
+
+def test_byte_bound_evicts_least_recently_used():
+    cache = PredictionCache(max_bytes=1000)
+    for i in range(50):
+        cache.put(f"key-{i}", (float(i), float(i), float(i), i))
+
+    assert cache.stats()["bytes"] <= 1000
+    assert cache.get("key-49") is not None
+    assert cache.get("key-0") is None
+
+
+def test_ttl_and_invalidation():
+    cache = PredictionCache(ttl_seconds=0.0)
+    cache.put("k", 1)
+    assert cache.get("k") is None
+
+    cache = PredictionCache()
+    cache.put("k", 1)
+    cache.invalidate()
+    assert cache.get("k") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_results_in_flight_during_invalidation_are_dropped():
+    cache = PredictionCache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "stale"
+
+    async def scenario():
+        pending = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        return await pending
+
+    assert asyncio.run(scenario()) == "stale"
+    assert cache.get("k") is None
@@ -0,0 +1,34 @@
+import pytest
+
+from utils.prediction_store import PredictionStore
+
+
+def test_volume_is_materialized_once_per_format():
+    store = PredictionStore()
+    prediction_id = store.add("HIGH", 6.0)
+
+    first, headers = store.volume(prediction_id, 64, "rle")
+    second, _ = store.volume(prediction_id, 64, "rle")
+    assert second is first
+    assert headers["X-Volume-Encoding"] == "rle"
+
+    values, _ = store.volume(prediction_id, 64, "json")
+    assert len(values) == 64 ** 3
+
+
+def test_expired_predictions_are_dropped():
+    store = PredictionStore(ttl_seconds=0.0)
+    prediction_id = store.add("low", 2.0)
+
+    assert store.get(prediction_id) is None
+    with pytest.raises(KeyError):
+        store.volume(prediction_id)
+
+
+def test_store_is_bounded():
+    store = PredictionStore(max_entries=2)
+    ids = [store.add("low", 1.0) for _ in range(3)]
+
+    assert len(store) == 2
+    assert store.get(ids[0]) is None
+    assert store.get(ids[2]) is not None
@@ -0,0 +1,252 @@
+import asyncio
+import threading
+
+import torch
+
+from pinn_server.executors import InstrumentedExecutor
+from pinn_server.training_jobs import TrainingCancelled, TrainingJobQueue, TrainingThrottle
+
+
+async def _drain(queue: asyncio.Queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_jobs_run_one_at_a_time_in_submission_order():
+    order = []
+
+    async def run(job):
+        order.append(("start", job.params["name"]))
+        await asyncio.sleep(0.01)
+        order.append(("end", job.params["name"]))
+        return {"name": job.params["name"]}
+
+    async def scenario():
+        jobs = TrainingJobQueue(run)
+        jobs.start()
+        try:
+            first = jobs.submit({"name": "a"}, epochs=1)
+            second = jobs.submit({"name": "b"}, epochs=1)
+            assert first.status == second.status == "queued"
+            while not second.done:
+                await asyncio.sleep(0.01)
+            return first, second
+        finally:
+            await jobs.stop()
+
+    first, second = asyncio.run(scenario())
+
+    assert order == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+    assert first.status == second.status == "completed"
+    assert second.result == {"name": "b"}
+    assert first.finished <= second.started
+
+
+def test_epochs_reported_from_a_thread_reach_subscribers():
+    async def scenario():
+        jobs = TrainingJobQueue(None)
+        jobs.start()
+
+        async def run(job):
+            def train():
+                for epoch in range(3):
+                    jobs.record_epoch(job, {"epoch": epoch, "loss": 1.0 / (epoch + 1)})
+                return {"final_loss": 1.0 / 3}
+
+            return await asyncio.get_running_loop().run_in_executor(None, train)
+
+        jobs.run_fn = run
+        events = jobs.subscribe()
+        try:
+            job = jobs.submit({}, epochs=3)
+            while not job.done:
+                await asyncio.sleep(0.01)
+            return job, await _drain(events)
+        finally:
+            await jobs.stop()
+
+    job, events = asyncio.run(scenario())
+
+    assert [e["event"] for e in events] == ["queued", "started", "epoch", "epoch", "epoch", "completed"]
+    assert [e["epoch"]["epoch"] for e in events if e["event"] == "epoch"] == [0, 1, 2]
+    assert events[-1]["job"]["epochs_completed"] == 3
+    assert job.to_dict()["epochs"][-1]["loss"] == 1.0 / 3
+    assert job.eta_seconds() == 0.0
+
+
+def test_failed_job_records_error_and_worker_keeps_going():
+    async def run(job):
+        if job.params["fail"]:
+            raise RuntimeError("nodes unreachable")
+        return {}
+
+    async def scenario():
+        jobs = TrainingJobQueue(run)
+        jobs.start()
+        try:
+            failed = jobs.submit({"fail": True}, epochs=1)
+            ok = jobs.submit({"fail": False}, epochs=1)
+            while not ok.done:
+                await asyncio.sleep(0.01)
+            return jobs, failed, ok
+        finally:
+            await jobs.stop()
+
+    jobs, failed, ok = asyncio.run(scenario())
+
+    assert failed.status == "failed"
+    assert failed.error == "nodes unreachable"
+    assert ok.status == "completed"
+    assert 'endotwin_training_jobs{state="failed"} 1' in jobs.prometheus_lines()
+
+
+def test_oldest_finished_jobs_are_forgotten():
+    async def run(job):
+        return {}
+
+    async def scenario():
+        jobs = TrainingJobQueue(run, max_jobs=2)
+        jobs.start()
+        try:
+            submitted = []
+            for _ in range(4):
+                submitted.append(jobs.submit({}, epochs=1))
+                while not submitted[-1].done:
+                    await asyncio.sleep(0.01)
+            return jobs, submitted
+        finally:
+            await jobs.stop()
+
+    jobs, submitted = asyncio.run(scenario())
+
+    assert [job.id for job in jobs.jobs()] == [job.id for job in submitted[-2:]]
+    assert jobs.get(submitted[0].id) is None
+
+
+def test_higher_priority_jobs_start_first():
+    started = []
+
+    async def run(job):
+        started.append(job.params["name"])
+        await asyncio.sleep(0.01)
+        return {}
+
+    async def scenario():
+        jobs = TrainingJobQueue(run)
+        jobs.start()
+        try:
+            # The worker picks "first" before the rest are queued; the others then start by priority
+            submitted = [jobs.submit({"name": "first"}, epochs=1)]
+            await asyncio.sleep(0)
+            submitted.append(jobs.submit({"name": "low"}, epochs=1, priority=-1))
+            submitted.append(jobs.submit({"name": "normal"}, epochs=1))
+            submitted.append(jobs.submit({"name": "urgent"}, epochs=1, priority=5))
+            submitted.append(jobs.submit({"name": "normal-2"}, epochs=1))
+            while not all(job.done for job in submitted):
+                await asyncio.sleep(0.01)
+        finally:
+            await jobs.stop()
+
+    asyncio.run(scenario())
+    assert started == ["first", "urgent", "normal", "normal-2", "low"]
+
+
+def test_cancel_queued_and_running_jobs():
+    checked_batches = []
+
+    async def scenario():
+        jobs = TrainingJobQueue(None)
+        jobs.start()
+        batch_started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        async def run(job):
+            def train():
+                for batch in range(1000):
+                    job.raise_if_cancelled()
+                    checked_batches.append(batch)
+                    loop.call_soon_threadsafe(batch_started.set)
+                    threading.Event().wait(0.005)
+                return {}
+
+            try:
+                return await loop.run_in_executor(None, train)
+            except TrainingCancelled:
+                raise TrainingCancelled("ckpt.pth")
+
+        jobs.run_fn = run
+        events = jobs.subscribe()
+        try:
+            running = jobs.submit({}, epochs=1)
+            queued = jobs.submit({}, epochs=1)
+            await batch_started.wait()
+
+            assert jobs.cancel(queued.id).status == "cancelled"
+            assert jobs.cancel(running.id).status == "running"
+            while not running.done:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            return jobs, running, queued, await _drain(events)
+        finally:
+            await jobs.stop()
+
+    jobs, running, queued, events = asyncio.run(scenario())
+
+    assert running.status == queued.status == "cancelled"
+    assert running.checkpoint == "ckpt.pth"
+    assert queued.started is None
+    assert len(checked_batches) < 1000
+    assert [e["event"] for e in events if e["job"]["job_id"] == running.id][-2:] == ["cancelling", "cancelled"]
+    assert jobs.cancel("unknown") is None
+
+
+def test_throttle_caps_training_threads_while_predict_traffic_is_high():
+    throttle = TrainingThrottle(busy_rps=2, throttled_threads=1, window_s=10.0)
+    throttle.full_threads = 4
+
+    assert throttle.training_threads(now=100.0) == 4
+    for i in range(30):
+        throttle.record_request(now=100.0 + i * 0.1)
+    assert throttle.request_rate(now=103.0) == 3.0
+    assert throttle.training_threads(now=103.0) == 1
+    # Requests age out of the window and training gets its threads back
+    assert throttle.training_threads(now=120.0) == 4
+
+
+def test_throttle_apply_sets_the_calling_threads_torch_threads():
+    before = torch.get_num_threads()
+    throttle = TrainingThrottle(busy_rps=0.05, throttled_threads=1)
+    try:
+        throttle.record_request()
+        throttle.apply()
+        assert torch.get_num_threads() == 1
+        assert throttle.throttled == (before > 1)
+    finally:
+        torch.set_num_threads(before)
+
+
+def test_inference_worker_started_while_throttled_gets_full_threads():
+    before = torch.get_num_threads()
+    throttle = TrainingThrottle(busy_rps=0.05, throttled_threads=1)
+    throttle.full_threads = 3
+    executor = InstrumentedExecutor("test", max_workers=1, initializer=throttle.pin_inference_threads)
+    try:
+        torch.set_num_threads(3)
+        throttle.record_request()
+        trainer = threading.Thread(target=throttle.apply)
+        trainer.start()
+        trainer.join()
+
+        # The training thread's setting became the default for threads created afterwards
+        spawned = []
+        thread = threading.Thread(target=lambda: spawned.append(torch.get_num_threads()))
+        thread.start()
+        thread.join()
+        assert spawned == [1]
+
+        assert asyncio.run(executor.run(torch.get_num_threads)) == 3
+    finally:
+        executor.shutdown()
+        torch.set_num_threads(before)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.volume_encoding import encode_volume, decode_volume
+from utils.volume_synthesis import generate_stiffness_volume
+
+
+@pytest.fixture(scope="module")
+def volume():
+    return generate_stiffness_volume("HIGH", 7.5, grid_size=64)
+
+
+@pytest.mark.parametrize("encoding", ["raw", "rle"])
+def test_float32_round_trip_is_lossless(volume, encoding):
+    payload, headers = encode_volume(volume, encoding, "float32")
+
+    assert headers["X-Volume-Dimensions"] == "64,64,64"
+    assert headers["X-Volume-Encoding"] == encoding
+    decoded = decode_volume(payload, volume.shape, "float32", encoding)
+    np.testing.assert_array_equal(decoded, volume)
+
+
+@pytest.mark.parametrize("encoding", ["raw", "rle"])
+def test_float16_round_trip_within_half_precision(volume, encoding):
+    payload, _ = encode_volume(volume, encoding, "float16")
+    decoded = decode_volume(payload, volume.shape, "float16", encoding)
+    np.testing.assert_allclose(decoded, volume, rtol=1e-3, atol=1e-3)
+
+
+def test_rle_is_smaller_than_raw_for_sparse_volume(volume):
+    raw, _ = encode_volume(volume, "raw", "float32")
+    rle, _ = encode_volume(volume, "rle", "float32")
+    assert len(raw) == volume.size * 4
+    assert len(rle) < len(raw)
+
+
+def test_rle_handles_empty_and_full_volumes():
+    for volume in (np.zeros((4, 4, 4), np.float32), np.ones((4, 4, 4), np.float32)):
+        payload, _ = encode_volume(volume, "rle")
+        np.testing.assert_array_equal(decode_volume(payload, volume.shape, encoding="rle"), volume)
+
+
+def test_unknown_encoding_rejected(volume):
+    with pytest.raises(ValueError):
+        encode_volume(volume, "zip")
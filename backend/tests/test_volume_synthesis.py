@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+import pytest
+
+from pinn_server.server import classify_risk
+from utils.volume_synthesis import (
+    build_anatomy_template,
+    apply_lesion,
+    generate_stiffness_volume,
+    StiffnessVolumeCache,
+)
+
+
+def _reference_volume(risk: str, stiff_value: float, grid_size: int = 64) -> np.ndarray:
+    """Original per-voxel loop implementation from the /predict handler."""
+    volume = np.zeros((grid_size, grid_size, grid_size), dtype=np.float32)
+    center = grid_size // 2
+
+    for z in range(grid_size):
+        for y in range(grid_size):
+            for x in range(grid_size):
+                dx = x - center
+                dy = y - center
+                dz = z - center
+
+                taper = max(0.4, 1.0 + (dy / (grid_size / 2)) * 0.6)
+                body_dist = math.sqrt((dx / (14 * taper))**2 + (dy / 18)**2 + (dz / 10)**2)
+                is_cervix = dy < -10 and dy > -22 and math.sqrt((dx/6)**2 + (dz/6)**2) < 1.0
+                is_l_horn = dy > 6 and dy < 16 and dx < -8 and math.sqrt(((dx+12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
+                is_r_horn = dy > 6 and dy < 16 and dx > 8 and math.sqrt(((dx-12)/8)**2 + ((dy-12)/4)**2 + (dz/6)**2) < 1.0
+
+                cavity_taper = max(0.1, 1.0 + (dy / 15) * 1.5)
+                cavity_dist = math.sqrt((dx / (6 * cavity_taper))**2 + ((dy - 2) / 12)**2 + (dz / 2.5)**2)
+
+                if body_dist <= 1.0 or is_cervix or is_l_horn or is_r_horn:
+                    if cavity_dist <= 1.0 and dy > -10:
+                        volume[z, y, x] = 0.5
+                    elif is_cervix:
+                        volume[z, y, x] = 3.0
+                    else:
+                        noise = math.sin(x*0.5) * math.cos(y*0.5) * math.sin(z*0.5) * 0.2
+                        volume[z, y, x] = 1.5 + noise
+
+    if risk in ["HIGH", "MODERATE"]:
+        l_center_x = center + 5
+        l_center_y = center - 2
+        l_center_z = center + 6
+        radius = min(12, int(stiff_value * 1.5))
+        for z in range(grid_size):
+            for y in range(grid_size):
+                for x in range(grid_size):
+                    if volume[z, y, x] > 0.0:
+                        dist = math.sqrt((x-l_center_x)**2 + (y-l_center_y)**2 + (z-l_center_z)**2)
+                        if dist < radius:
+                            intensity = stiff_value * (1 - (dist/radius)**2)
+                            volume[z, y, x] = max(volume[z, y, x], intensity)
+
+    return volume
+
+
+@pytest.fixture(scope="module")
+def reference_template():
+    return _reference_volume("low", 0.0)
+
+
+def test_template_matches_reference_loop(reference_template):
+    volume = build_anatomy_template(64)
+    assert volume.dtype == np.float32
+    np.testing.assert_array_equal(volume, reference_template)
+
+
+@pytest.mark.parametrize("risk, stiff_value", [("HIGH", 7.3), ("MODERATE", 12.9), ("MODERATE", 0.4), ("low", 9.0)])
+def test_lesion_matches_reference_loop(risk, stiff_value):
+    volume = generate_stiffness_volume(risk, stiff_value, grid_size=64)
+    np.testing.assert_array_equal(volume, _reference_volume(risk, stiff_value))
+
+
+def test_apply_lesion_ignores_unlisted_risk(reference_template):
+    volume = reference_template.copy()
+    apply_lesion(volume, "low", 9.0)
+    np.testing.assert_array_equal(volume, reference_template)
+
+
+@pytest.mark.parametrize("prediction", [0.45, 0.9])
+def test_lesion_applies_to_classify_risk_levels(prediction):
+    risk = classify_risk(prediction)
+    cache = StiffnessVolumeCache()
+
+    volume = cache.get(risk, 7.3)
+    assert volume is not cache.template()
+    assert cache.stats()["entries"] == 1
+    np.testing.assert_array_equal(volume, _reference_volume(risk.upper(), 7.3))
+    assert cache.get(risk.upper(), 7.3) is volume
+
+
+@pytest.mark.parametrize("grid_size", [128, 256])
+def test_higher_resolution_preserves_anatomy(grid_size, reference_template):
+    volume = generate_stiffness_volume("HIGH", 6.0, grid_size=grid_size)
+    assert volume.shape == (grid_size, grid_size, grid_size)
+
+    # Occupied fraction of the grid should stay close to the 64³ phantom
+    reference_fill = np.count_nonzero(reference_template) / reference_template.size
+    fill = np.count_nonzero(volume) / volume.size
+    assert fill == pytest.approx(reference_fill, rel=0.1)
+    assert volume.max() == pytest.approx(6.0, rel=0.05)
+
+
+def test_volume_cache_memoizes_quantized_stiffness():
+    cache = StiffnessVolumeCache(max_entries=2, stiffness_step=0.01)
+
+    first = cache.get("HIGH", 7.301)
+    second = cache.get("HIGH", 7.299)
+    assert second is first
+    assert not first.flags.writeable
+    np.testing.assert_array_equal(first, generate_stiffness_volume("HIGH", 7.30))
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    # Template is shared and untouched by lesion overlays
+    assert cache.get("low", 9.0) is cache.template()
+    assert cache.template().max() < 7.0
+
+
+def test_volume_cache_evicts_least_recently_used():
+    cache = StiffnessVolumeCache(max_entries=2)
+    a = cache.get("HIGH", 5.0)
+    cache.get("HIGH", 6.0)
+    cache.get("HIGH", 5.0)
+    cache.get("HIGH", 7.0)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("HIGH", 5.0) is a
+    assert cache.stats()["misses"] == 3
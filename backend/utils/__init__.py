@@ -27,6 +27,12 @@ from .mesh_generator import (
     mesh_to_glb_bytes
 )
 
+from .volume_synthesis import (
+    build_anatomy_template,
+    apply_lesion,
+    generate_stiffness_volume
+)
+
 __all__ = [
     # Data loaders
     'load_nifti_file',
@@ -43,4 +49,8 @@ __all__ = [
     'generate_stiffness_map',
     'mesh_to_obj_string',
     'mesh_to_glb_bytes',
+    # Volume synthesis
+    'build_anatomy_template',
+    'apply_lesion',
+    'generate_stiffness_volume',
 ]
@@ -0,0 +1,194 @@
+"""
+Collocation points for the Navier-Cauchy physics loss.
+
+The physics residual is enforced on points inside the uterus, not the whole
+unit cube. CollocationPool precomputes a large quasi-random (Sobol or Latin
+hypercube) pool restricted to the anatomy template mask, so the number of
+physics points per step is independent of the patient batch size and no
+points are wasted outside the anatomy.
+
+Coordinates live in the unit cube [0, 1)³ = (x, y, z), mapped onto the
+anatomy template grid (indexed [z, y, x], see utils.volume_synthesis).
+
+Residual-adaptive resampling (RAR-D): every ``resample_every`` steps the
+pool scores a random subset of candidates with the current model and draws
+points with probability proportional to
+
+    residual^k / mean(residual^k) + c
+
+so a fixed number of physics points concentrates where the PDE is violated
+most, while ``c`` keeps some coverage of the whole anatomy.
+"""
+
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+import torch
+
+from utils.volume_synthesis import REFERENCE_GRID_SIZE, build_anatomy_template
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_METHODS = ("sobol", "lhs")
+
+
+def anatomy_mask(grid_size: int = REFERENCE_GRID_SIZE) -> torch.Tensor:
+    """Boolean (grid_size³) mask of voxels inside the uterus template, indexed [z, y, x]."""
+    return torch.from_numpy(build_anatomy_template(grid_size) > 0.0)
+
+
+def inside_mask(points: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+    """Which of ``points`` (N, 3), given as (x, y, z) in [0, 1)³, fall in a masked voxel."""
+    grid_size = mask.size(0)
+    voxels = (points * grid_size).long().clamp_(0, grid_size - 1)
+    return mask[voxels[:, 2], voxels[:, 1], voxels[:, 0]]
+
+
+def latin_hypercube(n: int, dim: int = 3, generator: Optional[torch.Generator] = None) -> torch.Tensor:
+    """``n`` Latin hypercube samples in [0, 1)^dim: one point per stratum along each axis."""
+    strata = torch.stack([torch.randperm(n, generator=generator) for _ in range(dim)], dim=1)
+    return (strata + torch.rand(n, dim, generator=generator)) / n
+
+
+def sample_in_mask(
+    n: int,
+    mask: torch.Tensor,
+    method: str = "sobol",
+    seed: int = 0
+) -> torch.Tensor:
+    """
+    Draw ``n`` quasi-random points inside ``mask`` by rejection.
+
+    Candidates are drawn in rounds sized by the mask's volume fraction until
+    ``n`` land inside; Sobol rounds continue one scrambled sequence.
+
+    Returns:
+        (n, 3) float32 points, (x, y, z) in [0, 1)³
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}', expected one of {list(SAMPLING_METHODS)}")
+    fraction = mask.float().mean().item()
+    if fraction == 0.0:
+        raise ValueError("Collocation mask is empty")
+
+    sobol = torch.quasirandom.SobolEngine(3, scramble=True, seed=seed)
+    generator = torch.Generator().manual_seed(seed)
+    accepted, count = [], 0
+    while count < n:
+        # Oversample so one round usually suffices
+        round_size = int((n - count) / fraction * 1.2) + 64
+        if method == "sobol":
+            candidates = sobol.draw(round_size)
+        else:
+            candidates = latin_hypercube(round_size, generator=generator)
+        candidates = candidates[inside_mask(candidates, mask)]
+        accepted.append(candidates)
+        count += candidates.size(0)
+    return torch.cat(accepted)[:n].float()
+
+
+class CollocationPool:
+    """
+    Precomputed collocation points inside the anatomy with RAR-D sampling.
+
+    Until the first refresh all pool points are equally likely. The points
+    are reused across training runs; reset() drops the residuals a previous
+    model left behind.
+    """
+
+    def __init__(
+        self,
+        num_points: int = 65536,
+        method: str = "sobol",
+        grid_size: int = REFERENCE_GRID_SIZE,
+        resample_every: int = 50,
+        num_candidates: int = 2048,
+        rar_exponent: float = 1.0,
+        rar_offset: float = 1.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            num_points: Pool size
+            method: 'sobol' or 'lhs'
+            grid_size: Resolution of the anatomy mask
+            resample_every: Steps between residual refreshes (K); 0 disables RAR
+            num_candidates: Pool points scored per refresh
+            rar_exponent: k in residual^k; larger concentrates harder
+            rar_offset: c, the uniform share of the sampling weights
+            seed: Seed for the point sequence and the draws
+        """
+        self.method = method
+        self.resample_every = resample_every
+        self.num_candidates = min(num_candidates, num_points)
+        self.rar_exponent = rar_exponent
+        self.rar_offset = rar_offset
+        self.generator = torch.Generator().manual_seed(seed)
+
+        self.points = sample_in_mask(num_points, anatomy_mask(grid_size), method, seed)
+        # Latest squared residual seen at each point (NaN = never scored)
+        self.residuals = torch.full((num_points,), float("nan"))
+        self.weights = torch.ones(num_points)
+        self.refreshes = 0
+        logger.info(f"Built collocation pool: {num_points} {method} points inside the anatomy ({grid_size}³ mask)")
+
+    def __len__(self) -> int:
+        return self.points.size(0)
+
+    def reset(self):
+        """Forget every scored residual and return to uniform sampling (points are kept)."""
+        self.residuals.fill_(float("nan"))
+        self.weights = torch.ones(len(self))
+
+    def sample(self, n: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Draw ``n`` points according to the current weights.
+
+        Returns:
+            (points (n, 3), pool indices (n,))
+        """
+        indices = torch.multinomial(self.weights, n, replacement=True, generator=self.generator)
+        return self.points[indices], indices
+
+    def update_residuals(self, indices: torch.Tensor, residuals: torch.Tensor):
+        """Record squared residuals at ``indices`` and recompute the RAR-D weights."""
+        self.residuals[indices] = residuals.detach().float().cpu()
+        scored = ~torch.isnan(self.residuals)
+        density = self.residuals[scored].clamp_min(0.0) ** self.rar_exponent
+        mean = density.mean()
+        if not torch.isfinite(mean) or mean <= 0:
+            # Zero residual everywhere scored: nothing to concentrate on
+            return
+
+        # Points never scored get the average density
+        weights = torch.full_like(self.weights, 1.0 + self.rar_offset)
+        weights[scored] = density / mean + self.rar_offset
+        self.weights = weights
+
+    def maybe_refresh(self, step: int, residual_fn: Callable[[torch.Tensor], torch.Tensor]) -> bool:
+        """
+        Every ``resample_every`` steps, score ``num_candidates`` random pool points.
+
+        Args:
+            step: Global training step (refreshes happen at multiples of K, not at 0)
+            residual_fn: Maps points (N, 3) to squared residuals (N,)
+
+        Returns:
+            True if the weights were refreshed
+        """
+        if self.resample_every <= 0 or step <= 0 or step % self.resample_every != 0:
+            return False
+        candidates = torch.randperm(len(self), generator=self.generator)[:self.num_candidates]
+        self.update_residuals(candidates, residual_fn(self.points[candidates]))
+        self.refreshes += 1
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Pool size, refresh count and how concentrated the sampling weights are."""
+        probabilities = self.weights / self.weights.sum()
+        return {
+            "points": len(self),
+            "refreshes": self.refreshes,
+            # Fraction of the sampling mass on the top 10% of points
+            "top_decile_mass": probabilities.topk(max(1, len(self) // 10)).values.sum().item(),
+        }
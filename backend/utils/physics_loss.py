@@ -3,7 +3,164 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import Tuple, Optional
+from torch.func import vmap
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+
+def lame_parameters(
+    youngs_modulus: torch.Tensor,
+    poisson_ratio: float = 0.49
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Lamé parameters (µ, λ) from Young's modulus E and Poisson's ratio nu.
+    """
+    # µ (Shear modulus) = E / (2 * (1 + nu))
+    mu = youngs_modulus / (2.0 * (1.0 + poisson_ratio))
+    
+    # λ (Lamé's first parameter) = E*nu / ((1 + nu) * (1 - 2*nu))
+    # We clip the denominator for nu near 0.5 (incompressibility) to avoid division by zero
+    nu_denom = max(1.0 - 2.0 * poisson_ratio, 1e-5)
+    lmbda = (youngs_modulus * poisson_ratio) / ((1.0 + poisson_ratio) * nu_denom)
+    return mu, lmbda
+
+
+def pointwise_residual_from_hessian(
+    hessian: torch.Tensor,
+    youngs_modulus: torch.Tensor,
+    poisson_ratio: float = 0.49
+) -> torch.Tensor:
+    """
+    Squared Navier-Cauchy residual norm at each point, (B,).
+
+    Args:
+        hessian: (B, 3, 3, 3) with hessian[b, i, j, k] = d²u_i / dx_j dx_k
+        youngs_modulus: Young's Modulus E in kPa (B, 1)
+        poisson_ratio: Poisson's ratio (nu) for the tissue
+    """
+    mu, lmbda = lame_parameters(youngs_modulus, poisson_ratio)
+
+    # Laplacian of each displacement component: ∇²u_i = Σ_k d²u_i/dx_k²
+    laplacian_u = torch.einsum('bikk->bi', hessian)
+    # Gradient of the volumetric strain: ∂_k(∇·u) = Σ_j d²u_j/dx_j dx_k
+    grad_vol_strain = torch.einsum('bjjk->bk', hessian)
+
+    # Navier-Cauchy Equation: µ∇²u + (λ + µ)∇(∇·u) = 0 (Internal forces sum to zero in static equilibrium)
+    residual = mu * laplacian_u + (lmbda + mu) * grad_vol_strain
+    return (residual ** 2).sum(dim=1)
+
+
+def residual_from_hessian(
+    hessian: torch.Tensor,
+    youngs_modulus: torch.Tensor,
+    poisson_ratio: float = 0.49
+) -> torch.Tensor:
+    """
+    Mean squared Navier-Cauchy residual from the per-point displacement Hessian.
+
+    Args:
+        hessian: (B, 3, 3, 3) with hessian[b, i, j, k] = d²u_i / dx_j dx_k
+        youngs_modulus: Young's Modulus E in kPa (B, 1)
+        poisson_ratio: Poisson's ratio (nu) for the tissue
+
+    Returns:
+        Physics residual penalty
+    """
+    # The loss is the mean squared continuous residual
+    return pointwise_residual_from_hessian(hessian, youngs_modulus, poisson_ratio).mean()
+
+
+def _coordinate_grad(output: torch.Tensor, coords: torch.Tensor) -> torch.Tensor:
+    """Gradient of ``output.sum()`` w.r.t. ``coords``; zeros if ``output`` does not depend on them."""
+    if not output.requires_grad:
+        return torch.zeros_like(coords)
+    return torch.autograd.grad(
+        output, coords, torch.ones_like(output), create_graph=True, materialize_grads=True
+    )[0]
+
+
+def displacement_hessian(displacement: torch.Tensor, coords: torch.Tensor) -> torch.Tensor:
+    """
+    Per-point displacement Hessian by reverse-mode autograd over the batch graph.
+
+    Each point's displacement must depend only on its own coordinates, since
+    gradients are taken of the batch sum. Uses 3 first-order and 9
+    second-order autograd.grad calls.
+
+    Returns:
+        (B, 3, 3, 3) with hessian[b, i, j, k] = d²u_i / dx_j dx_k
+    """
+    rows = []
+    for i in range(displacement.size(1)):
+        du_i = _coordinate_grad(displacement[:, i], coords)
+        rows.append(torch.stack([_coordinate_grad(du_i[:, j], coords) for j in range(coords.size(1))], dim=1))
+    return torch.stack(rows, dim=1)
+
+
+def _stencil_offsets(step: float, dim: int = 3) -> torch.Tensor:
+    """
+    Offsets of the 19-point central-difference stencil, (19, dim).
+
+    Row 0 is the centre, rows 1..2*dim are ±step along each axis, and the
+    remaining rows are the (++, +-, -+, --) corners of each axis pair j < k.
+    """
+    eye = torch.eye(dim) * step
+    offsets = [torch.zeros(1, dim), eye, -eye]
+    for j in range(dim):
+        for k in range(j + 1, dim):
+            offsets.append(torch.stack([
+                eye[j] + eye[k], eye[j] - eye[k], -eye[j] + eye[k], -eye[j] - eye[k]
+            ]))
+    return torch.cat(offsets)
+
+
+def fd_displacement_hessian(
+    displacement_fn: Callable[..., torch.Tensor],
+    coords: torch.Tensor,
+    point_inputs: Sequence[torch.Tensor] = (),
+    step: float = 1e-2
+) -> torch.Tensor:
+    """
+    Per-point displacement Hessian by central finite differences.
+
+    The field is evaluated on a 19-point stencil around every collocation
+    point in one batched forward pass (B * 19 points); no higher-order
+    autograd graph is built. Truncation error is O(step²).
+
+    Args:
+        displacement_fn: Maps one point, ``(coord (3,), *inputs)``, to its displacement (3,)
+        coords: Collocation points (B, 3)
+        point_inputs: Further per-point inputs, batched along dim 0 like ``coords``
+        step: Stencil spacing, in coordinate units
+
+    Returns:
+        (B, 3, 3, 3) with hessian[b, i, j, k] = d²u_i / dx_j dx_k
+    """
+    batch_size, dim = coords.shape
+    offsets = _stencil_offsets(step, dim).to(coords)
+    num_offsets = offsets.size(0)
+
+    # Point-major layout: rows [b * 19, (b + 1) * 19) hold the stencil of point b
+    stencil = (coords.detach().unsqueeze(1) + offsets).reshape(-1, dim)
+    inputs = [t.repeat_interleave(num_offsets, dim=0) for t in point_inputs]
+    u = vmap(displacement_fn)(stencil, *inputs).reshape(batch_size, num_offsets, -1)
+
+    centre = u[:, 0]
+    plus, minus = u[:, 1:1 + dim], u[:, 1 + dim:1 + 2 * dim]
+    hessian = u.new_zeros(batch_size, u.size(2), dim, dim)
+    # d²u/dx_k² = (u(x + h e_k) - 2 u(x) + u(x - h e_k)) / h²
+    diagonal = (plus - 2.0 * centre.unsqueeze(1) + minus) / step ** 2
+    hessian[:, :, range(dim), range(dim)] = diagonal.transpose(1, 2)
+
+    # d²u/dx_j dx_k = (u(++) - u(+-) - u(-+) + u(--)) / 4h²
+    corner = 1 + 2 * dim
+    for j in range(dim):
+        for k in range(j + 1, dim):
+            pp, pm, mp, mm = u[:, corner:corner + 4].unbind(1)
+            mixed = (pp - pm - mp + mm) / (4.0 * step ** 2)
+            hessian[:, :, j, k] = mixed
+            hessian[:, :, k, j] = mixed
+            corner += 4
+    return hessian
 
 
 def navier_cauchy_residual(
@@ -24,63 +181,27 @@ def navier_cauchy_residual(
     Returns:
         Physics residual penalty
     """
-    # 1. Compute Lamé Parameters from Young's Modulus and Poisson's ratio
-    # µ (Shear modulus) = E / (2 * (1 + nu))
-    mu = youngs_modulus / (2.0 * (1.0 + poisson_ratio))
-    
-    # λ (Lamé's first parameter) = E*nu / ((1 + nu) * (1 - 2*nu))
-    # We clip the denominator for nu near 0.5 (incompressibility) to avoid division by zero
-    nu_denom = max(1.0 - 2.0 * poisson_ratio, 1e-5)
-    lmbda = (youngs_modulus * poisson_ratio) / ((1.0 + poisson_ratio) * nu_denom)
-    
-    # 2. Compute Spatial Derivatives using Automatic Differentiation
-    # Create computation graph for spatial derivatives
-    
-    u_x, u_y, u_z = displacement[:, 0:1], displacement[:, 1:2], displacement[:, 2:3]
-    
-    # First derivatives
-    du_dx = torch.autograd.grad(u_x, coords, torch.ones_like(u_x), create_graph=True, retain_graph=True)[0]
-    du_dy = torch.autograd.grad(u_y, coords, torch.ones_like(u_y), create_graph=True, retain_graph=True)[0]
-    du_dz = torch.autograd.grad(u_z, coords, torch.ones_like(u_z), create_graph=True, retain_graph=True)[0]
-    
-    # Strain tensor components (linearized epsilon = 0.5 * (grad(u) + grad(u)^T))
-    eps_xx = du_dx[:, 0:1]
-    eps_yy = du_dy[:, 1:2]
-    eps_zz = du_dz[:, 2:3]
-    
-    # Volumetric strain (Trace of the strain tensor)
-    volumetric_strain = eps_xx + eps_yy + eps_zz
-    
-    # Second derivatives (Laplacian of displacement)
-    d2u_x_dx2 = torch.autograd.grad(du_dx[:, 0:1], coords, torch.ones_like(du_dx[:, 0:1]), create_graph=True, retain_graph=True)[0][:, 0:1]
-    d2u_x_dy2 = torch.autograd.grad(du_dx[:, 1:2], coords, torch.ones_like(du_dx[:, 1:2]), create_graph=True, retain_graph=True)[0][:, 1:2]
-    d2u_x_dz2 = torch.autograd.grad(du_dx[:, 2:3], coords, torch.ones_like(du_dx[:, 2:3]), create_graph=True, retain_graph=True)[0][:, 2:3]
-    laplacian_u_x = d2u_x_dx2 + d2u_x_dy2 + d2u_x_dz2
-    
-    d2u_y_dx2 = torch.autograd.grad(du_dy[:, 0:1], coords, torch.ones_like(du_dy[:, 0:1]), create_graph=True, retain_graph=True)[0][:, 0:1]
-    d2u_y_dy2 = torch.autograd.grad(du_dy[:, 1:2], coords, torch.ones_like(du_dy[:, 1:2]), create_graph=True, retain_graph=True)[0][:, 1:2]
-    d2u_y_dz2 = torch.autograd.grad(du_dy[:, 2:3], coords, torch.ones_like(du_dy[:, 2:3]), create_graph=True, retain_graph=True)[0][:, 2:3]
-    laplacian_u_y = d2u_y_dx2 + d2u_y_dy2 + d2u_y_dz2
-    
-    d2u_z_dx2 = torch.autograd.grad(du_dz[:, 0:1], coords, torch.ones_like(du_dz[:, 0:1]), create_graph=True, retain_graph=True)[0][:, 0:1]
-    d2u_z_dy2 = torch.autograd.grad(du_dz[:, 1:2], coords, torch.ones_like(du_dz[:, 1:2]), create_graph=True, retain_graph=True)[0][:, 1:2]
-    d2u_z_dz2 = torch.autograd.grad(du_dz[:, 2:3], coords, torch.ones_like(du_dz[:, 2:3]), create_graph=True, retain_graph=True)[0][:, 2:3]
-    laplacian_u_z = d2u_z_dx2 + d2u_z_dy2 + d2u_z_dz2
-    
-    # Gradient of volumetric strain
-    grad_vol_strain_x = torch.autograd.grad(volumetric_strain, coords, torch.ones_like(volumetric_strain), create_graph=True, retain_graph=True)[0][:, 0:1]
-    grad_vol_strain_y = torch.autograd.grad(volumetric_strain, coords, torch.ones_like(volumetric_strain), create_graph=True, retain_graph=True)[0][:, 1:2]
-    grad_vol_strain_z = torch.autograd.grad(volumetric_strain, coords, torch.ones_like(volumetric_strain), create_graph=True, retain_graph=True)[0][:, 2:3]
-    
-    # 3. Navier-Cauchy Equation: µ∇²u + (λ + µ)∇(∇·u) = 0 (Internal forces sum to zero in static equilibrium)
-    residual_x = mu * laplacian_u_x + (lmbda + mu) * grad_vol_strain_x
-    residual_y = mu * laplacian_u_y + (lmbda + mu) * grad_vol_strain_y
-    residual_z = mu * laplacian_u_z + (lmbda + mu) * grad_vol_strain_z
-    
-    # The loss is the mean squared continuous residual
-    physics_loss_val = (residual_x**2 + residual_y**2 + residual_z**2).mean()
-    
-    return physics_loss_val
+    return residual_from_hessian(displacement_hessian(displacement, coords), youngs_modulus, poisson_ratio)
+
+
+def navier_cauchy_residual_fd(
+    displacement_fn: Callable[..., torch.Tensor],
+    coords: torch.Tensor,
+    youngs_modulus: torch.Tensor,
+    poisson_ratio: float = 0.49,
+    point_inputs: Sequence[torch.Tensor] = (),
+    step: float = 1e-2
+) -> torch.Tensor:
+    """
+    Navier-Cauchy residual with finite-difference second derivatives.
+
+    ``displacement_fn`` maps one point, ``(coord (3,), *point_inputs)``, to
+    its displacement (3,); see fd_displacement_hessian() for the stencil. Cost is one forward pass over
+    19x the collocation points, so it scales to large collocation sets where
+    higher-order autograd does not.
+    """
+    hessian = fd_displacement_hessian(displacement_fn, coords, point_inputs, step)
+    return residual_from_hessian(hessian, youngs_modulus, poisson_ratio)
 
 
 def elasticity_regularization(stiffness: torch.Tensor) -> torch.Tensor:
@@ -107,6 +228,10 @@ class GradNormWeighting(nn.Module):
     """
     Implementation of GradNorm for dynamically weighing multiple loss components
     to ensure the network learns Physics and Data simultaneously.
+
+    update_weights() needs each loss's gradient norm on a shared layer (see
+    shared_gradient_norms()), which costs one extra backward per loss through
+    a retained graph.
     """
     def __init__(self, num_losses: int = 2, alpha: float = 0.12):
         super().__init__()
@@ -115,66 +240,338 @@ class GradNormWeighting(nn.Module):
         self.alpha = alpha
         self.initial_losses = None
         
+    def normalized_weights(self) -> torch.Tensor:
+        """Current loss weights, num_losses * softmax(weights) (they sum to num_losses)."""
+        num_losses = self.weights.shape[0]
+        return num_losses * F.softmax(self.weights, dim=0)
+
     def forward(self, losses: torch.Tensor) -> torch.Tensor:
         # Normalize weights
-        num_losses = self.weights.shape[0]
-        normalized_weights = num_losses * F.softmax(self.weights, dim=0)
+        normalized_weights = self.normalized_weights()
         
         # Weighted loss
         weighted_loss = torch.sum(normalized_weights * losses)
         return weighted_loss
     
     def update_weights(self, current_losses: torch.Tensor, shared_layer_grad: torch.Tensor):
-        num_losses = self.weights.shape[0]
-        normalized_weights = num_losses * F.softmax(self.weights, dim=0)
+        """
+        GradNorm loss for the weights.
+
+        Args:
+            current_losses: Unweighted losses (num_losses,)
+            shared_layer_grad: Gradient norm of each unweighted loss on the
+                shared layer (num_losses,), from shared_gradient_norms()
+        """
+        normalized_weights = self.normalized_weights()
         
         if self.initial_losses is None:
             self.initial_losses = current_losses.detach()
             
-        # Compute loss ratio (current / initial) to see which task is training faster
-        loss_ratios = current_losses.detach() / self.initial_losses
-        inverse_training_rate = loss_ratios / loss_ratios.mean()
+        # Compute loss ratio (current / initial) to see which task is training faster;
+        # a loss that starts at zero (e.g. no elasticity violation) counts as converged
+        loss_ratios = current_losses.detach() / self.initial_losses.clamp_min(1e-12)
+        inverse_training_rate = loss_ratios / loss_ratios.mean().clamp_min(1e-12)
         
-        # We want the gradient norms to match the inverse training rate
-        constant_term = shared_layer_grad.mean().detach() * (inverse_training_rate ** self.alpha)
+        # We want the weighted gradient norms to match the inverse training rate
+        weighted_grad_norms = normalized_weights * shared_layer_grad
+        constant_term = weighted_grad_norms.mean().detach() * (inverse_training_rate ** self.alpha)
         
         # Calculate GradNorm loss
-        grad_norm_loss = torch.sum(torch.abs(normalized_weights * shared_layer_grad - constant_term))
+        grad_norm_loss = torch.sum(torch.abs(weighted_grad_norms - constant_term))
         
         return grad_norm_loss
 
 
+def shared_gradient_norms(losses: torch.Tensor, shared_parameter: torch.Tensor) -> torch.Tensor:
+    """
+    L2 norm of each loss's gradient with respect to ``shared_parameter``, (num_losses,).
+
+    The graph is retained so the losses can still be backpropagated; losses
+    that do not reach the parameter get a zero norm.
+    """
+    norms = []
+    for loss in losses:
+        grad = None
+        if loss.requires_grad:
+            (grad,) = torch.autograd.grad(loss, shared_parameter, retain_graph=True, allow_unused=True)
+        norms.append(grad.norm() if grad is not None else loss.new_zeros(()))
+    return torch.stack(norms)
+
+
+class UncertaintyWeighting(nn.Module):
+    """
+    Homoscedastic-uncertainty loss weighting (Kendall et al., 2018).
+
+    Loss = Σ exp(-s_i) * L_i + s_i with learnable s_i = log σ_i², trained by
+    the same backward pass as the model, so it needs no extra gradients.
+    A loss that sits at zero (e.g. the elasticity penalty inside the valid
+    range) would drive its s_i to -inf, so s_i is clamped to ``log_var_range``.
+    """
+    def __init__(self, num_losses: int = 3, log_var_range: Tuple[float, float] = (-6.0, 6.0)):
+        super().__init__()
+        self.log_vars = nn.Parameter(torch.zeros(num_losses))
+        self.log_var_range = log_var_range
+
+    def _clamped_log_vars(self) -> torch.Tensor:
+        return self.log_vars.clamp(*self.log_var_range)
+
+    def normalized_weights(self) -> torch.Tensor:
+        """Current loss weights, exp(-s_i)."""
+        return torch.exp(-self._clamped_log_vars())
+
+    def forward(self, losses: torch.Tensor) -> torch.Tensor:
+        log_vars = self._clamped_log_vars()
+        return torch.sum(torch.exp(-log_vars) * losses + log_vars)
+
+    def update(self, losses: torch.Tensor):
+        """No-op: the weights are learned through the loss itself."""
+
+
+class ReLoBRaLoWeighting(nn.Module):
+    """
+    Relative Loss Balancing with Random Lookback (Bischof & Kraus, 2021).
+
+    The weights are a softmax over each loss's ratio to its value one step
+    ago and at the start of training, smoothed exponentially; with
+    probability 1 - ``expected_rho`` the history is reset to the ratios
+    against the start. They are computed from loss values only, so a step
+    needs one backward and no retained graph. Call update() after each step.
+
+    The lookback draws come from the balancer's own generator, so enabling it
+    leaves the global torch RNG (dropout masks, MC sampling) untouched.
+    """
+    def __init__(
+        self,
+        num_losses: int = 3,
+        alpha: float = 0.999,
+        temperature: float = 0.1,
+        expected_rho: float = 0.999,
+        seed: int = 0
+    ):
+        """
+        Args:
+            num_losses: Number of loss components
+            alpha: Exponential smoothing of the weights
+            temperature: Softmax temperature; lower concentrates on the slowest loss
+            expected_rho: Probability of keeping the weight history at each step
+            seed: Seed of the generator for the lookback draws
+        """
+        super().__init__()
+        self.register_buffer("weights", torch.ones(num_losses))
+        self.alpha = alpha
+        self.temperature = temperature
+        self.expected_rho = expected_rho
+        self.initial_losses = None
+        self.previous_losses = None
+        self.generator = torch.Generator().manual_seed(seed)
+
+    def normalized_weights(self) -> torch.Tensor:
+        """Current loss weights (they sum to num_losses)."""
+        return self.weights
+
+    def forward(self, losses: torch.Tensor) -> torch.Tensor:
+        return torch.sum(self.weights * losses)
+
+    def _balance(self, losses: torch.Tensor, reference: torch.Tensor) -> torch.Tensor:
+        ratios = losses / (self.temperature * reference).clamp_min(1e-12)
+        return losses.numel() * F.softmax(ratios, dim=0)
+
+    def update(self, losses: torch.Tensor):
+        """Fold this step's unweighted losses (num_losses,) into the weights."""
+        losses = losses.detach()
+        if self.initial_losses is None:
+            self.initial_losses = self.previous_losses = losses
+            return
+
+        rho = float(torch.rand((), generator=self.generator) < self.expected_rho)
+        history = rho * self.weights + (1.0 - rho) * self._balance(losses, self.initial_losses)
+        self.weights = self.alpha * history + (1.0 - self.alpha) * self._balance(losses, self.previous_losses)
+        self.previous_losses = losses
+
+
+# Strategies for weighting the (data, physics, elastic) losses; all but 'gradnorm'
+# need a single backward pass per step
+LOSS_BALANCERS = ("gradnorm", "uncertainty", "relobralo")
+
+
+def make_loss_balancer(name: str, num_losses: int = 3) -> nn.Module:
+    """Build one of LOSS_BALANCERS with its default settings."""
+    if name == "gradnorm":
+        return GradNormWeighting(num_losses=num_losses, alpha=0.12)
+    if name == "uncertainty":
+        return UncertaintyWeighting(num_losses=num_losses)
+    if name == "relobralo":
+        return ReLoBRaLoWeighting(num_losses=num_losses)
+    raise ValueError(f"Unknown loss balancer '{name}', expected one of {list(LOSS_BALANCERS)}")
+
+
+# How PINNLoss differentiates the displacement field for the physics residual
+RESIDUAL_MODES = ("autograd", "fd")
+
+
 class PINNLoss(nn.Module):
     """
     Combined loss function for Physics-Informed Neural Network.
     
     Loss = MSE_data + λ_physics * L_physics + λ_elastic * L_elastic
+
+    The physics residual's second derivatives come from ``residual_mode``:
+
+    - 'autograd': chained autograd.grad (navier_cauchy_residual)
+    - 'fd': central differences on a stencil (navier_cauchy_residual_fd)
+
+    'fd' needs the per-point ``displacement_fn`` in forward().
+
+    Memory-bounded training: physics_backward() evaluates the residual in
+    chunks of ``chunk_size`` points and backpropagates each chunk before
+    building the next, so peak memory follows the chunk size instead of the
+    number of collocation points.
     """
     
     def __init__(
         self,
         lambda_physics: float = 0.1,
         lambda_elastic: float = 0.05,
+        residual_mode: str = "autograd",
+        fd_step: float = 1e-2,
+        chunk_size: Optional[int] = None,
         **physics_kwargs
     ):
         """
         Args:
             lambda_physics: Weight for physics constraint loss
             lambda_elastic: Weight for elasticity regularization
+            residual_mode: One of RESIDUAL_MODES
+            fd_step: Stencil spacing for the 'fd' mode
+            chunk_size: Collocation points per chunk in physics_backward() and
+                pointwise_residual(); None evaluates all points at once
             **physics_kwargs: Additional arguments for physics_loss
         """
         super().__init__()
+        if residual_mode not in RESIDUAL_MODES:
+            raise ValueError(f"Unknown residual mode '{residual_mode}', expected one of {list(RESIDUAL_MODES)}")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
         self.lambda_physics = lambda_physics
         self.lambda_elastic = lambda_elastic
+        self.residual_mode = residual_mode
+        self.fd_step = fd_step
+        self.chunk_size = chunk_size
         self.physics_kwargs = physics_kwargs
         self.mse = nn.MSELoss()
-    
+
+    def displacement_hessian(
+        self,
+        displacement: Optional[torch.Tensor],
+        coords: torch.Tensor,
+        displacement_fn: Optional[Callable[..., torch.Tensor]] = None,
+        point_inputs: Sequence[torch.Tensor] = ()
+    ) -> torch.Tensor:
+        """Per-point displacement Hessian (B, 3, 3, 3) computed with the configured ``residual_mode``."""
+        if self.residual_mode == "fd" and displacement_fn is not None:
+            return fd_displacement_hessian(displacement_fn, coords, point_inputs, self.fd_step)
+        if self.residual_mode != "autograd":
+            raise ValueError(f"Residual mode '{self.residual_mode}' requires a per-point displacement_fn")
+
+        if displacement_fn is not None:
+            # Re-evaluate the per-point field on a fresh leaf so the graph is pointwise
+            coords = coords.detach().requires_grad_(True)
+            displacement = vmap(displacement_fn)(coords, *point_inputs)
+        return displacement_hessian(displacement, coords)
+
+    def physics_residual(
+        self,
+        displacement: Optional[torch.Tensor],
+        coords: torch.Tensor,
+        stiffness: torch.Tensor,
+        displacement_fn: Optional[Callable[..., torch.Tensor]] = None,
+        point_inputs: Sequence[torch.Tensor] = ()
+    ) -> torch.Tensor:
+        """Navier-Cauchy residual computed with the configured ``residual_mode``."""
+        hessian = self.displacement_hessian(displacement, coords, displacement_fn, point_inputs)
+        return residual_from_hessian(hessian, stiffness, **self.physics_kwargs)
+
+    def pointwise_residual(
+        self,
+        coords: torch.Tensor,
+        stiffness: torch.Tensor,
+        displacement_fn: Callable[..., torch.Tensor],
+        point_inputs: Sequence[torch.Tensor] = ()
+    ) -> torch.Tensor:
+        """Detached squared residual at each point, (B,); used to rank collocation points."""
+        residuals = []
+        for chunk in self._chunks(coords.size(0)):
+            hessian = self.displacement_hessian(
+                None, coords[chunk], displacement_fn, [t[chunk] for t in point_inputs]
+            )
+            residuals.append(
+                pointwise_residual_from_hessian(hessian.detach(), stiffness[chunk].detach(), **self.physics_kwargs)
+            )
+        return torch.cat(residuals)
+
+    def physics_backward(
+        self,
+        coords: torch.Tensor,
+        stiffness: torch.Tensor,
+        displacement_fn: Callable[..., torch.Tensor],
+        point_inputs: Sequence[torch.Tensor] = (),
+        weight: Union[float, torch.Tensor] = 1.0
+    ) -> torch.Tensor:
+        """
+        Accumulate gradients of ``weight * physics_residual()`` chunk by chunk.
+
+        Each chunk builds its derivative graph, backpropagates it and frees it
+        before the next one starts. ``stiffness`` and ``point_inputs`` are cut
+        from the graph that produced them; their gradients are summed over the
+        chunks and backpropagated through that graph once at the end, which
+        is retained so the data loss can still be backpropagated through it.
+
+        Args:
+            coords: Collocation points (N, 3)
+            stiffness: Young's modulus at each point (N, 1)
+            displacement_fn: Per-point displacement function, as in physics_residual()
+            point_inputs: Further per-point inputs of ``displacement_fn``
+            weight: Loss weight applied to the gradients (not to the returned value)
+
+        Returns:
+            The detached physics residual over all N points, for logging and
+            as the precomputed ``physics_loss`` of forward()
+        """
+        num_points = coords.size(0)
+        roots = (stiffness, *point_inputs)
+        leaves = [t.detach().requires_grad_(t.requires_grad) for t in roots]
+
+        total = coords.new_zeros(())
+        for chunk in self._chunks(num_points):
+            residual = self.physics_residual(
+                None, coords[chunk], leaves[0][chunk], displacement_fn, [t[chunk] for t in leaves[1:]]
+            )
+            # The mean over all points is the size-weighted sum of the chunk means
+            residual = residual * ((chunk.stop - chunk.start) / num_points)
+            if residual.requires_grad:
+                (weight * residual).backward()
+            total = total + residual.detach()
+
+        grads = [(root, leaf.grad) for root, leaf in zip(roots, leaves) if leaf.grad is not None]
+        if grads:
+            torch.autograd.backward([root for root, _ in grads], [grad for _, grad in grads], retain_graph=True)
+        return total
+
+    def _chunks(self, num_points: int) -> List[slice]:
+        """Slices of at most ``chunk_size`` points covering ``num_points``."""
+        chunk_size = self.chunk_size or max(num_points, 1)
+        return [slice(start, min(start + chunk_size, num_points)) for start in range(0, num_points, chunk_size)]
+
     def forward(
         self,
         pred_output: Tuple[torch.Tensor, torch.Tensor, torch.Tensor],
         target_labels: torch.Tensor,
         coords: torch.Tensor,
-        target_stiffness: Optional[torch.Tensor] = None
+        target_stiffness: Optional[torch.Tensor] = None,
+        displacement_fn: Optional[Callable[..., torch.Tensor]] = None,
+        point_inputs: Sequence[torch.Tensor] = (),
+        point_stiffness: Optional[torch.Tensor] = None,
+        physics_loss: Optional[torch.Tensor] = None
     ) -> Tuple[torch.Tensor, dict, torch.Tensor]:
         """
         Args:
@@ -182,6 +579,14 @@ class PINNLoss(nn.Module):
             target_labels: Ground truth labels (0 or 1)
             coords: Spatial coordinates for PDEs (B, 3)
             target_stiffness: Optional ground truth stiffness values
+            displacement_fn: Optional per-point displacement function, mapping
+                ``(coord (3,), *point_inputs)`` to (3,); when given, the physics
+                residual differentiates it instead of ``displacement``
+            point_inputs: Per-point inputs of ``displacement_fn`` besides the coordinates
+            point_stiffness: Young's modulus at each of ``coords`` (N, 1), when the
+                physics points differ from the patient batch; defaults to ``stiffness``
+            physics_loss: Physics residual already computed (and backpropagated)
+                by physics_backward(); used as is instead of evaluating it here
             
         Returns:
             Weighted total loss, dictionary of components, and a tensor of unweighted losses (for GradNorm)
@@ -201,8 +606,13 @@ class PINNLoss(nn.Module):
             data_loss = data_loss + 0.5 * stiffness_loss
         
         # ── Physics constraint loss (Navier-Cauchy Equations) ────────────────
-        if coords is not None and displacement is not None:
-            phys_loss = navier_cauchy_residual(displacement, coords, stiffness, **self.physics_kwargs)
+        if physics_loss is not None:
+            phys_loss = physics_loss
+        elif coords is not None and (displacement is not None or displacement_fn is not None):
+            phys_loss = self.physics_residual(
+                displacement, coords, stiffness if point_stiffness is None else point_stiffness,
+                displacement_fn, point_inputs
+            )
         else:
             # Fallback if spatial coordinates are missing
             phys_loss = torch.tensor(0.0).to(prediction.device)
@@ -0,0 +1,124 @@
+"""
+Short-lived store of recent predictions and their lazily materialized volumes.
+
+Scoring a patient only records the risk level and stiffness under a
+prediction id. The stiffness volume is synthesized and encoded the first
+time a consumer (the VTK viewer over HTTP, or the WebSocket broadcast) asks
+for it, and the encoded payload is kept for the lifetime of the prediction so
+every consumer shares a single computation.
+"""
+
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .volume_encoding import encode_volume
+from .volume_synthesis import volume_cache, REFERENCE_GRID_SIZE
+
+VolumePayload = Union[bytes, list]
+
+
+class PredictionStore:
+    """
+    TTL-bounded registry of predictions keyed by prediction id.
+
+    Entries expire ``ttl_seconds`` after they were recorded and at most
+    ``max_entries`` predictions are kept; the oldest are dropped first.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        """Drop expired entries. Caller must hold the lock."""
+        while self._entries:
+            _, oldest = next(iter(self._entries.items()))
+            if now - oldest["created"] < self.ttl_seconds and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def add(self, risk_level: str, stiffness: float, **details) -> str:
+        """
+        Record a prediction and return its id.
+
+        Args:
+            risk_level: Risk level returned by classify_risk()
+            stiffness: Predicted tissue stiffness in kPa
+            **details: Extra fields kept alongside the prediction
+
+        Returns:
+            Prediction id
+        """
+        prediction_id = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._entries[prediction_id] = {
+                "created": now,
+                "risk_level": risk_level,
+                "stiffness": stiffness,
+                "details": details,
+                "volumes": {},
+            }
+            self._purge(now)
+        return prediction_id
+
+    def get(self, prediction_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored prediction, or None if unknown or expired."""
+        with self._lock:
+            self._purge(time.monotonic())
+            return self._entries.get(prediction_id)
+
+    def volume(
+        self,
+        prediction_id: str,
+        grid_size: int = REFERENCE_GRID_SIZE,
+        encoding: str = "raw",
+        dtype: str = "float32"
+    ) -> Tuple[VolumePayload, Dict[str, str]]:
+        """
+        Materialize (or reuse) the encoded stiffness volume for a prediction.
+
+        Args:
+            prediction_id: Id returned by add()
+            grid_size: Voxels per axis
+            encoding: 'json' (list of floats), 'raw' or 'rle'
+            dtype: 'float32' or 'float16' for binary encodings
+
+        Returns:
+            (payload, headers) where payload is a list for 'json' and bytes
+            otherwise, and headers describe binary payloads
+
+        Raises:
+            KeyError: If the prediction is unknown or has expired
+        """
+        entry = self.get(prediction_id)
+        if entry is None:
+            raise KeyError(prediction_id)
+
+        key = (grid_size, encoding, dtype if encoding != "json" else "float32")
+        cached = entry["volumes"].get(key)
+        if cached is not None:
+            return cached
+
+        volume = volume_cache.get(entry["risk_level"], entry["stiffness"], grid_size)
+        if encoding == "json":
+            result = (volume.flatten().tolist(), {})
+        else:
+            result = encode_volume(volume, encoding, dtype)
+
+        with self._lock:
+            entry["volumes"].setdefault(key, result)
+        return entry["volumes"][key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Global instance
+prediction_store = PredictionStore()
@@ -0,0 +1,135 @@
+"""
+Transport encodings for stiffness volumes sent to the VTK viewer.
+
+The default JSON path turns every voxel into a Python float. The binary
+encodings below keep the volume as a NumPy buffer end to end so the browser
+can wrap the payload in a typed-array view without parsing:
+
+- ``raw``: the C-ordered ([z, y, x], x fastest) voxels as little-endian
+  float32 or float16 bytes.
+- ``rle``: sparse run-length encoding of the mostly-zero background. Layout
+  (all little-endian)::
+
+      uint32 run_count
+      uint32 run_starts[run_count]     flat index of each non-zero run
+      uint32 run_lengths[run_count]    voxels in each run
+      dtype  values[sum(run_lengths)]  the non-zero voxels, run after run
+
+Dimensions, dtype and encoding travel out of band in the HTTP headers
+returned by volume_headers().
+"""
+
+import numpy as np
+from typing import Dict, Sequence, Tuple
+
+VOLUME_ENCODINGS = ("json", "raw", "rle")
+VOLUME_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+}
+
+_INDEX_DTYPE = np.dtype("<u4")
+
+
+def _resolve_dtype(dtype: str) -> np.dtype:
+    if dtype not in VOLUME_DTYPES:
+        raise ValueError(f"Unsupported volume dtype '{dtype}', expected one of {list(VOLUME_DTYPES)}")
+    return VOLUME_DTYPES[dtype]
+
+
+def encode_raw(volume: np.ndarray, dtype: str = "float32") -> bytes:
+    """Encode a volume as dense little-endian bytes."""
+    return np.ascontiguousarray(volume, dtype=_resolve_dtype(dtype)).tobytes()
+
+
+def encode_rle(volume: np.ndarray, dtype: str = "float32") -> bytes:
+    """Encode the non-zero runs of a volume (see module docstring for layout)."""
+    values = np.ascontiguousarray(volume, dtype=_resolve_dtype(dtype)).ravel()
+    occupied = values != 0
+
+    # Rising/falling edges of the occupancy mask delimit the runs
+    edges = np.diff(occupied.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+
+    return b"".join((
+        np.array([len(starts)], dtype=_INDEX_DTYPE).tobytes(),
+        starts.astype(_INDEX_DTYPE).tobytes(),
+        lengths.astype(_INDEX_DTYPE).tobytes(),
+        values[occupied].tobytes(),
+    ))
+
+
+def decode_volume(
+    payload: bytes,
+    dimensions: Sequence[int],
+    dtype: str = "float32",
+    encoding: str = "raw"
+) -> np.ndarray:
+    """
+    Decode a binary payload back into a float32 volume.
+
+    Args:
+        payload: Bytes produced by encode_raw() or encode_rle()
+        dimensions: Volume shape as sent in X-Volume-Dimensions
+        dtype: Voxel dtype as sent in X-Volume-Dtype
+        encoding: 'raw' or 'rle'
+
+    Returns:
+        float32 array with the given dimensions
+    """
+    value_dtype = _resolve_dtype(dtype)
+    shape = tuple(int(d) for d in dimensions)
+
+    if encoding == "raw":
+        return np.frombuffer(payload, dtype=value_dtype).astype(np.float32).reshape(shape)
+
+    if encoding == "rle":
+        run_count = int(np.frombuffer(payload, dtype=_INDEX_DTYPE, count=1)[0])
+        runs = np.frombuffer(payload, dtype=_INDEX_DTYPE, count=2 * run_count, offset=4)
+        starts, lengths = runs[:run_count].astype(np.int64), runs[run_count:].astype(np.int64)
+        values = np.frombuffer(payload, dtype=value_dtype, offset=4 + 8 * run_count)
+
+        # Expand runs into flat voxel indices without a Python loop
+        run_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        indices = run_offsets + np.arange(int(lengths.sum()))
+
+        volume = np.zeros(int(np.prod(shape)), dtype=np.float32)
+        volume[indices] = values
+        return volume.reshape(shape)
+
+    raise ValueError(f"Unsupported volume encoding '{encoding}'")
+
+
+def encode_volume(volume: np.ndarray, encoding: str = "raw", dtype: str = "float32") -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode a volume for binary transport.
+
+    Args:
+        volume: (Z, Y, X) stiffness volume
+        encoding: 'raw' or 'rle'
+        dtype: 'float32' or 'float16'
+
+    Returns:
+        (payload bytes, HTTP headers describing the payload)
+    """
+    if encoding == "raw":
+        payload = encode_raw(volume, dtype)
+    elif encoding == "rle":
+        payload = encode_rle(volume, dtype)
+    else:
+        raise ValueError(f"Unsupported binary volume encoding '{encoding}'")
+    return payload, volume_headers(volume.shape, dtype, encoding)
+
+
+def volume_headers(dimensions: Sequence[int], dtype: str, encoding: str) -> Dict[str, str]:
+    """HTTP headers that describe a binary volume payload."""
+    return {
+        "X-Volume-Dimensions": ",".join(str(int(d)) for d in dimensions),
+        "X-Volume-Dtype": dtype,
+        "X-Volume-Encoding": encoding,
+    }
+
+
+# Headers the browser must be allowed to read cross-origin
+VOLUME_HEADER_NAMES = ["X-Volume-Dimensions", "X-Volume-Dtype", "X-Volume-Encoding"]
@@ -0,0 +1,265 @@
+"""
+Vectorized synthesis of the anatomical stiffness volume rendered by the VTK viewer.
+
+The uterus phantom (body, cervix, uterine horns and cavity) and the optional
+lesion overlay are built from broadcast NumPy coordinate grids and boolean
+masks instead of per-voxel Python loops. All geometric constants are expressed
+in voxels of the 64³ reference grid and scaled with ``grid_size``, so the
+64³ output is bit-identical to the original loop implementation while 128³
+and 256³ grids keep the same anatomy at a higher resolution.
+"""
+
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Grid resolution the anatomical constants below are expressed in
+REFERENCE_GRID_SIZE = 64
+
+# Voxel stiffness values (kPa) for each tissue class
+CAVITY_STIFFNESS = 0.5
+CERVIX_STIFFNESS = 3.0
+MYOMETRIUM_STIFFNESS = 1.5
+MYOMETRIUM_NOISE_AMPLITUDE = 0.2
+
+# Risk levels (as returned by classify_risk(), compared case-insensitively) that receive a lesion overlay
+LESION_RISK_LEVELS = ("high", "moderate")
+
+# Lesion centre offset from the grid centre (x, y, z) and maximum radius
+LESION_OFFSET = (5, -2, 6)
+LESION_MAX_RADIUS = 12
+
+
+def _reference_axes(grid_size: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Return voxel indices and centred offsets in reference-grid units.
+
+    Returns:
+        index: (grid_size,) voxel index rescaled to the reference grid
+        offset: (grid_size,) distance from the grid centre in reference voxels
+        scale: grid_size / REFERENCE_GRID_SIZE
+    """
+    scale = grid_size / REFERENCE_GRID_SIZE
+    center = grid_size // 2
+    voxels = np.arange(grid_size, dtype=np.float64)
+    return voxels / scale, (voxels - center) / scale, scale
+
+
+def build_anatomy_template(grid_size: int = REFERENCE_GRID_SIZE) -> np.ndarray:
+    """
+    Build the static uterus stiffness template without any lesion.
+
+    Args:
+        grid_size: Number of voxels along each axis
+
+    Returns:
+        (grid_size, grid_size, grid_size) float32 volume indexed [z, y, x]
+    """
+    index, offset, _ = _reference_axes(grid_size)
+
+    # Broadcastable axes: volumes are indexed [z, y, x]
+    dz = offset[:, None, None]
+    dy = offset[None, :, None]
+    dx = offset[None, None, :]
+
+    # Uterine body: ellipsoid tapering towards the cervix
+    taper = np.maximum(0.4, 1.0 + (dy / (REFERENCE_GRID_SIZE / 2)) * 0.6)
+    body = np.sqrt((dx / (14 * taper))**2 + (dy / 18)**2 + (dz / 10)**2) <= 1.0
+
+    # Cervix: cylinder below the body
+    is_cervix = (dy < -10) & (dy > -22) & (np.sqrt((dx / 6)**2 + (dz / 6)**2) < 1.0)
+
+    # Uterine horns: ellipsoids at the upper left/right corners
+    horn_band = (dy > 6) & (dy < 16)
+    l_horn = horn_band & (dx < -8) & (np.sqrt(((dx + 12) / 8)**2 + ((dy - 12) / 4)**2 + (dz / 6)**2) < 1.0)
+    r_horn = horn_band & (dx > 8) & (np.sqrt(((dx - 12) / 8)**2 + ((dy - 12) / 4)**2 + (dz / 6)**2) < 1.0)
+
+    inside = body | is_cervix | l_horn | r_horn
+    del body, l_horn, r_horn
+
+    # Endometrial cavity: thin inverted-triangle slit inside the body
+    cavity_taper = np.maximum(0.1, 1.0 + (dy / 15) * 1.5)
+    cavity = inside & (np.sqrt((dx / (6 * cavity_taper))**2 + ((dy - 2) / 12)**2 + (dz / 2.5)**2) <= 1.0) & (dy > -10)
+    cervix = inside & ~cavity & is_cervix
+    myometrium = inside & ~cavity & ~is_cervix
+    del inside, is_cervix
+
+    # Separable texture noise on the myometrium
+    noise = (
+        np.sin(index[None, None, :] * 0.5)
+        * np.cos(index[None, :, None] * 0.5)
+        * np.sin(index[:, None, None] * 0.5)
+        * MYOMETRIUM_NOISE_AMPLITUDE
+    )
+
+    volume = np.zeros((grid_size, grid_size, grid_size), dtype=np.float32)
+    volume[cavity] = CAVITY_STIFFNESS
+    volume[cervix] = CERVIX_STIFFNESS
+    volume[myometrium] = (MYOMETRIUM_STIFFNESS + noise)[myometrium]
+
+    return volume
+
+
+def apply_lesion(volume: np.ndarray, risk: str, stiff_value: float) -> np.ndarray:
+    """
+    Inject a stiff lesion into the posterior wall of the uterus, in place.
+
+    Only voxels inside the uterus (non-zero) are affected, and only for risk
+    levels listed in LESION_RISK_LEVELS (in any case). The lesion radius
+    grows with the predicted stiffness and its intensity falls off
+    quadratically from the centre.
+
+    Args:
+        volume: (N, N, N) float32 template indexed [z, y, x]
+        risk: Risk level returned by classify_risk()
+        stiff_value: Predicted tissue stiffness in kPa
+
+    Returns:
+        The same volume array, for chaining
+    """
+    if risk.lower() not in LESION_RISK_LEVELS:
+        return volume
+
+    radius = min(LESION_MAX_RADIUS, int(stiff_value * 1.5))
+    if radius <= 0:
+        return volume
+
+    grid_size = volume.shape[0]
+    _, offset, scale = _reference_axes(grid_size)
+    center = grid_size // 2
+
+    # Restrict the work to the lesion's bounding box
+    bounds = []
+    for lesion_offset in LESION_OFFSET:
+        lo = int(np.floor(center + (lesion_offset - radius) * scale))
+        hi = int(np.ceil(center + (lesion_offset + radius) * scale)) + 1
+        bounds.append(slice(max(lo, 0), min(hi, grid_size)))
+    x_box, y_box, z_box = bounds
+
+    l_x, l_y, l_z = LESION_OFFSET
+    dist = np.sqrt(
+        (offset[x_box][None, None, :] - l_x)**2
+        + (offset[y_box][None, :, None] - l_y)**2
+        + (offset[z_box][:, None, None] - l_z)**2
+    )
+
+    region = volume[z_box, y_box, x_box]
+    mask = (region > 0.0) & (dist < radius)
+    intensity = stiff_value * (1 - (dist[mask] / radius)**2)
+    region[mask] = np.maximum(region[mask].astype(np.float64), intensity)
+
+    return volume
+
+
+def generate_stiffness_volume(
+    risk: str,
+    stiff_value: float,
+    grid_size: int = REFERENCE_GRID_SIZE
+) -> np.ndarray:
+    """
+    Build the full anatomical stiffness volume for a prediction.
+
+    Args:
+        risk: Risk level returned by classify_risk()
+        stiff_value: Predicted tissue stiffness in kPa
+        grid_size: Number of voxels along each axis
+
+    Returns:
+        (grid_size, grid_size, grid_size) float32 volume indexed [z, y, x]
+    """
+    volume = build_anatomy_template(grid_size)
+    return apply_lesion(volume, risk, stiff_value)
+
+
+class StiffnessVolumeCache:
+    """
+    Memoizes prediction volumes on top of a shared, read-only anatomy template.
+
+    The template for each grid size is built once and marked read-only. Lesion
+    overlays are applied to a copy and kept in a bounded LRU keyed on the risk
+    level and the stiffness quantized to ``stiffness_step`` kPa, so similar
+    patients share a single volume. Risk levels without a lesion resolve to
+    the template itself.
+
+    Returned arrays are read-only; copy them before modifying.
+    """
+
+    def __init__(self, max_entries: int = 256, stiffness_step: float = 0.01):
+        self.max_entries = max_entries
+        self.stiffness_step = stiffness_step
+        self._templates: Dict[int, np.ndarray] = {}
+        self._volumes: "OrderedDict[Tuple[int, str, int], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def template(self, grid_size: int = REFERENCE_GRID_SIZE) -> np.ndarray:
+        """Return the read-only anatomy template, building it on first use."""
+        template = self._templates.get(grid_size)
+        if template is None:
+            template = build_anatomy_template(grid_size)
+            template.flags.writeable = False
+            with self._lock:
+                template = self._templates.setdefault(grid_size, template)
+            logger.info(f"Built {grid_size}³ anatomy template")
+        return template
+
+    def quantize(self, stiff_value: float) -> float:
+        """Snap a stiffness value to the cache grid."""
+        return round(stiff_value / self.stiffness_step) * self.stiffness_step
+
+    def get(self, risk: str, stiff_value: float, grid_size: int = REFERENCE_GRID_SIZE) -> np.ndarray:
+        """
+        Return the stiffness volume for a prediction.
+
+        Args:
+            risk: Risk level returned by classify_risk()
+            stiff_value: Predicted tissue stiffness in kPa
+            grid_size: Number of voxels along each axis
+
+        Returns:
+            Read-only (grid_size, grid_size, grid_size) float32 volume
+        """
+        template = self.template(grid_size)
+        risk = risk.lower()
+        if risk not in LESION_RISK_LEVELS:
+            with self._lock:
+                self.hits += 1
+            return template
+
+        key = (grid_size, risk, round(stiff_value / self.stiffness_step))
+        with self._lock:
+            volume = self._volumes.get(key)
+            if volume is not None:
+                self._volumes.move_to_end(key)
+                self.hits += 1
+                return volume
+            self.misses += 1
+
+        volume = apply_lesion(template.copy(), risk, self.quantize(stiff_value))
+        volume.flags.writeable = False
+
+        with self._lock:
+            self._volumes[key] = volume
+            self._volumes.move_to_end(key)
+            while len(self._volumes) > self.max_entries:
+                self._volumes.popitem(last=False)
+        return volume
+
+    def clear(self):
+        """Drop all memoized lesion volumes (templates are kept)."""
+        with self._lock:
+            self._volumes.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._volumes)}
+
+
+# Global instance
+volume_cache = StiffnessVolumeCache()
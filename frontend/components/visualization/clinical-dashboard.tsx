@@ -1,12 +1,13 @@
 "use client";
 
-import React, { useMemo } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Radar, RadarChart, PolarGrid, PolarAngleAxis, PolarRadiusAxis, ResponsiveContainer, Tooltip, Legend } from "recharts";
 import { Thermometer, Droplets, Target, ShieldAlert, Cpu, Activity, Layers } from "lucide-react";
 import { VtkVolumeViewer } from "./vtk-volume-viewer";
 import { GlbViewer } from "./glb-viewer";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
+import { getPredictionVolume, StiffnessVolume } from "@/lib/api";
 
 interface ClinicalDashboardProps {
     predictionData: any;
@@ -17,9 +18,25 @@ export function ClinicalDashboard({ predictionData }: ClinicalDashboardProps) {
     // Handle parsing fallback safely
     const features = predictionData?.parsed_features || {};
 
-    // VTK 3D Volume parsing
-    const vtkVolumeData: number[] | null = predictionData?.vtk_volume || null;
-    const volumeDimensions = predictionData?.volume_dimensions || [64, 64, 64];
+    // VTK 3D Volume: inline payloads are used as-is, otherwise fetched lazily by prediction id
+    const [fetchedVolume, setFetchedVolume] = useState<StiffnessVolume | null>(null);
+    const predictionId: string | undefined = predictionData?.prediction_id;
+    const hasInlineVolume = Boolean(predictionData?.vtk_volume);
+    const volumeGridSize: number = predictionData?.volume_dimensions?.[0] ?? 64;
+
+    useEffect(() => {
+        setFetchedVolume(null);
+        if (!predictionId || hasInlineVolume) return;
+
+        let cancelled = false;
+        getPredictionVolume(predictionId, volumeGridSize)
+            .then((volume) => { if (!cancelled) setFetchedVolume(volume); })
+            .catch((error) => console.error("Volume fetch error:", error));
+        return () => { cancelled = true; };
+    }, [predictionId, hasInlineVolume, volumeGridSize]);
+
+    const vtkVolumeData: number[] | Float32Array | null = predictionData?.vtk_volume || fetchedVolume?.values || null;
+    const volumeDimensions = fetchedVolume?.dimensions || predictionData?.volume_dimensions || [64, 64, 64];
     const dicomMeta = predictionData?.dicom_metadata || null;
     const isVolumetric = vtkVolumeData !== null && vtkVolumeData.length > 0;
 
@@ -13,7 +13,7 @@ let vtkColorTransferFunction: any;
 let vtkPiecewiseFunction: any;
 
 export interface VtkVolumeViewerProps {
-    volumeData: number[]; // Flattened volume array
+    volumeData: number[] | Float32Array; // Flattened volume array
     dimensions: [number, number, number]; // [Z, Y, X] or [X, Y, Z]
     stiffness: number;
 }
@@ -95,7 +95,7 @@ export function VtkVolumeViewer({ volumeData, dimensions, stiffness }: VtkVolume
 
         const dataArray = vtkDataArray.newInstance({
             name: "Stiffness",
-            values: new Float32Array(volumeData),
+            values: volumeData instanceof Float32Array ? volumeData : new Float32Array(volumeData),
             numberOfComponents: 1,
         });
 
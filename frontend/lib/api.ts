@@ -5,11 +5,14 @@
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8004';
 
 export interface PredictionResponse {
+    prediction_id: string;
     prediction: number;
     stiffness: number;
     confidence: number;
     risk_level: string;
+    mc_samples_used: number;
     timestamp: string;
+    volume_dimensions: number[];
 }
 
 export interface TrainingHistoryItem {
@@ -21,10 +24,16 @@ export interface TrainingHistoryItem {
 }
 
 export interface NodeStatus {
+    node_id?: string;
+    modality?: 'imaging' | 'clinical' | 'pathology' | null;
+    site?: string | null;
     name: string;
     url: string;
     status: string;
     is_training: boolean;
+    latency_ms?: number | null;
+    checked_at?: number | null;
+    breaker?: 'closed' | 'open' | 'half_open';
 }
 
 export interface FederatedNodesStatus {
@@ -81,13 +90,39 @@ export async function predict(patientId?: string, features?: PatientFeatures): P
     return response.json();
 }
 
-export async function trainFederatedNodes(epochs: number = 10): Promise<any> {
+export interface TrainingJob {
+    job_id: string;
+    status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+    priority: number;
+    cancel_requested: boolean;
+    epochs_total: number;
+    epochs_completed: number;
+    eta_s: number | null;
+    created: number;
+    started: number | null;
+    finished: number | null;
+    result: { final_loss: number; epochs_completed: number; model_version: string } | null;
+    error: string | null;
+    checkpoint: string | null;
+    epochs?: (TrainingHistoryItem & { epoch_time_s?: number; samples_per_s?: number })[];
+}
+
+export interface TrainingJobEvent {
+    event: 'queued' | 'started' | 'epoch' | 'completed' | 'failed' | 'cancelling' | 'cancelled';
+    job: TrainingJob;
+    epoch?: TrainingHistoryItem & { epoch_time_s?: number; samples_per_s?: number };
+}
+
+export async function trainFederatedNodes(
+    epochs: number = 10,
+    priority: number = 0
+): Promise<{ status: string; message: string; job_id: string }> {
     const response = await fetch(`${API_BASE_URL}/train`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ epochs }),
+        body: JSON.stringify({ epochs, priority }),
     });
 
     if (!response.ok) {
@@ -97,6 +132,43 @@ export async function trainFederatedNodes(epochs: number = 10): Promise<any> {
     return response.json();
 }
 
+export async function getTrainingJob(jobId: string): Promise<TrainingJob> {
+    const response = await fetch(`${API_BASE_URL}/train/jobs/${jobId}`);
+
+    if (!response.ok) {
+        throw new Error('Failed to fetch training job');
+    }
+
+    return response.json();
+}
+
+export async function cancelTrainingJob(jobId: string): Promise<TrainingJob> {
+    const response = await fetch(`${API_BASE_URL}/train/jobs/${jobId}/cancel`, { method: 'POST' });
+
+    if (!response.ok) {
+        throw new Error('Failed to cancel training job');
+    }
+
+    return response.json();
+}
+
+/**
+ * Subscribe to training job progress over Server-Sent Events.
+ * Returns a function that closes the stream.
+ */
+export function subscribeTrainingEvents(
+    onEvent: (event: TrainingJobEvent) => void,
+    jobId?: string
+): () => void {
+    const query = jobId ? `?job_id=${encodeURIComponent(jobId)}` : '';
+    const source = new EventSource(`${API_BASE_URL}/train/events${query}`);
+    const handler = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+    for (const name of ['queued', 'started', 'epoch', 'completed', 'failed', 'cancelling', 'cancelled']) {
+        source.addEventListener(name, handler as EventListener);
+    }
+    return () => source.close();
+}
+
 
 export async function getNodeStatus(): Promise<FederatedNodesStatus> {
     const response = await fetch(`${API_BASE_URL}/status/nodes`);
@@ -112,6 +184,108 @@ export async function getMeshUrl(stiffness: number): Promise<string> {
     return `${API_BASE_URL}/mesh/${stiffness}`;
 }
 
+export type VolumeEncoding = 'raw' | 'rle';
+export type VolumeDtype = 'float32' | 'float16';
+
+export interface StiffnessVolume {
+    values: Float32Array;                    // Flattened [z, y, x] voxels, x fastest
+    dimensions: [number, number, number];
+}
+
+/** Convert IEEE 754 half-precision bits to Float32 values. */
+function _halfToFloat32(bits: Uint16Array): Float32Array {
+    const out = new Float32Array(bits.length);
+    for (let i = 0; i < bits.length; i++) {
+        const h = bits[i];
+        const sign = h & 0x8000 ? -1 : 1;
+        const exponent = (h >> 10) & 0x1f;
+        const fraction = h & 0x03ff;
+        if (exponent === 0) {
+            out[i] = sign * Math.pow(2, -14) * (fraction / 1024);
+        } else if (exponent === 0x1f) {
+            out[i] = fraction ? NaN : sign * Infinity;
+        } else {
+            out[i] = sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+        }
+    }
+    return out;
+}
+
+/** Decode a binary /volume payload (see backend/utils/volume_encoding.py). */
+export function decodeVolume(
+    buffer: ArrayBuffer,
+    dimensions: [number, number, number],
+    dtype: VolumeDtype,
+    encoding: VolumeEncoding,
+): Float32Array {
+    const asFloat32 = (offset: number, length?: number) =>
+        dtype === 'float32'
+            ? new Float32Array(buffer, offset, length)
+            : _halfToFloat32(new Uint16Array(buffer, offset, length));
+
+    if (encoding === 'raw') {
+        return asFloat32(0);
+    }
+
+    const runCount = new Uint32Array(buffer, 0, 1)[0];
+    const starts = new Uint32Array(buffer, 4, runCount);
+    const lengths = new Uint32Array(buffer, 4 + 4 * runCount, runCount);
+    const values = asFloat32(4 + 8 * runCount);
+
+    const volume = new Float32Array(dimensions[0] * dimensions[1] * dimensions[2]);
+    let cursor = 0;
+    for (let r = 0; r < runCount; r++) {
+        volume.set(values.subarray(cursor, cursor + lengths[r]), starts[r]);
+        cursor += lengths[r];
+    }
+    return volume;
+}
+
+async function _fetchVolume(url: string, encoding: VolumeEncoding, dtype: VolumeDtype): Promise<StiffnessVolume> {
+    const response = await fetch(url);
+
+    if (!response.ok) {
+        throw new Error('Failed to fetch stiffness volume');
+    }
+
+    const dimensions = (response.headers.get('X-Volume-Dimensions') || '64,64,64')
+        .split(',')
+        .map(Number) as [number, number, number];
+    const buffer = await response.arrayBuffer();
+
+    return {
+        values: decodeVolume(
+            buffer,
+            dimensions,
+            (response.headers.get('X-Volume-Dtype') as VolumeDtype) || dtype,
+            (response.headers.get('X-Volume-Encoding') as VolumeEncoding) || encoding,
+        ),
+        dimensions,
+    };
+}
+
+/** Fetch the stiffness volume as a binary payload, avoiding a JSON parse of every voxel. */
+export async function getStiffnessVolume(
+    stiffness: number,
+    riskLevel: string,
+    encoding: VolumeEncoding = 'rle',
+    dtype: VolumeDtype = 'float32',
+): Promise<StiffnessVolume> {
+    const params = new URLSearchParams({ risk_level: riskLevel, encoding, dtype });
+    return _fetchVolume(`${API_BASE_URL}/volume/${stiffness}?${params}`, encoding, dtype);
+}
+
+/** Fetch the stiffness volume of a recent prediction; it is only synthesized on request. */
+export async function getPredictionVolume(
+    predictionId: string,
+    resolution: number = 64,
+    encoding: VolumeEncoding = 'rle',
+    dtype: VolumeDtype = 'float32',
+): Promise<StiffnessVolume> {
+    const params = new URLSearchParams({ resolution: String(resolution), format: encoding, dtype });
+    return _fetchVolume(`${API_BASE_URL}/predict/${predictionId}/volume?${params}`, encoding, dtype);
+}
+
 export interface StatsResponse {
     active_nodes: string;
     active_nodes_count: number;